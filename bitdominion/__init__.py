@@ -0,0 +1,79 @@
+"""Bit Dominion simulation: world, knight, units, villagers and the Dark Lord AI.
+
+Importing the package needs only the standard library and NumPy. The pygame
+window, renderer and input loop live in bitdominion.frontend, which is never
+imported from here; a Match can be stepped headless, in tests or in batches.
+"""
+
+from .ai import DarkLordAI, Squad, SuspicionGrid
+from .core import EntityPool, SpatialHash, next_entity_id, reset_entity_ids, restore_entity_ids
+from .digest import (
+    DIGEST_SCENARIOS,
+    StateCheckpoint,
+    check_digests,
+    compare_digests,
+    read_digests,
+    record_digests,
+    run_scenario,
+    state_checkpoint,
+)
+from .events import EventLog
+from .geometry import Rect, Vector2
+from .kernels import check_math_kernels, check_sight_lines, check_suspicion_falloff, set_math_engine
+from .match import Match, RenderSnapshot, SnapshotBuffer
+from .nav import KnightNavigator, NavGrid
+from .raster import RASTER_CHANNELS, ObservationRaster
+from .spectator import SpectatorFeed
+from .steering import SeparationSteering
+from .units import UNIT_TYPES, CombatResolver, Knight, KnightVisibility, Seal, Unit, UnitType
+from .vecenv import STATE_FEATURES, MatchVecEnv
+from .world import Census, RoadNetwork, Village, Villager, World
+
+__all__ = [
+    "DIGEST_SCENARIOS",
+    "RASTER_CHANNELS",
+    "STATE_FEATURES",
+    "UNIT_TYPES",
+    "Census",
+    "CombatResolver",
+    "DarkLordAI",
+    "EntityPool",
+    "EventLog",
+    "Knight",
+    "KnightNavigator",
+    "KnightVisibility",
+    "Match",
+    "MatchVecEnv",
+    "NavGrid",
+    "ObservationRaster",
+    "Rect",
+    "RenderSnapshot",
+    "RoadNetwork",
+    "Seal",
+    "SeparationSteering",
+    "SnapshotBuffer",
+    "SpatialHash",
+    "SpectatorFeed",
+    "Squad",
+    "StateCheckpoint",
+    "SuspicionGrid",
+    "Unit",
+    "UnitType",
+    "Vector2",
+    "Village",
+    "Villager",
+    "World",
+    "check_digests",
+    "check_math_kernels",
+    "check_sight_lines",
+    "check_suspicion_falloff",
+    "compare_digests",
+    "next_entity_id",
+    "read_digests",
+    "record_digests",
+    "reset_entity_ids",
+    "restore_entity_ids",
+    "run_scenario",
+    "set_math_engine",
+    "state_checkpoint",
+]
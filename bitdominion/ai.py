@@ -0,0 +1,484 @@
+"""The Dark Lord: suspicion map with patrol anchors, unit spawning, squads and AI level of detail."""
+
+import math
+import random
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .config import (
+    AI_LOD_INTERVALS,
+    AI_LOD_MID_RADIUS,
+    AI_LOD_NEAR_RADIUS,
+    AI_LOD_PROMOTE_HOLD,
+    CASTLE_POS,
+    CASTLE_RADIUS,
+    ENERGY_PER_SEC,
+    HEIGHT,
+    MAX_UNITS,
+    SPAWN_INTERVAL,
+    SQUAD_BREAK_RADIUS,
+    SQUAD_LINK_RADIUS,
+    SQUAD_MAX_SIZE,
+    SQUAD_REFORM_TICKS,
+    SQUAD_SPACING,
+    SUS_ANCHOR_START,
+    SUS_CELL_SIZE,
+    SUS_DECAY_PER_SEC,
+    SUS_DIFFUSION_PER_SEC,
+    SUS_REVEAL_BONUS,
+    SUS_STAMP_RADIUS,
+    UNIT_CHASE,
+    UNIT_HUNT,
+    UNIT_IDLE,
+    UNIT_SPIRAL,
+    VILLAGER_MANA_REWARD,
+    WIDTH,
+)
+from .core import EntityPool, SpatialHash
+from .geometry import Vector2
+from .units import UNIT_TYPES, Knight, Seal, Unit
+
+if TYPE_CHECKING:
+    from .world import Census, World
+
+
+class SuspicionGrid:
+    """Dark Lord suspicion as a coarse influence map over the arena.
+
+    The six patrol anchors on the ring around the castle are kept as waypoints;
+    suspicion itself lives in a grid of SUS_CELL_SIZE cells so noise, reveals and
+    kills build up hotspots wherever they happen.
+    """
+
+    def __init__(self) -> None:
+        self.anchors: List[Vector2] = []
+        for i in range(6):
+            angle = (2 * math.pi / 6) * i
+            point = CASTLE_POS + Vector2(math.cos(angle), math.sin(angle)) * 280
+            self.anchors.append(point)
+        self.cols = int(math.ceil(WIDTH / SUS_CELL_SIZE))
+        self.rows = int(math.ceil(HEIGHT / SUS_CELL_SIZE))
+        self.grid = np.zeros((self.rows, self.cols), dtype=np.float64)
+        self.cell_x = (np.arange(self.cols, dtype=np.float64) + 0.5) * SUS_CELL_SIZE
+        self.cell_y = (np.arange(self.rows, dtype=np.float64) + 0.5) * SUS_CELL_SIZE
+        self._peak_index = 0
+        self._peak_value = 0.0
+        self._peak_pos = Vector2(self.cell_x[0], self.cell_y[0])
+        self._dirty = True
+        for anchor in self.anchors:
+            self.boost_sector(anchor, SUS_ANCHOR_START)
+
+    def _cell_of(self, pos: Vector2) -> Tuple[int, int]:
+        col = min(self.cols - 1, max(0, int(pos.x // SUS_CELL_SIZE)))
+        row = min(self.rows - 1, max(0, int(pos.y // SUS_CELL_SIZE)))
+        return row, col
+
+    def decay(self, dt: float) -> None:
+        amount = SUS_DECAY_PER_SEC * dt
+        np.subtract(self.grid, amount, out=self.grid)
+        np.maximum(self.grid, 0.0, out=self.grid)
+        if SUS_DIFFUSION_PER_SEC > 0.0:
+            self.diffuse(SUS_DIFFUSION_PER_SEC * dt)
+            return
+        # A uniform clamped decrement keeps the ordering of the cells, so the
+        # cached peak only needs recomputing once it has decayed to zero.
+        self._peak_value -= amount
+        if self._peak_value <= 0.0:
+            self._dirty = True
+
+    def diffuse(self, rate: float) -> None:
+        rate = min(0.25, rate)
+        grid = self.grid
+        flow = np.zeros_like(grid)
+        flow[1:, :] += grid[:-1, :]
+        flow[:-1, :] += grid[1:, :]
+        flow[:, 1:] += grid[:, :-1]
+        flow[:, :-1] += grid[:, 1:]
+        flow -= 4.0 * grid
+        grid += rate * flow
+        self._dirty = True
+
+    def boost_from_pos(self, pos: Vector2, amount: float) -> None:
+        self._stamp(pos.x, pos.y, amount)
+
+    def boost_from_many(self, sources: Iterable[Tuple[Vector2, float]]) -> None:
+        for pos, amount in sources:
+            self._stamp(pos.x, pos.y, amount)
+
+    def _stamp(self, x: float, y: float, amount: float) -> None:
+        """Add amount / (distance + 1) to every cell within SUS_STAMP_RADIUS of (x, y).
+
+        The distance is in pixels to the cell centre, so each cell gains what a
+        patrol anchor at its centre used to (AnchorManager.boost_from_pos).
+        """
+        reach = SUS_STAMP_RADIUS
+        c0 = max(0, int((x - reach) // SUS_CELL_SIZE))
+        c1 = min(self.cols, int((x + reach) // SUS_CELL_SIZE) + 1)
+        r0 = max(0, int((y - reach) // SUS_CELL_SIZE))
+        r1 = min(self.rows, int((y + reach) // SUS_CELL_SIZE) + 1)
+        if c0 >= c1 or r0 >= r1:
+            return
+        dx = self.cell_x[c0:c1] - x
+        dy = self.cell_y[r0:r1] - y
+        dist = np.sqrt(dy[:, None] * dy[:, None] + dx[None, :] * dx[None, :])
+        falloff = amount / (dist + 1.0)
+        falloff[dist > reach] = 0.0
+        window = self.grid[r0:r1, c0:c1]
+        window += falloff
+        if self._dirty:
+            return
+        local = int(np.argmax(window))
+        row, col = divmod(local, c1 - c0)
+        value = float(window[row, col])
+        peak_row, peak_col = divmod(self._peak_index, self.cols)
+        if value > self._peak_value:
+            self._set_peak((r0 + row) * self.cols + c0 + col, value)
+        elif r0 <= peak_row < r1 and c0 <= peak_col < c1:
+            self._peak_value = float(self.grid[peak_row, peak_col])
+
+    def boost_sector(self, pos: Vector2, amount: float) -> None:
+        row, col = self._cell_of(pos)
+        self.grid[row, col] += amount
+        if self._dirty:
+            return
+        index = row * self.cols + col
+        value = float(self.grid[row, col])
+        if index == self._peak_index:
+            self._peak_value = value
+        elif value > self._peak_value:
+            self._set_peak(index, value)
+
+    def _set_peak(self, index: int, value: float) -> None:
+        if index != self._peak_index:
+            row, col = divmod(index, self.cols)
+            # New vector rather than an in-place update: units hold on to the old one as a target.
+            self._peak_pos = Vector2(self.cell_x[col], self.cell_y[row])
+        self._peak_index = index
+        self._peak_value = value
+
+    def _refresh_peak(self) -> None:
+        index = int(np.argmax(self.grid))
+        self._dirty = False
+        self._set_peak(index, float(self.grid.flat[index]))
+
+    def hotspot(self) -> Vector2:
+        """Centre of the most suspicious cell. Shared between callers; do not mutate."""
+        if self._dirty:
+            self._refresh_peak()
+        return self._peak_pos
+
+    def suspicion_at(self, pos: Vector2) -> float:
+        row, col = self._cell_of(pos)
+        return float(self.grid[row, col])
+
+    def nearest_anchor_to(self, pos: Vector2) -> Vector2:
+        idx = min(range(len(self.anchors)), key=lambda i: self.anchors[i].distance_to(pos))
+        return self.anchors[idx].copy()
+
+    def render_state(self) -> Tuple[np.ndarray, float, float, float]:
+        """Copy the heat grid and peak so the debug overlay can be drawn off-thread."""
+        peak = self.hotspot()
+        return (self.grid.copy(), peak.x, peak.y, self._peak_value)
+
+
+class Squad:
+    """Units moving together: the leader decides, the others hold formation slots.
+
+    The leader (slot 0) runs the ordinary think handlers; members follow its
+    patrol target in a wedge behind it, encircle the villager it hunts and fan
+    out around its spiral search (Unit._follow_squad). Every member still looks
+    for the knight along its own sight line (KnightVisibility). A unit leaves
+    as soon as it chases, investigates or dies; DarkLordAI.reform_squads splits
+    off stragglers and merges squads that meet.
+    """
+
+    def __init__(self, leader: Unit) -> None:
+        self.members: List[Unit] = []
+        self.perceived_tick = -1
+        self.add(leader)
+
+    @property
+    def leader(self) -> Unit:
+        return self.members[0]
+
+    def add(self, unit: Unit) -> None:
+        unit.squad = self
+        unit.squad_slot = len(self.members)
+        self.members.append(unit)
+
+    def leave(self, unit: Unit) -> None:
+        members = self.members
+        slot = unit.squad_slot
+        del members[slot]
+        unit.squad = None
+        unit.squad_slot = 0
+        if slot == 0 and members:
+            self._hand_over(unit, members[0])
+        for index in range(slot, len(members)):
+            members[index].squad_slot = index
+        if len(members) == 1:
+            last = members.pop()
+            last.squad = None
+            last.squad_slot = 0
+
+    @staticmethod
+    def _hand_over(old: Unit, new: Unit) -> None:
+        """Give the next leader the decisions it has been following, so the squad keeps its course."""
+        new.target = old.target
+        new.target_is_anchor = old.target_is_anchor
+        if old.state == UNIT_SPIRAL and new.state == UNIT_SPIRAL:
+            new.state_timer = old.state_timer
+            new.spiral_origin = old.spiral_origin
+            new.spiral_angle = old.spiral_angle + Squad.slot_phase(new.squad_slot, len(new.squad.members) + 1)
+            new.spiral_radius = old.spiral_radius
+
+    def absorb(self, other: "Squad") -> None:
+        for unit in other.members:
+            self.add(unit)
+        other.members.clear()
+
+    @staticmethod
+    def slot_phase(slot: int, size: int) -> float:
+        return 2 * math.pi * slot / size
+
+    def phase(self, unit: Unit) -> float:
+        """Angle offset that spreads members evenly around a circle."""
+        return self.slot_phase(unit.squad_slot, len(self.members))
+
+    def slot_position(self, unit: Unit) -> Vector2:
+        """The unit's place in a wedge behind the leader, facing where the leader is heading."""
+        leader = self.leader
+        heading = leader.vel if leader.vel.length_squared() > 1.0 else leader.target - leader.pos
+        length = heading.length()
+        if length > 0.0:
+            fx = heading.x / length
+            fy = heading.y / length
+        else:
+            fx, fy = 1.0, 0.0
+        row = (unit.squad_slot + 1) // 2
+        back = SQUAD_SPACING * row
+        side = SQUAD_SPACING * row * (1 if unit.squad_slot % 2 else -1)
+        return Vector2(leader.pos.x - fx * back - fy * side, leader.pos.y - fy * back + fx * side)
+
+    def encircle(self, unit: Unit, pos: Vector2) -> Vector2:
+        """A point on a tight ring around ``pos``, one per member, so hunters close in from all sides."""
+        angle = self.phase(unit)
+        reach = unit.size + 3
+        return Vector2(pos.x + math.cos(angle) * reach, pos.y + math.sin(angle) * reach)
+
+
+class DarkLordAI:
+    def __init__(self, suspicion: SuspicionGrid, census: "Census") -> None:
+        self.energy = 0.0
+        self.units: List["Unit"] = []
+        self.unit_pool: EntityPool[Unit] = EntityPool(Unit)
+        self.spawn_timer = SPAWN_INTERVAL
+        self.suspicion = suspicion
+        self.census = census
+        self.last_reveal_pos: Optional[Vector2] = None
+        self.last_reveal_time = -999.0
+        self.alarm_target: Optional[Vector2] = None
+        self.alarm_active = False
+        self.last_spawn_type: Optional[str] = None
+        self.tick = 0
+        self.spawn_count = 0
+        self.lod_focus: List[Tuple[float, float]] = []
+        self.squads: List[Squad] = []
+        self.squad_index: SpatialHash[Unit] = SpatialHash(SQUAD_LINK_RADIUS)
+        self.perceivers: List[Unit] = []
+        self.followers: List[Unit] = []
+
+    def update(self, dt: float, knight: Knight, seals: List[Seal], now: float, world: "World") -> None:
+        self.alarm_target = world.get_alarm_focus()
+        self.alarm_active = self.alarm_target is not None
+        self.energy += ENERGY_PER_SEC * dt
+        self.spawn_timer -= dt
+        self.unit_pool.compact(self.units)
+        if self.spawn_timer <= 0.0:
+            self.spawn_timer += SPAWN_INTERVAL
+            self.try_spawn(seals, now)
+        self.tick += 1
+        if self.tick % SQUAD_REFORM_TICKS == 0:
+            self.reform_squads()
+        focus = self.lod_focus
+        focus.clear()
+        focus.append((knight.pos.x, knight.pos.y))
+        for village in world.villages:
+            if village.alarm_active:
+                focus.append((village.center.x, village.center.y))
+        for seal in seals:
+            if seal.channeling:
+                focus.append((seal.pos.x, seal.pos.y))
+
+    def lod_step(self, unit: Unit, dt: float) -> float:
+        """Accumulate dt for the unit and return it once the unit is due to think, else 0."""
+        unit.lod_dt += dt
+        if unit.lod_hold > 0.0:
+            unit.lod_hold -= dt
+            interval = 1
+        elif unit.state == UNIT_CHASE or unit.reveal_active > 0.0:
+            interval = 1
+        else:
+            interval = AI_LOD_INTERVALS[self._lod_level(unit.pos)]
+        if interval > 1 and (self.tick + unit.lod_phase) % interval:
+            return 0.0
+        step = unit.lod_dt
+        unit.lod_dt = 0.0
+        return step
+
+    def _lod_level(self, pos: Vector2) -> int:
+        x = pos.x
+        y = pos.y
+        best = float("inf")
+        for fx, fy in self.lod_focus:
+            dx = fx - x
+            dy = fy - y
+            dist_sq = dx * dx + dy * dy
+            if dist_sq < best:
+                best = dist_sq
+        if best <= AI_LOD_NEAR_RADIUS * AI_LOD_NEAR_RADIUS:
+            return 0
+        if best <= AI_LOD_MID_RADIUS * AI_LOD_MID_RADIUS:
+            return 1
+        return 2
+
+    def reform_squads(self) -> None:
+        """Split stragglers off their squads, then merge squads and lone units that are close together.
+
+        Only squad leaders and unattached idle, hunting or searching units are
+        indexed, so this pass is linear in the number of units and runs every
+        SQUAD_REFORM_TICKS ticks; between passes squads only lose members.
+        """
+        squads = self.squads
+        break_sq = SQUAD_BREAK_RADIUS * SQUAD_BREAK_RADIUS
+        for squad in squads:
+            members = squad.members
+            if not members:
+                continue
+            leader_pos = squad.leader.pos
+            for unit in members[:0:-1]:
+                if unit.squad is squad and unit.pos.distance_squared_to(leader_pos) > break_sq:
+                    squad.leave(unit)
+        heads: List[Unit] = [squad.leader for squad in squads if squad.members]
+        heads.extend(
+            unit for unit in self.units
+            if unit.alive and unit.squad is None and unit.state in (UNIT_IDLE, UNIT_HUNT, UNIT_SPIRAL)
+        )
+        index = self.squad_index
+        index.clear()
+        for unit in heads:
+            index.insert(unit, unit.pos)
+        link_sq = SQUAD_LINK_RADIUS * SQUAD_LINK_RADIUS
+        for head in heads:
+            if head.squad is not None and head.squad_slot:
+                continue  # absorbed earlier in this pass
+            searching = head.state == UNIT_SPIRAL
+            for other in index.query(head.pos, SQUAD_LINK_RADIUS):
+                if other is head or (other.squad is not None and (other.squad_slot or other.squad is head.squad)):
+                    continue
+                if (other.state == UNIT_SPIRAL) != searching:
+                    continue
+                if other.pos.distance_squared_to(head.pos) > link_sq:
+                    continue
+                size = len(head.squad.members) if head.squad is not None else 1
+                other_size = len(other.squad.members) if other.squad is not None else 1
+                if size + other_size > SQUAD_MAX_SIZE:
+                    continue
+                if head.squad is None:
+                    squads.append(Squad(head))
+                if other.squad is None:
+                    head.squad.add(other)
+                else:
+                    head.squad.absorb(other.squad)
+        squads[:] = [squad for squad in squads if squad.members]
+
+    def split_perception(self, thinking: List[Unit]) -> Tuple[List[Unit], List[Unit]]:
+        """Units that decide for themselves this tick (loners and squad leaders), and squad followers."""
+        perceivers = self.perceivers
+        followers = self.followers
+        perceivers.clear()
+        followers.clear()
+        tick = self.tick
+        for unit in thinking:
+            squad = unit.squad
+            if squad is None:
+                perceivers.append(unit)
+                continue
+            if unit.squad_slot:
+                followers.append(unit)
+            if squad.perceived_tick != tick:
+                squad.perceived_tick = tick
+                perceivers.append(squad.leader)
+        return perceivers, followers
+
+    def promote(self, unit: Unit) -> None:
+        unit.lod_hold = AI_LOD_PROMOTE_HOLD
+
+    def try_spawn(self, seals: List[Seal], now: float) -> None:
+        if self.census.units >= MAX_UNITS:
+            return
+        seal_channeling = self.census.channeling > 0
+        weights: Dict[str, float] = {"SCOUT": 1.0}
+        if self.alarm_active:
+            weights["SCOUT"] = weights.get("SCOUT", 0.0) + 0.8
+        if seal_channeling:
+            weights["TANK"] = weights.get("TANK", 0.0) + 1.4
+        if self.last_reveal_pos is not None and now - self.last_reveal_time < 4.0:
+            weights["PRIEST"] = weights.get("PRIEST", 0.0) + 1.2
+        affordable: Dict[str, float] = {
+            unit_type: weight
+            for unit_type, weight in weights.items()
+            if self.energy >= UNIT_TYPES[unit_type].cost
+        }
+        if not affordable:
+            return
+        if len(affordable) > 1 and self.last_spawn_type in affordable:
+            affordable[self.last_spawn_type] *= 0.45
+        choices = list(affordable.keys())
+        chance = list(affordable.values())
+        unit_type = random.choices(choices, weights=chance)[0]
+        spawn_pos = self.choose_spawn_position(unit_type)
+        self.energy -= UNIT_TYPES[unit_type].cost
+        unit = self.unit_pool.acquire(unit_type, spawn_pos, self.suspicion, self.census)
+        self.census.unit_spawned(unit)
+        if seal_channeling and unit_type == "TANK":
+            closest = min(seals, key=lambda s: s.pos.distance_to(spawn_pos), default=None)
+            if closest is not None:
+                unit.investigate(closest.pos, 4.0)
+        if unit_type == "SCOUT" and seal_channeling:
+            active = [s for s in seals if s.channeling]
+            if active:
+                unit.investigate(active[0].pos, 3.0)
+        if self.last_reveal_pos is not None and now - self.last_reveal_time < 4.0:
+            unit.investigate(self.last_reveal_pos, 3.5)
+        unit.lod_phase = self.spawn_count
+        self.spawn_count += 1
+        self.units.append(unit)
+        self.last_spawn_type = unit_type
+
+    def choose_spawn_position(self, unit_type: str) -> Vector2:
+        if unit_type in ("TANK", "PRIEST") and self.last_reveal_pos is not None and random.random() < 0.6:
+            offset = Vector2(random.uniform(-30, 30), random.uniform(-30, 30))
+            return self.last_reveal_pos + offset
+        if self.alarm_target is not None and random.random() < 0.65:
+            anchor = self.suspicion.nearest_anchor_to(self.alarm_target)
+            offset = Vector2(random.uniform(-25, 25), random.uniform(-25, 25))
+            return anchor + offset
+        angle = random.random() * 2 * math.pi
+        base = CASTLE_POS + Vector2(math.cos(angle), math.sin(angle)) * (CASTLE_RADIUS + 40)
+        if random.random() < 0.4:
+            anchor = random.choice(self.suspicion.anchors)
+            base = anchor + Vector2(random.uniform(-30, 30), random.uniform(-30, 30))
+        return base
+
+    def register_reveal(self, pos: Vector2, now: float) -> None:
+        self.last_reveal_pos = pos.copy()
+        self.last_reveal_time = now
+        self.suspicion.boost_from_pos(pos, SUS_REVEAL_BONUS)
+        for unit in self.units:
+            self.promote(unit)
+
+    def on_villager_killed(self, pos: Vector2) -> None:
+        self.energy += VILLAGER_MANA_REWARD
+        self.suspicion.boost_sector(pos, 6.0)
@@ -0,0 +1,253 @@
+"""Simulation constants shared by every module of the package."""
+
+import math
+import os
+
+from .geometry import Vector2
+
+WIDTH, HEIGHT = 900, 900
+FPS = 60
+SIM_TICK_RATE = 60  # fixed simulation ticks per second in --threaded mode
+SIM_MAX_LAG = 0.25  # seconds of backlog the simulation thread drops instead of catching up
+CASTLE_POS = Vector2(WIDTH / 2, HEIGHT / 2)
+CASTLE_RADIUS = 40
+CASTLE_SHIELD_EXTRA = 30
+CASTLE_WIN_RADIUS = 25
+CASTLE_STAY_TIME = 3.0
+
+KNIGHT_SIZE = 10
+KNIGHT_ACCEL = 480.0  # pixels per second^2
+KNIGHT_MAX_SPEED = 220.0
+KNIGHT_FRICTION = 6.0
+KNIGHT_HP = 10
+KNIGHT_COLLISION_RADIUS = 14
+KNIGHT_SPRINT_CLICK_INTERVAL = 0.22
+
+SWING_RANGE = 80
+SWING_ARC_DEG = 110
+SWING_DURATION = 0.25
+SWING_COOLDOWN = 0.8
+SWING_ARC_POINTS = 24
+SWING_HALF_ARC_COS = math.cos(math.radians(SWING_ARC_DEG) / 2)
+SWING_ARC_OFFSETS = [
+    (math.cos(ang), math.sin(ang))
+    for ang in (
+        math.radians(SWING_ARC_DEG) * (i / SWING_ARC_POINTS - 0.5) for i in range(SWING_ARC_POINTS + 1)
+    )
+]
+
+SEAL_COUNT = 3
+SEAL_MIN_CASTLE_DIST = 140
+SEAL_MIN_SEPARATION = 80
+SEAL_CHANNEL_RADIUS = 25
+SEAL_CHANNEL_TIME = 3.0
+
+FOREST_PATCH_RANGE = (3, 5)
+TREES_PER_PATCH_RANGE = (20, 40)
+TREE_RADIUS_RANGE = (6, 10)
+FOREST_CLUSTER_RADIUS = 70
+FOREST_CANOPY_EXTRA = 16
+FOREST_CANOPY_TREE_THRESHOLD = 3
+
+VILLAGE_COUNT_RANGE = (2, 3)
+VILLAGE_MIN_CASTLE_DIST = 180
+VILLAGE_MIN_SEPARATION = 140
+VILLAGE_HUT_COUNT_RANGE = (4, 8)
+VILLAGE_RADIUS = 90
+HUT_SIZE = 10
+HUT_BOUNDS_CACHE_SIZE = 16  # clearances whose grown hut footprints World.hut_bounds keeps
+WELL_SIZE = 8
+CHEST_SIZE = 6
+SHARD_SIZE = 3
+WELL_HEAL_TIME = 1.5
+WELL_HEAL_RADIUS = 20
+CHEST_OPEN_TIME = 0.8
+CHEST_INTERACT_RADIUS = 18
+SHARD_COLLECT_RADIUS = 12
+WELL_NOISE_STRENGTH = 0.7
+CHEST_NOISE_STRENGTH = 1.4
+VILLAGER_ALARM_NOISE_STRENGTH = 0.9
+
+ROAD_WIDTH = 4
+ROAD_SPEED_MULT = 1.15
+KNIGHT_CANOPY_SPEED_MULT = 0.9
+ROAD_SAMPLING_RADIUS = 6
+ROAD_NODE_MERGE_RADIUS = 1.0  # road endpoints/crossings closer than this share a graph node
+ROAD_BVH_LEAF_SIZE = 2
+ROAD_ROUTE_CACHE_SIZE = 256
+
+VILLAGER_IDLE_RADIUS = 12
+VILLAGER_SPEED = 110.0
+VILLAGER_COLLISION_RADIUS = 5.0
+VILLAGER_FEAR_RADIUS = 70
+VILLAGER_ARC_RADIUS = 80
+VILLAGER_ROAD_FLEE_TIME = 3.0
+VILLAGER_ROUTE_REACH = 4.0  # a fleeing villager this close to a road node heads for the next one
+VILLAGER_RESPAWN_INTERVAL = 28.0
+VILLAGER_RESPAWN_VARIANCE = 0.45
+VILLAGER_MANA_REWARD = 18.0
+
+LOS_SAMPLE_STEP = 8
+
+ARENA_PADDING = 40
+
+# Units / Macro AI
+MAX_UNITS = 18
+ENERGY_PER_SEC = 3.0
+SPAWN_INTERVAL = 1.5
+UNIT_VILLAGER_HUNT_RADIUS = 320.0
+ENEMY_VILLAGER_ATTACK_COOLDOWN = 0.8
+KNIGHT_CONTACT_DPS = 0.4
+KNIGHT_CONTACT_PUSH = 20.0
+TANK_KNOCKBACK = 8.0
+COMBAT_CELL_SIZE = 80.0
+
+# Separation steering: agents of one kind closer than the radius push each other
+# apart, scaled by strength and capped at max speed (px/s).
+UNIT_SEPARATION_RADIUS = 14.0
+UNIT_SEPARATION_STRENGTH = 220.0
+UNIT_SEPARATION_MAX_SPEED = 90.0
+VILLAGER_SEPARATION_RADIUS = 8.0
+VILLAGER_SEPARATION_STRENGTH = 160.0
+VILLAGER_SEPARATION_MAX_SPEED = 60.0
+
+# AI level of detail: units far from the knight, alarmed villages and channelling
+# seals think every Nth tick with the accumulated dt.
+AI_LOD_NEAR_RADIUS = 260.0
+AI_LOD_MID_RADIUS = 480.0
+AI_LOD_INTERVALS = (1, 2, 4)
+AI_LOD_PROMOTE_HOLD = 1.0
+
+# Behaviour traits (all optional): "howls" on first detection, "hears_noise" to
+# investigate noise while idle, "patrol" of "hotspot" (most suspicious cell) or
+# "ring" (castle anchors), "knockback" when struck, "reveals" for priest
+# reveal and ranged bolts.
+UNIT_DATA = {
+    "SCOUT": {
+        "size": 4,
+        "speed": 150.0,
+        "hp": 1,
+        "detection": 80.0,
+        "cost": 10,
+        "color": (235, 200, 90),
+        "howls": True,
+        "hears_noise": True,
+        "patrol": "hotspot",
+    },
+    "TANK": {
+        "size": 5,
+        "speed": 95.0,
+        "hp": 3,
+        "detection": 60.0,
+        "cost": 25,
+        "color": (210, 80, 70),
+        "knockback": True,
+    },
+    "PRIEST": {
+        "size": 4,
+        "speed": 120.0,
+        "hp": 2,
+        "detection": 70.0,
+        "cost": 20,
+        "color": (210, 210, 255),
+        "reveals": True,
+    },
+}
+
+UNIT_IDLE, UNIT_CHASE, UNIT_INVESTIGATE, UNIT_SPIRAL, UNIT_HUNT = range(5)
+UNIT_STATE_NAMES = ("idle", "chase", "investigate", "spiral", "hunt")
+VILLAGER_IDLE, VILLAGER_FLEE = range(2)
+VILLAGER_STATE_NAMES = ("idle", "flee")
+
+PRIEST_REVEAL_RADIUS = 40.0
+PRIEST_REVEAL_TIME = 0.6
+PRIEST_REVEAL_DURATION = 1.5
+PRIEST_ATTACK_RANGE = 230.0
+PRIEST_ATTACK_COOLDOWN = 1.8
+PRIEST_ATTACK_DAMAGE = 0.6
+KNIGHT_CANOPY_DETECTION_MULT = 0.65
+
+SPIRAL_SEARCH_TIME = 4.0
+SPIRAL_RADIUS_SPEED = 35.0
+SPIRAL_ANGULAR_SPEED = 3.0
+
+# Squads: idle, hunting and searching units within SQUAD_LINK_RADIUS of each other
+# move as one under a leader; members farther than SQUAD_BREAK_RADIUS from it
+# split off. Membership is revised every SQUAD_REFORM_TICKS ticks.
+SQUAD_LINK_RADIUS = 70.0
+SQUAD_BREAK_RADIUS = 120.0
+SQUAD_MAX_SIZE = 6
+SQUAD_SPACING = 16.0
+SQUAD_REFORM_TICKS = 10
+
+# Knight navigation (opt-in): the planner grid's cell size, how many cells it may
+# settle per tick, the wall-clock cap per tick in seconds that interactive play
+# may opt in to (it makes runs timing-dependent), how many cells ahead waypoint
+# smoothing looks, and how close counts as reached.
+NAV_CELL_SIZE = 8
+NAV_EXPANSIONS_PER_TICK = 1000
+NAV_TIME_BUDGET = 0.002
+NAV_SMOOTH_LOOKAHEAD = 24
+NAV_ARRIVE_RADIUS = 6.0
+
+# Vectorised environments: simulation ticks per step, the tick limit after which
+# an episode is cut off, and the reward weights (per seal broken, per point of
+# knight HP gained or lost, and on victory or defeat).
+VEC_FRAME_SKIP = 4
+VEC_MAX_TICKS = FPS * 600
+VEC_REWARD_SEAL = 1.0
+VEC_REWARD_HP = 0.1
+VEC_REWARD_VICTORY = 5.0
+VEC_REWARD_DEFEAT = -5.0
+
+# Observation rasters: default pixels per side, and the suspicion level drawn as 1.0.
+OBS_RESOLUTION = 128
+OBS_SUSPICION_SCALE = 100.0
+
+NOISE_RING_DURATION = 0.4
+NOISE_RING_MAX_RADIUS = 60
+NOISE_RING_MIN_RADIUS = 20
+NOISE_MERGE_RADIUS = 12.0
+NOISE_INVESTIGATE_RADIUS = 180.0
+
+SUS_DECAY_PER_SEC = 0.25
+SUS_NOISE_SCALE = 80.0
+SUS_SEAL_BONUS = 25.0
+SUS_REVEAL_BONUS = 60.0
+SUS_CELL_SIZE = 30
+SUS_STAMP_RADIUS = 150.0
+SUS_ANCHOR_START = 10.0
+SUS_DIFFUSION_PER_SEC = 0.0  # > 0 spreads suspicion to neighbouring cells
+
+KERNEL_TOLERANCE = 1e-9
+
+# Spectator feed: positions are sent as uint16 in 1/SPECTATOR_QUANTUM pixel steps.
+SPECTATOR_QUANTUM = 8
+SPECTATOR_SUSPICION_SCALE = 100.0  # suspicion is sent as a uint8 level, 255 at this value and above
+SPECTATOR_MAX_BACKLOG = 1 << 20  # bytes queued for a slow client before it is dropped
+SPECTATOR_KEYFRAME = 1
+SPECTATOR_DELTA = 2
+
+# Structured event log: categories are bit flags, each event kind belongs to one.
+EVENT_AI = 1
+EVENT_COMBAT = 2
+EVENT_OBJECTIVE = 4
+EVENT_ALL = EVENT_AI | EVENT_COMBAT | EVENT_OBJECTIVE
+EVENT_CATEGORIES = {"ai": EVENT_AI, "combat": EVENT_COMBAT, "objective": EVENT_OBJECTIVE}
+EVENT_SCOUT_HOWL, EVENT_PRIEST_REVEAL, EVENT_UNIT_KILLED, EVENT_VILLAGER_KILLED, EVENT_SEAL_BROKEN = range(5)
+# (name, category, payload field name) per event kind.
+EVENT_KINDS = (
+    ("scout_howl", EVENT_AI, None),
+    ("priest_reveal", EVENT_AI, None),
+    ("unit_killed", EVENT_COMBAT, "unit_type"),
+    ("villager_killed", EVENT_COMBAT, "killer"),
+    ("seal_broken", EVENT_OBJECTIVE, "seals_broken"),
+)
+EVENT_RING_SIZE = 4096  # records buffered before the oldest are overwritten
+EVENT_FLUSH_INTERVAL = 0.5  # seconds between background flushes
+
+# State digests: positions, timers, HP and energy are hashed in 1/DIGEST_QUANTUM steps.
+DIGEST_QUANTUM = 1000
+DIGEST_EVERY = 30
+# Golden files live next to the package, at the repository root.
+DIGEST_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "digests")
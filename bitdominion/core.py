@@ -0,0 +1,113 @@
+"""Entity ids, pooled entity lists and the uniform spatial hash."""
+
+import itertools
+from typing import Callable, Dict, Generic, Iterator, List, Tuple, TypeVar
+
+from .geometry import Vector2
+
+T = TypeVar("T")
+
+# Stable ids for streamed entities; pooled objects draw a fresh id when reused.
+ENTITY_IDS = itertools.count(1)
+
+
+def next_entity_id() -> int:
+    return next(ENTITY_IDS)
+
+
+def reset_entity_ids(start: int = 1) -> Iterator[int]:
+    """Restart entity numbering at ``start`` and return the previous counter (for restore_entity_ids)."""
+    global ENTITY_IDS
+    previous = ENTITY_IDS
+    ENTITY_IDS = itertools.count(start)
+    return previous
+
+
+def restore_entity_ids(counter: Iterator[int]) -> None:
+    global ENTITY_IDS
+    ENTITY_IDS = counter
+
+
+class EntityPool(Generic[T]):
+    """Free list of retired entity instances, recycled through their reset() method.
+
+    Live entities stay in ordinary dense lists owned by their systems; compact()
+    and step() remove finished entries by swapping in the last element, so no
+    list is rebuilt and removal order is not preserved.
+    """
+
+    def __init__(self, factory: Callable[..., T]) -> None:
+        self.factory = factory
+        self.free: List[T] = []
+
+    def acquire(self, *args) -> T:
+        if self.free:
+            item = self.free.pop()
+            item.reset(*args)
+            return item
+        return self.factory(*args)
+
+    def release(self, item: T) -> None:
+        self.free.append(item)
+
+    def release_all(self, items: List[T]) -> None:
+        self.free.extend(items)
+        items.clear()
+
+    def compact(self, items: List[T]) -> None:
+        """Swap-remove every entity whose alive flag is cleared."""
+        i = 0
+        while i < len(items):
+            if items[i].alive:
+                i += 1
+                continue
+            self.free.append(swap_remove(items, i))
+
+    def step(self, items: List[T], dt: float) -> None:
+        """Advance timed effects and swap-remove those whose update() reports completion."""
+        i = 0
+        while i < len(items):
+            if items[i].update(dt):
+                self.free.append(swap_remove(items, i))
+            else:
+                i += 1
+
+
+def swap_remove(items: List[T], index: int) -> T:
+    item = items[index]
+    last = items.pop()
+    if index < len(items):
+        items[index] = last
+    return item
+
+
+class SpatialHash(Generic[T]):
+    """Uniform grid bucketing items by position for radius queries."""
+
+    def __init__(self, cell_size: float) -> None:
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int], List[T]] = {}
+
+    def clear(self) -> None:
+        self.cells.clear()
+
+    def insert(self, item: T, pos: Vector2) -> None:
+        key = (int(pos.x // self.cell_size), int(pos.y // self.cell_size))
+        bucket = self.cells.get(key)
+        if bucket is None:
+            self.cells[key] = [item]
+        else:
+            bucket.append(item)
+
+    def query(self, pos: Vector2, radius: float) -> Iterator[T]:
+        """Yield items in every cell touched by the circle; callers do the exact distance test."""
+        size = self.cell_size
+        min_cx = int((pos.x - radius) // size)
+        max_cx = int((pos.x + radius) // size)
+        min_cy = int((pos.y - radius) // size)
+        max_cy = int((pos.y + radius) // size)
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket:
+                    yield from bucket
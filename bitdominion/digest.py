@@ -0,0 +1,223 @@
+"""Deterministic state digests and the golden scenario runs that check them."""
+
+import hashlib
+import json
+import os
+import random
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .config import CASTLE_POS, DIGEST_EVERY, DIGEST_QUANTUM, FPS, HEIGHT, WIDTH
+from .core import reset_entity_ids, restore_entity_ids
+from .geometry import Vector2
+from .match import Match
+
+
+class StateCheckpoint(NamedTuple):
+    tick: int
+    digest: str
+    entities: Dict[str, str]
+
+
+def _q(value: float) -> int:
+    return int(round(value * DIGEST_QUANTUM))
+
+
+def state_records(game: "Match") -> Iterator[Tuple[str, Tuple[int, ...]]]:
+    """Quantized (label, values) for every piece of simulation state worth comparing."""
+    knight = game.knight
+    last_known = game.last_known_pos
+    yield "game", (
+        game.broken_seals,
+        game.shield_active,
+        game.victory,
+        game.defeat,
+        _q(game.last_known_timer),
+        _q(last_known.x) if last_known is not None else -1,
+        _q(last_known.y) if last_known is not None else -1,
+    )
+    yield "knight", (
+        _q(knight.pos.x),
+        _q(knight.pos.y),
+        _q(knight.vel.x),
+        _q(knight.vel.y),
+        _q(knight.hp),
+        _q(knight.swing_timer),
+        _q(knight.swing_cooldown),
+        _q(knight.castle_timer),
+    )
+    ai = game.ai
+    yield "ai", (_q(ai.energy), _q(ai.spawn_timer), ai.spawn_count)
+    grid = np.rint(game.suspicion.grid * DIGEST_QUANTUM).astype(np.int64)
+    yield "suspicion", (zlib.crc32(grid.tobytes()),)
+    for index, village in enumerate(game.world.villages):
+        yield f"village/{index}", (_q(village.spawn_timer), village.population, village.alarmed)
+        for villager in village.villagers:
+            if not villager.alive:
+                continue
+            yield f"villager/{villager.uid}", (
+                villager.state,
+                villager.alarmed,
+                _q(villager.pos.x),
+                _q(villager.pos.y),
+                _q(villager.calm_timer),
+                _q(villager.road_timer),
+                _q(villager.wander_timer),
+            )
+    for unit in ai.units:
+        if not unit.alive:
+            continue
+        yield f"unit/{unit.uid}", (
+            unit.kind.index,
+            unit.state,
+            _q(unit.pos.x),
+            _q(unit.pos.y),
+            _q(unit.vel.x),
+            _q(unit.vel.y),
+            _q(unit.hp),
+            _q(unit.state_timer),
+            _q(unit.detect_timer),
+            unit.squad.leader.uid if unit.squad is not None else 0,
+        )
+    for seal in game.seals:
+        yield f"seal/{seal.uid}", (seal.channeling, _q(seal.progress))
+
+
+def state_checkpoint(game: "Match") -> StateCheckpoint:
+    entities = {label: f"{zlib.crc32(repr(values).encode()):08x}" for label, values in state_records(game)}
+    digest = hashlib.sha1()
+    for label in sorted(entities):
+        digest.update(f"{label}={entities[label]};".encode())
+    return StateCheckpoint(game.tick, digest.hexdigest()[:16], entities)
+
+
+def _script_idle(game: "Match", rng: random.Random, tick: int) -> Optional[Vector2]:
+    return None
+
+
+def _script_wander(game: "Match", rng: random.Random, tick: int) -> Optional[Vector2]:
+    if tick % 90 == 1:
+        return Vector2(rng.uniform(60, WIDTH - 60), rng.uniform(60, HEIGHT - 60))
+    return None
+
+
+def _script_seals(game: "Match", rng: random.Random, tick: int) -> Optional[Vector2]:
+    if tick % 30 != 1:
+        return None
+    knight = game.knight
+    if not game.seals:
+        return CASTLE_POS.copy()
+    return min(game.seals, key=lambda seal: seal.pos.distance_squared_to(knight.pos)).pos.copy()
+
+
+def _script_villages(game: "Match", rng: random.Random, tick: int) -> Optional[Vector2]:
+    villages = game.world.villages
+    if tick % 240 != 1 or not villages:
+        return None
+    return villages[(tick // 240) % len(villages)].center.copy()
+
+
+# Seeded headless runs with golden digests under DIGEST_DIR: name -> (seed, ticks, knight orders).
+DIGEST_SCENARIOS: Dict[str, Tuple[int, int, Callable[["Match", random.Random, int], Optional[Vector2]]]] = {
+    "idle": (7, 1800, _script_idle),
+    "wander": (11, 2400, _script_wander),
+    "seals": (23, 3600, _script_seals),
+    "villages": (31, 2400, _script_villages),
+}
+
+
+def run_scenario(name: str, every: int = DIGEST_EVERY) -> List[StateCheckpoint]:
+    """Play a digest scenario from a fresh seed and checkpoint the state every ``every`` ticks."""
+    seed, ticks, script = DIGEST_SCENARIOS[name]
+    saved_state = random.getstate()
+    saved_ids = reset_entity_ids()
+    random.seed(seed)
+    try:
+        game = Match()
+        rng = random.Random(seed)
+        step = 1.0 / FPS
+        checkpoints = [state_checkpoint(game)]
+        for tick in range(1, ticks + 1):
+            if game.victory or game.defeat:
+                break
+            target = script(game, rng, tick)
+            if target is not None:
+                game.commands.put(target)
+            game.update(step, tick * step)
+            if game.tick % every == 0:
+                checkpoints.append(state_checkpoint(game))
+        game.close()
+    finally:
+        restore_entity_ids(saved_ids)
+        random.setstate(saved_state)
+    return checkpoints
+
+
+def write_digests(path: str, name: str, every: int, checkpoints: List[StateCheckpoint]) -> None:
+    seed, ticks, _ = DIGEST_SCENARIOS[name]
+    with open(path, "w", encoding="utf-8") as handle:
+        header = {"scenario": name, "seed": seed, "ticks": ticks, "every": every, "quantum": DIGEST_QUANTUM}
+        handle.write(json.dumps(header) + "\n")
+        for checkpoint in checkpoints:
+            handle.write(json.dumps(checkpoint._asdict(), sort_keys=True, separators=(",", ":")) + "\n")
+
+
+def read_digests(path: str) -> Tuple[Dict[str, object], List[StateCheckpoint]]:
+    with open(path, encoding="utf-8") as handle:
+        header = json.loads(handle.readline())
+        checkpoints = [StateCheckpoint(**json.loads(line)) for line in handle if line.strip()]
+    return header, checkpoints
+
+
+def compare_digests(expected: List[StateCheckpoint], actual: List[StateCheckpoint]) -> Optional[str]:
+    """Describe the first shared checkpoint tick where two runs diverge, or return None if they match."""
+    by_tick = {checkpoint.tick: checkpoint for checkpoint in actual}
+    for want in expected:
+        got = by_tick.get(want.tick)
+        if got is None or want.digest == got.digest:
+            continue
+        labels = sorted(set(want.entities) | set(got.entities))
+        diverged: List[str] = []
+        for label in labels:
+            if label not in got.entities:
+                diverged.append(f"{label} missing")
+            elif label not in want.entities:
+                diverged.append(f"{label} unexpected")
+            elif want.entities[label] != got.entities[label]:
+                diverged.append(f"{label} differs")
+        more = f" (+{len(diverged) - 1} more)" if len(diverged) > 1 else ""
+        return f"diverged at tick {got.tick}: {diverged[0] if diverged else 'digest differs'}{more}"
+    if not expected or not actual:
+        return None if expected == actual else "one run has no checkpoints"
+    stride = max(_stride(expected), _stride(actual))
+    if abs(expected[-1].tick - actual[-1].tick) >= stride:
+        return f"run length differs: expected last checkpoint at tick {expected[-1].tick}, got {actual[-1].tick}"
+    return None
+
+
+def _stride(checkpoints: List[StateCheckpoint]) -> int:
+    return checkpoints[1].tick - checkpoints[0].tick if len(checkpoints) > 1 else 1
+
+
+def record_digests(directory: str, names: Iterable[str], every: int) -> None:
+    os.makedirs(directory, exist_ok=True)
+    for name in names:
+        checkpoints = run_scenario(name, every)
+        write_digests(os.path.join(directory, f"{name}.jsonl"), name, every, checkpoints)
+        print(f"{name}: {len(checkpoints)} checkpoints, final {checkpoints[-1].digest}")
+
+
+def check_digests(directory: str, names: Iterable[str]) -> List[str]:
+    """Replay scenarios with the current engine and describe every divergence from the golden files."""
+    failures: List[str] = []
+    for name in names:
+        header, expected = read_digests(os.path.join(directory, f"{name}.jsonl"))
+        if header.get("quantum") != DIGEST_QUANTUM:
+            failures.append(f"{name}: golden file quantum {header.get('quantum')} != {DIGEST_QUANTUM}")
+            continue
+        problem = compare_digests(expected, run_scenario(name, int(header["every"])))
+        if problem is not None:
+            failures.append(f"{name}: {problem}")
+    return failures
@@ -0,0 +1,117 @@
+"""Structured gameplay event log written by a background thread."""
+
+import json
+import os
+import struct
+import threading
+from typing import Optional
+
+from .config import EVENT_ALL, EVENT_FLUSH_INTERVAL, EVENT_KINDS, EVENT_RING_SIZE
+from .geometry import Vector2
+
+
+class EventLog:
+    """Typed gameplay events in a preallocated ring, flushed to a file by a background writer.
+
+    emit() packs one fixed-size RECORD (tick, kind, entity uid, x, y, payload) into
+    the ring under a lock, so it neither allocates nor does I/O. Kinds whose
+    category is not enabled return after a single bit test. When the writer falls
+    a full ring behind, the oldest records are overwritten and counted in
+    ``dropped``. Binary files start with BINARY_MAGIC followed by raw records;
+    JSONL files hold one object per event, with the payload under the kind's field
+    name from EVENT_KINDS. A path of "-" writes to stdout.
+    """
+
+    RECORD = struct.Struct("<IBIffi")
+    BINARY_MAGIC = b"BFEV1\n"
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        fmt: str = "jsonl",
+        categories: int = EVENT_ALL,
+        capacity: int = EVENT_RING_SIZE,
+    ) -> None:
+        if fmt not in ("jsonl", "binary"):
+            raise ValueError(f"unknown event log format: {fmt}")
+        self.mask = categories if path is not None else 0
+        self.fmt = fmt
+        self.tick = 0
+        self.capacity = capacity
+        self.ring = bytearray(capacity * self.RECORD.size)
+        self.written = 0
+        self.read = 0
+        self.dropped = 0
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closing = False
+        self.stream = None
+        self.writer: Optional[threading.Thread] = None
+        if self.mask:
+            if path == "-":
+                self.stream = os.fdopen(os.dup(1), "wb")
+            else:
+                self.stream = open(path, "wb")
+            if fmt == "binary":
+                self.stream.write(self.BINARY_MAGIC)
+            self.writer = threading.Thread(target=self._run, name="event-log", daemon=True)
+            self.writer.start()
+
+    def emit(self, kind: int, uid: int, pos: Vector2, payload: int = 0) -> None:
+        if not self.mask & EVENT_KINDS[kind][1]:
+            return
+        with self.lock:
+            seq = self.written
+            if seq - self.read >= self.capacity:
+                self.read += 1
+                self.dropped += 1
+            self.RECORD.pack_into(
+                self.ring, (seq % self.capacity) * self.RECORD.size, self.tick, kind, uid, pos.x, pos.y, payload
+            )
+            self.written = seq + 1
+            pending = self.written - self.read
+        if pending == self.capacity // 2:
+            self.wake.set()
+
+    def close(self) -> None:
+        if self.writer is None:
+            return
+        self.closing = True
+        self.wake.set()
+        self.writer.join()
+        self.writer = None
+        self.stream.close()
+
+    def _run(self) -> None:
+        while True:
+            self.wake.wait(EVENT_FLUSH_INTERVAL)
+            self.wake.clear()
+            self._drain()
+            if self.closing:
+                return
+
+    def _drain(self) -> None:
+        size = self.RECORD.size
+        with self.lock:
+            start, end = self.read, self.written
+            first = start % self.capacity
+            count = end - start
+            if first + count <= self.capacity:
+                chunk = bytes(self.ring[first * size:(first + count) * size])
+            else:
+                chunk = bytes(self.ring[first * size:]) + bytes(self.ring[:(first + count - self.capacity) * size])
+            self.read = end
+        if not chunk:
+            return
+        if self.fmt == "binary":
+            self.stream.write(chunk)
+        else:
+            lines = []
+            for tick, kind, uid, x, y, payload in self.RECORD.iter_unpack(chunk):
+                name, _category, field_name = EVENT_KINDS[kind]
+                record = {"tick": tick, "event": name, "uid": uid, "x": round(x, 1), "y": round(y, 1)}
+                if field_name is not None:
+                    record[field_name] = payload
+                lines.append(json.dumps(record, separators=(",", ":")))
+            self.stream.write(("\n".join(lines) + "\n").encode("utf-8"))
+        self.stream.flush()
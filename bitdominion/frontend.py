@@ -0,0 +1,667 @@
+"""pygame frontend: window, input, rendering, frame capture and the spectator viewer.
+
+Everything that touches pygame lives here; the simulation package itself only
+needs the standard library and NumPy. Game wraps a Match with a window and an
+input loop, and draws the RenderSnapshot it publishes each tick.
+"""
+
+import json
+import math
+import os
+import queue
+import struct
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from .ai import SuspicionGrid
+from .config import (
+    CASTLE_POS,
+    CASTLE_RADIUS,
+    CASTLE_SHIELD_EXTRA,
+    CHEST_SIZE,
+    FPS,
+    HEIGHT,
+    KNIGHT_SIZE,
+    ROAD_WIDTH,
+    SHARD_SIZE,
+    SPECTATOR_KEYFRAME,
+    SUS_CELL_SIZE,
+    SWING_ARC_OFFSETS,
+    SWING_RANGE,
+    UNIT_CHASE,
+    WELL_SIZE,
+    WIDTH,
+)
+from .events import EventLog
+from .geometry import Vector2
+from .match import Match, RenderSnapshot
+from .spectator import SpectatorFeed, open_spectator_socket
+from .world import World, WorldRenderState
+
+
+# Frame capture: buffers in flight before frames are dropped, and encoder threads.
+CAPTURE_POOL_SIZE = 6
+CAPTURE_WORKERS = 3
+CAPTURE_PNG_LEVEL = 1
+
+DEBUG_TOGGLE_KEY = pygame.K_F1
+HUD_FONT_NAME = "arial"
+BACKGROUND_COLOR = (18, 18, 24)
+
+
+class SpriteBatch:
+    """Collects (sprite, position) pairs for a frame and submits them with one Surface.blits call.
+
+    Sprites are pre-rendered filled squares cached per (size, colour), i.e. one
+    per entity kind and colour state. The per-kind draw loops look them up in
+    ``sprites`` and append to ``items`` directly, so queueing an entity costs a
+    dict lookup and a list append. Outlines and other overlays go straight to
+    ``surface``.
+    """
+
+    def __init__(self, surface: pygame.Surface) -> None:
+        self.surface = surface
+        self.sprites: Dict[Tuple[int, Tuple[int, int, int]], Tuple[pygame.Surface, int]] = {}
+        self.items: List[Tuple[pygame.Surface, Tuple[int, int]]] = []
+
+    def sprite(self, size: int, color: Tuple[int, int, int]) -> Tuple[pygame.Surface, int]:
+        """Return the cached (surface, half size) for a filled square, rendering it on first use."""
+        entry = self.sprites.get((size, color))
+        if entry is None:
+            image = pygame.Surface((size, size))
+            if pygame.display.get_surface() is not None:
+                image = image.convert()
+            image.fill(color)
+            entry = self.sprites[(size, color)] = (image, size // 2)
+        return entry
+
+    def rect(self, x: float, y: float, size: int, color: Tuple[int, int, int]) -> None:
+        """Queue one size x size square centred on (x, y), matching ``Rect.center`` rounding."""
+        image, half = self.sprites.get((size, color)) or self.sprite(size, color)
+        self.items.append((image, (int(x + 0.5) - half, int(y + 0.5) - half)))
+
+    def flush(self) -> None:
+        self.surface.blits(self.items, doreturn=False)
+        self.items.clear()
+
+
+def draw_villagers(batch: SpriteBatch, states: Iterable[Tuple[float, float, bool]]) -> None:
+    calm, _ = batch.sprite(3, (240, 230, 170))
+    alarmed_image, half = batch.sprite(3, (255, 190, 120))
+    append = batch.items.append
+    for x, y, alarmed in states:
+        append((alarmed_image if alarmed else calm, (int(x + 0.5) - half, int(y + 0.5) - half)))
+
+
+def draw_circle_alpha(surface: pygame.Surface, color: Tuple[int, int, int, int], x: float, y: float, radius: int) -> None:
+    temp = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(temp, color, (radius, radius), radius, 2)
+    surface.blit(temp, (x - radius, y - radius))
+
+
+def draw_ping(surface: pygame.Surface, state: Tuple[float, float, int, int]) -> None:
+    x, y, radius, alpha = state
+    draw_circle_alpha(surface, (255, 150, 100, alpha), x, y, radius)
+
+
+def draw_pulse(surface: pygame.Surface, state: Tuple[float, float, int, int]) -> None:
+    x, y, radius, alpha = state
+    draw_circle_alpha(surface, (255, 230, 120, alpha), x, y, radius)
+
+
+def draw_seal(batch: SpriteBatch, state: Tuple[float, float, Optional[float]]) -> None:
+    x, y, pct = state
+    batch.rect(x, y, 10, (220, 190, 60))
+    if pct is not None:
+        rect = pygame.Rect(0, 0, 30, 30)
+        rect.center = (x, y)
+        start_angle = -math.pi / 2
+        end_angle = start_angle + pct * 2 * math.pi
+        pygame.draw.arc(batch.surface, (255, 255, 255), rect, start_angle, end_angle, 2)
+
+
+def draw_knight(batch: SpriteBatch, state: Tuple[float, float, Optional[Tuple[float, float]]]) -> None:
+    x, y, _swing = state
+    batch.rect(x, y, KNIGHT_SIZE, (60, 220, 80))
+
+
+def draw_swing(surface: pygame.Surface, state: Tuple[float, float, Optional[Tuple[float, float]]]) -> None:
+    cx, cy, swing = state
+    if swing is None:
+        return
+    radius = SWING_RANGE
+    dx, dy = swing
+    points = [(cx, cy)]
+    for cos_a, sin_a in SWING_ARC_OFFSETS:
+        points.append((cx + (dx * cos_a - dy * sin_a) * radius, cy + (dx * sin_a + dy * cos_a) * radius))
+    pygame.draw.polygon(surface, (120, 255, 120, 100), points)
+
+
+def draw_units(batch: SpriteBatch, states: Iterable[Tuple[float, float, int, Tuple[int, int, int], bool]]) -> None:
+    sprites = batch.sprites
+    append = batch.items.append
+    for x, y, size, color, revealing in states:
+        image, half = sprites.get((size, color)) or batch.sprite(size, color)
+        cx = int(x + 0.5)
+        cy = int(y + 0.5)
+        append((image, (cx - half, cy - half)))
+        if revealing:
+            pygame.draw.circle(batch.surface, (255, 255, 255), (cx, cy), 10, 1)
+
+
+def draw_suspicion(
+    surface: pygame.Surface,
+    font: pygame.font.Font,
+    suspicion: SuspicionGrid,
+    state: Tuple[np.ndarray, float, float, float],
+) -> None:
+    grid, peak_x, peak_y, peak_value = state
+    heat = pygame.Surface((suspicion.cols, suspicion.rows), pygame.SRCALPHA)
+    heat.fill((220, 40, 40, 0))
+    alpha = pygame.surfarray.pixels_alpha(heat)
+    alpha[:, :] = (np.minimum(1.0, grid.T / 100.0) * 150.0).astype(np.uint8)
+    del alpha
+    surface.blit(
+        pygame.transform.scale(heat, (suspicion.cols * SUS_CELL_SIZE, suspicion.rows * SUS_CELL_SIZE)), (0, 0)
+    )
+    for anchor in suspicion.anchors:
+        pygame.draw.circle(surface, (200, 80, 80), anchor.xy, 4)
+    pygame.draw.rect(
+        surface,
+        (255, 120, 120),
+        pygame.Rect(int(peak_x - SUS_CELL_SIZE / 2), int(peak_y - SUS_CELL_SIZE / 2), SUS_CELL_SIZE, SUS_CELL_SIZE),
+        1,
+    )
+    txt = font.render(str(int(peak_value)), True, (255, 255, 255))
+    surface.blit(txt, (peak_x + SUS_CELL_SIZE / 2 + 4, peak_y - 12))
+
+
+class WorldRenderer:
+    """pygame views of a World: cached background and canopy layers plus per-frame world sprites."""
+
+    def __init__(self, world: World) -> None:
+        self.world = world
+        self.base_surface: Optional[pygame.Surface] = None
+        self.canopy_overlay: Optional[pygame.Surface] = None
+
+    def draw_base(self, surface: pygame.Surface) -> None:
+        """Blit the background and static geometry (trees, roads, huts, wells); safe from the render thread."""
+        if self.base_surface is None:
+            self.base_surface = self._render_base()
+        surface.blit(self.base_surface, (0, 0))
+
+    def _render_base(self) -> pygame.Surface:
+        world = self.world
+        base = pygame.Surface((WIDTH, HEIGHT))
+        base.fill(BACKGROUND_COLOR)
+        for patch in world.forest_patches:
+            for tree in patch.trees:
+                pygame.draw.circle(base, (24, 70, 34), tree.pos.xy, int(tree.radius))
+        for start, end in world.road_segments:
+            pygame.draw.line(base, (90, 90, 90), start.xy, end.xy, ROAD_WIDTH)
+        for village in world.villages:
+            for hut in village.huts:
+                pygame.draw.rect(base, (140, 90, 60), tuple(hut.rect))
+            well_rect = pygame.Rect(0, 0, WELL_SIZE, WELL_SIZE)
+            well_rect.center = village.well.pos.xy
+            pygame.draw.rect(base, (70, 140, 200), well_rect)
+        return base.convert() if pygame.display.get_surface() is not None else base
+
+    def draw_canopy(self, surface: pygame.Surface) -> None:
+        if self.canopy_overlay is None:
+            overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            for tree in self.world.tree_shapes:
+                pygame.draw.circle(overlay, (10, 60, 20, 90), (tree.x, tree.y), int(tree.canopy_radius))
+            self.canopy_overlay = overlay
+        surface.blit(self.canopy_overlay, (0, 0))
+
+    @staticmethod
+    def draw_dynamic(batch: SpriteBatch, state: WorldRenderState) -> None:
+        rect = batch.rect
+        for x, y, opened in state.chests:
+            rect(x, y, CHEST_SIZE, (200, 170, 60) if not opened else (160, 130, 50))
+        for x, y in state.alarms:
+            pygame.draw.polygon(batch.surface, (200, 30, 30), [(x, y - 18), (x - 6, y - 6), (x + 6, y - 6)])
+        for x, y, dim in state.shards:
+            rect(x, y, SHARD_SIZE, (220, 220, 240) if dim else (255, 255, 255))
+        draw_villagers(batch, state.villagers)
+
+    def draw_debug(self, surface: pygame.Surface) -> None:
+        world = self.world
+        for patch in world.forest_patches:
+            for tree in patch.trees:
+                pygame.draw.circle(surface, (40, 160, 70), tree.pos.xy, int(tree.radius), 1)
+        for village in world.villages:
+            pygame.draw.circle(surface, (240, 120, 120), village.center.xy, 4)
+            for hut in village.huts:
+                pygame.draw.rect(surface, (220, 160, 120), tuple(hut.rect), 1)
+        for start, end in world.road_segments:
+            pygame.draw.line(surface, (150, 150, 150), start.xy, end.xy, 1)
+
+
+class FrameRecorder:
+    """Copies rendered frames into pooled buffers and encodes them on worker threads.
+
+    capture() only copies pixels, and only when a buffer is free. If every
+    buffer is still waiting to be encoded, the frame is dropped and counted,
+    so the game never blocks on I/O. "png" writes frame_<tick>.png files, and
+    tick gaps show where frames were dropped. "raw" appends one header (tick,
+    width, height) plus RGB24 rows per frame to frames.raw, written in order by a
+    single worker. Encoding is plain zlib, which releases the GIL while it
+    compresses.
+    """
+
+    RAW_HEADER = struct.Struct("<IHH")
+
+    def __init__(self, directory: str, fmt: str = "png", every: int = 1, pool_size: int = CAPTURE_POOL_SIZE) -> None:
+        if fmt not in ("png", "raw"):
+            raise ValueError(f"unknown capture format: {fmt}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.every = max(1, every)
+        self.pool_size = pool_size
+        self.free: "queue.SimpleQueue[np.ndarray]" = queue.SimpleQueue()
+        self.shifts: Tuple[int, int, int] = (16, 8, 0)
+        self.allocated = False
+        self.captured = 0
+        self.dropped = 0
+        self.error: Optional[BaseException] = None
+        self.stream = open(os.path.join(directory, "frames.raw"), "wb") if fmt == "raw" else None
+        self.executor = ThreadPoolExecutor(max_workers=1 if fmt == "raw" else CAPTURE_WORKERS, thread_name_prefix="capture")
+
+    def capture(self, surface: pygame.Surface, tick: int) -> None:
+        if tick % self.every:
+            return
+        if self.error is not None:
+            raise self.error
+        if not self.allocated:
+            self._allocate(surface)
+        try:
+            buffer = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        # 32-bit surfaces copy packed pixels (one word each); others fall back to RGB triples.
+        pixels = pygame.surfarray.pixels2d(surface) if buffer.ndim == 2 else pygame.surfarray.pixels3d(surface)
+        np.copyto(buffer, pixels)
+        del pixels
+        self.captured += 1
+        future = self.executor.submit(self._encode, buffer, tick)
+        future.add_done_callback(lambda done, buffer=buffer: self._release(done, buffer))
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=True)
+        if self.stream is not None:
+            self.stream.close()
+        if self.error is not None:
+            raise self.error
+
+    def summary(self) -> str:
+        return f"captured {self.captured} frames to {self.directory}, dropped {self.dropped}"
+
+    def _allocate(self, surface: pygame.Surface) -> None:
+        width, height = surface.get_size()
+        if surface.get_bytesize() == 4:
+            shape: Tuple[int, ...] = (width, height)
+            dtype = np.uint32
+            self.shifts = tuple(surface.get_shifts()[:3])
+        else:
+            shape = (width, height, 3)
+            dtype = np.uint8
+        for _ in range(self.pool_size):
+            self.free.put(np.empty(shape, dtype=dtype))
+        self.allocated = True
+
+    def _release(self, done: Future, buffer: np.ndarray) -> None:
+        if done.exception() is not None and self.error is None:
+            self.error = done.exception()
+        self.free.put(buffer)
+
+    def _rgb_rows(self, buffer: np.ndarray) -> np.ndarray:
+        if buffer.ndim == 3:
+            return np.ascontiguousarray(buffer.transpose(1, 0, 2))
+        packed = buffer.T
+        rgb = np.empty(packed.shape + (3,), dtype=np.uint8)
+        for channel, shift in enumerate(self.shifts):
+            rgb[..., channel] = packed >> shift
+        return rgb
+
+    def _encode(self, buffer: np.ndarray, tick: int) -> None:
+        rgb = self._rgb_rows(buffer)
+        height, width, _ = rgb.shape
+        if self.fmt == "raw":
+            self.stream.write(self.RAW_HEADER.pack(tick, width, height))
+            self.stream.write(rgb.tobytes())
+            return
+        with open(os.path.join(self.directory, f"frame_{tick:06d}.png"), "wb") as handle:
+            handle.write(self._png(rgb))
+
+    @staticmethod
+    def _png(rgb: np.ndarray) -> bytes:
+        height, width, _ = rgb.shape
+        rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)  # leading 0: no row filter
+        rows[:, 1:] = rgb.reshape(height, width * 3)
+
+        def chunk(tag: bytes, data: bytes) -> bytes:
+            return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+        header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+        return (
+            b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(rows.tobytes(), CAPTURE_PNG_LEVEL))
+            + chunk(b"IEND", b"")
+        )
+
+
+class Game(Match):
+    """A Match with a pygame window: mouse orders, keyboard toggles, rendering and frame capture."""
+
+    def __init__(
+        self,
+        threaded: bool = False,
+        spectator_address: Optional[str] = None,
+        events: Optional[EventLog] = None,
+        recorder: Optional[FrameRecorder] = None,
+        knight_nav: bool = False,
+        nav_time_budget: Optional[float] = None,
+    ) -> None:
+        pygame.init()
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        pygame.display.set_caption("bitfield_prototype_v3_objectives_ai")
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.SysFont(HUD_FONT_NAME, 18)
+        self.big_font = pygame.font.SysFont(HUD_FONT_NAME, 48)
+        super().__init__(spectator_address, events, knight_nav, nav_time_budget)
+        self.renderer = WorldRenderer(self.world)
+        self.show_canopy = False
+        self.threaded = threaded
+        self.recorder = recorder
+        self.sprites = SpriteBatch(self.screen)
+
+    def run(self) -> None:
+        if self.threaded:
+            self.run_threaded()
+            return
+        total_time = 0.0
+        while self.running:
+            dt = self.clock.tick(FPS) / 1000.0
+            total_time += dt
+            self.handle_events()
+            if not (self.victory or self.defeat):
+                self.update(dt, total_time)
+            self.draw()
+        self.close()
+
+    def close(self) -> None:
+        super().close()
+        if self.recorder is not None:
+            self.recorder.close()
+        pygame.quit()
+
+    def run_headless(self, ticks: int) -> None:
+        """Step ``ticks`` fixed 1/FPS ticks as fast as possible, drawing only when capturing."""
+        step = 1.0 / FPS
+        try:
+            for tick in range(1, ticks + 1):
+                pygame.event.pump()
+                if self.victory or self.defeat:
+                    break
+                self.update(step, tick * step)
+                if self.recorder is not None and self.tick % self.recorder.every == 0:
+                    self.draw()
+        finally:
+            self.close()
+
+    def run_threaded(self) -> None:
+        """Simulate at a fixed tick on a worker thread; this thread renders the latest snapshot."""
+        self.snapshots.publish(self.snapshot())
+        worker = threading.Thread(target=self._simulate, name="simulation", daemon=True)
+        worker.start()
+        try:
+            while self.running:
+                self.clock.tick(FPS)
+                self.handle_events()
+                snapshot = self.snapshots.latest()
+                if snapshot is not None:
+                    self.draw(snapshot)
+                if self.sim_error is not None:
+                    raise self.sim_error
+        finally:
+            self.running = False
+            worker.join()
+            self.close()
+
+    def handle_events(self) -> None:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    self.running = False
+                elif event.key == DEBUG_TOGGLE_KEY:
+                    self.debug_overlay = not self.debug_overlay
+                elif event.key == pygame.K_b:
+                    self.show_canopy = not self.show_canopy
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                self.commands.put(Vector2(event.pos))
+
+    def draw(self, snapshot: Optional[RenderSnapshot] = None) -> None:
+        if snapshot is None:
+            snapshot = self.snapshot()
+        batch = self.sprites
+        renderer = self.renderer
+        renderer.draw_base(self.screen)
+        renderer.draw_dynamic(batch, snapshot.world)
+        batch.flush()
+        if self.show_canopy:
+            renderer.draw_canopy(self.screen)
+        pygame.draw.circle(self.screen, (130, 0, 180), CASTLE_POS.xy, CASTLE_RADIUS)
+        if snapshot.shield_active:
+            pygame.draw.circle(self.screen, (150, 90, 220), CASTLE_POS.xy, CASTLE_RADIUS + CASTLE_SHIELD_EXTRA, 2)
+        for pulse in snapshot.pulses:
+            draw_pulse(self.screen, pulse)
+        for ping in snapshot.pings:
+            draw_ping(self.screen, ping)
+        for seal in snapshot.seals:
+            draw_seal(batch, seal)
+        draw_units(batch, snapshot.units)
+        draw_knight(batch, snapshot.knight)
+        batch.flush()
+        draw_swing(self.screen, snapshot.knight)
+        if self.debug_overlay:
+            renderer.draw_debug(self.screen)
+            if snapshot.suspicion is not None:
+                draw_suspicion(self.screen, self.font, self.suspicion, snapshot.suspicion)
+            for start, end in snapshot.los_lines:
+                pygame.draw.line(self.screen, (120, 200, 200), start, end, 1)
+            if len(snapshot.nav_path) > 1:
+                pygame.draw.lines(self.screen, (120, 160, 255), False, snapshot.nav_path, 1)
+        if snapshot.victory:
+            text = self.big_font.render("Victory!", True, (120, 255, 120))
+            self.screen.blit(text, (WIDTH / 2 - text.get_width() / 2, HEIGHT / 2 - text.get_height() / 2))
+        elif snapshot.defeat:
+            text = self.big_font.render("Defeat", True, (255, 80, 80))
+            self.screen.blit(text, (WIDTH / 2 - text.get_width() / 2, HEIGHT / 2 - text.get_height() / 2))
+        self.draw_hud(snapshot)
+        pygame.display.flip()
+        if self.recorder is not None:
+            self.recorder.capture(self.screen, snapshot.tick)
+
+    def draw_hud(self, snapshot: RenderSnapshot) -> None:
+        text = self.font.render(snapshot.hud, True, (220, 220, 220))
+        self.screen.blit(text, (12, 12))
+        if snapshot.castle_pct > 0.0:
+            bar_bg = pygame.Rect(12, 36, 160, 12)
+            pygame.draw.rect(self.screen, (50, 50, 50), bar_bg)
+            pygame.draw.rect(self.screen, (120, 255, 120), pygame.Rect(12, 36, int(160 * snapshot.castle_pct), 12))
+        if snapshot.last_known is not None:
+            pygame.draw.circle(self.screen, (255, 50, 50), snapshot.last_known, 6, 1)
+
+
+class SpectatorView:
+    """Client-side mirror of a SpectatorFeed: decodes its frames and draws the match."""
+
+    def __init__(self) -> None:
+        self.inbox = bytearray()
+        self.keyframe: Optional[Dict[str, object]] = None
+        self.background: Optional[pygame.Surface] = None
+        self.entities: Tuple[Dict[int, Tuple[int, int, int]], ...] = ({}, {}, {}, {})
+        self.suspicion = np.zeros((0, 0), dtype=np.uint8)
+        self.knight = (0, 0, 0, 0)
+        self.tick = 0
+        self.bytes_received = 0
+        self.batch: Optional[SpriteBatch] = None
+
+    def feed(self, data: bytes) -> None:
+        self.inbox += data
+        self.bytes_received += len(data)
+        header = SpectatorFeed.FRAME_HEADER
+        offset = 0
+        while len(self.inbox) - offset >= header.size:
+            kind, length = header.unpack_from(self.inbox, offset)
+            end = offset + header.size + length
+            if len(self.inbox) < end:
+                break
+            self.apply(kind, bytes(self.inbox[offset + header.size:end]))
+            offset = end
+        del self.inbox[:offset]
+
+    def apply(self, kind: int, payload: bytes) -> None:
+        if kind == SPECTATOR_KEYFRAME:
+            self.keyframe = json.loads(zlib.decompress(payload))
+            self.background = None
+            self.entities = ({}, {}, {}, {})
+            grid = self.keyframe["suspicion"]
+            self.suspicion = np.array(grid["levels"], dtype=np.uint8).reshape(grid["rows"], grid["cols"])
+            return
+        feed = SpectatorFeed
+        self.tick, *knight = feed.DELTA_HEADER.unpack_from(payload)
+        self.knight = tuple(knight)
+        offset = feed.DELTA_HEADER.size
+        for entities in self.entities:
+            changed, removed = feed.SECTION_HEADER.unpack_from(payload, offset)
+            offset += feed.SECTION_HEADER.size
+            end = offset + changed * feed.ENTITY_RECORD.size
+            for uid, x, y, state in feed.ENTITY_RECORD.iter_unpack(payload[offset:end]):
+                entities[uid] = (x, y, state)
+            offset = end
+            for uid in struct.unpack_from(f"<{removed}I", payload, offset):
+                entities.pop(uid, None)
+            offset += 4 * removed
+        (cells,) = feed.SUSPICION_HEADER.unpack_from(payload, offset)
+        offset += feed.SUSPICION_HEADER.size
+        indices = np.frombuffer(payload, dtype="<u2", count=cells, offset=offset)
+        levels = np.frombuffer(payload, dtype=np.uint8, count=cells, offset=offset + 2 * cells)
+        self.suspicion.reshape(-1)[indices] = levels
+
+    def _render_background(self) -> pygame.Surface:
+        key = self.keyframe
+        surface = pygame.Surface(key["size"])
+        surface.fill((18, 18, 24))
+        for x, y, radius in key["trees"]:
+            pygame.draw.circle(surface, (24, 70, 34), (x, y), int(radius))
+        for x1, y1, x2, y2 in key["roads"]:
+            pygame.draw.line(surface, (90, 90, 90), (x1, y1), (x2, y2), key["road_width"])
+        for rect in key["huts"]:
+            pygame.draw.rect(surface, (140, 90, 60), rect)
+        for x, y in key["wells"]:
+            well_rect = pygame.Rect(0, 0, WELL_SIZE, WELL_SIZE)
+            well_rect.center = (x, y)
+            pygame.draw.rect(surface, (70, 140, 200), well_rect)
+        for x, y in key["anchors"]:
+            pygame.draw.circle(surface, (200, 80, 80), (x, y), 4, 1)
+        cx, cy, radius, _shield = key["castle"]
+        pygame.draw.circle(surface, (130, 0, 180), (cx, cy), radius)
+        return surface
+
+    def draw(self, surface: pygame.Surface, font: pygame.font.Font) -> None:
+        surface.fill((18, 18, 24))
+        if self.keyframe is None:
+            surface.blit(font.render("Waiting for feed...", True, (220, 220, 220)), (12, 12))
+            return
+        if self.background is None:
+            self.background = self._render_background()
+        surface.blit(self.background, (0, 0))
+        key = self.keyframe
+        rows, cols = self.suspicion.shape
+        heat = pygame.Surface((cols, rows), pygame.SRCALPHA)
+        heat.fill((220, 40, 40, 0))
+        alpha = pygame.surfarray.pixels_alpha(heat)
+        alpha[:, :] = (self.suspicion.T.astype(np.uint16) * 150 // 255).astype(np.uint8)
+        del alpha
+        cell = key["suspicion"]["cell"]
+        surface.blit(pygame.transform.scale(heat, (cols * cell, rows * cell)), (0, 0))
+        scale = 1.0 / key["quantum"]
+        unit_types = [(size, tuple(color), tuple(chase)) for _name, size, color, chase in key["unit_types"]]
+        if self.batch is None or self.batch.surface is not surface:
+            self.batch = SpriteBatch(surface)
+        batch = self.batch
+        units, villagers, seals, chests = self.entities
+        kx, ky, hp, flags = self.knight
+        cx, cy, radius, shield = key["castle"]
+        if flags & SpectatorFeed.FLAG_SHIELD:
+            pygame.draw.circle(surface, (150, 90, 220), (cx, cy), radius + shield, 2)
+        for x, y, progress in seals.values():
+            draw_seal(batch, (x * scale, y * scale, progress / 255 if progress else None))
+        for x, y, state in chests.values():
+            closed = state == SpectatorFeed.CHEST_CLOSED
+            batch.rect(x * scale, y * scale, CHEST_SIZE, (200, 170, 60) if closed else (160, 130, 50))
+            if state == SpectatorFeed.CHEST_OPENED:
+                batch.rect(x * scale, y * scale, SHARD_SIZE, (255, 255, 255))
+        draw_villagers(batch, [(x * scale, y * scale, bool(state & 2)) for x, y, state in villagers.values()])
+        unit_states = []
+        for x, y, state in units.values():
+            size, color, chase_color = unit_types[(state >> 4) & 0x7]
+            chasing = state & 0xF == UNIT_CHASE
+            unit_states.append((x * scale, y * scale, size, chase_color if chasing else color, bool(state & 0x80)))
+        draw_units(batch, unit_states)
+        draw_knight(batch, (kx * scale, ky * scale, None))
+        batch.flush()
+        if flags & SpectatorFeed.FLAG_SWING:
+            pygame.draw.circle(surface, (120, 255, 120), (round(kx * scale), round(ky * scale)), SWING_RANGE, 1)
+        hud = (
+            f"Tick: {self.tick}  HP: {hp}/{key['hp']}  Units: {len(units)}  Villagers: {len(villagers)}"
+            f"  Seals: {len(seals)}  Received: {self.bytes_received // 1024} KiB"
+        )
+        surface.blit(font.render(hud, True, (220, 220, 220)), (12, 12))
+        if flags & (SpectatorFeed.FLAG_VICTORY | SpectatorFeed.FLAG_DEFEAT):
+            label = "Victory!" if flags & SpectatorFeed.FLAG_VICTORY else "Defeat"
+            surface.blit(font.render(label, True, (255, 255, 255)), (12, 36))
+
+
+def run_spectator(address: str) -> None:
+    """Minimal viewer for a running --spectator-feed."""
+    sock = open_spectator_socket(address, server=False)
+    sock.setblocking(False)
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption(f"spectator {address}")
+    font = pygame.font.SysFont(HUD_FONT_NAME, 18)
+    clock = pygame.time.Clock()
+    view = SpectatorView()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        try:
+            while True:
+                chunk = sock.recv(1 << 16)
+                if not chunk:
+                    running = False
+                    break
+                view.feed(chunk)
+        except (BlockingIOError, InterruptedError):
+            pass
+        view.draw(screen, font)
+        pygame.display.flip()
+        clock.tick(FPS)
+    sock.close()
+    pygame.quit()
@@ -0,0 +1,368 @@
+"""Plain-Python stand-ins for the pygame geometry the simulation relies on.
+
+Vector2, Rect and rasterize_line reproduce pygame's arithmetic bit for bit
+(pygame.math.Vector2, pygame.Rect's integer conversions and pygame.draw.line's
+thick-line spans), so matches simulated without pygame replay the golden
+digests recorded with it.
+"""
+
+import math
+from typing import Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+VECTOR_EPSILON = 1e-6  # pygame's tolerance for Vector2 equality
+
+
+class Vector2:
+    """2D float vector with the subset of the pygame.math.Vector2 API the game uses.
+
+    Division multiplies by the reciprocal, ``v * w`` is the dot product and
+    truthiness tests for an exact zero vector, all as in pygame.
+    """
+
+    __slots__ = ("x", "y")
+
+    def __init__(self, x: Union[float, Sequence[float], "Vector2"] = 0.0, y: Optional[float] = None) -> None:
+        if y is None:
+            if isinstance(x, (int, float)):
+                y = x
+            else:
+                x, y = x
+        self.x = float(x)
+        self.y = float(y)
+
+    @staticmethod
+    def _coerce(other: object) -> Optional[Tuple[float, float]]:
+        if isinstance(other, Vector2):
+            return other.x, other.y
+        try:
+            x, y = other
+            return float(x), float(y)
+        except (TypeError, ValueError):
+            return None
+
+    def copy(self) -> "Vector2":
+        result = _new_vector(Vector2)
+        result.x = self.x
+        result.y = self.y
+        return result
+
+    def update(self, x: Union[float, Sequence[float], "Vector2"] = 0.0, y: Optional[float] = None) -> None:
+        if y is None:
+            if isinstance(x, Vector2):
+                self.x = x.x
+                self.y = x.y
+                return
+            if isinstance(x, (int, float)):
+                y = x
+            else:
+                x, y = x
+        self.x = float(x)
+        self.y = float(y)
+
+    @property
+    def xy(self) -> Tuple[float, float]:
+        return (self.x, self.y)
+
+    # --- Sequence protocol, so vectors pass wherever pygame expects a pair ---
+    def __len__(self) -> int:
+        return 2
+
+    def __getitem__(self, index: int) -> float:
+        return (self.x, self.y)[index]
+
+    def __iter__(self) -> Iterator[float]:
+        yield self.x
+        yield self.y
+
+    def __repr__(self) -> str:
+        return f"Vector2({self.x!r}, {self.y!r})"
+
+    def __bool__(self) -> bool:
+        return self.x != 0.0 or self.y != 0.0
+
+    def __eq__(self, other: object) -> bool:
+        xy = self._coerce(other)
+        if xy is None:
+            return NotImplemented
+        return abs(self.x - xy[0]) < VECTOR_EPSILON and abs(self.y - xy[1]) < VECTOR_EPSILON
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None  # mutable, like pygame's
+
+    # --- Arithmetic ---
+    def __add__(self, other: object) -> "Vector2":
+        if other.__class__ is not Vector2:
+            xy = self._coerce(other)
+            if xy is None:
+                return NotImplemented
+            other = Vector2(xy)
+        result = _new_vector(Vector2)
+        result.x = self.x + other.x
+        result.y = self.y + other.y
+        return result
+
+    __radd__ = __add__
+
+    def __sub__(self, other: object) -> "Vector2":
+        if other.__class__ is not Vector2:
+            xy = self._coerce(other)
+            if xy is None:
+                return NotImplemented
+            other = Vector2(xy)
+        result = _new_vector(Vector2)
+        result.x = self.x - other.x
+        result.y = self.y - other.y
+        return result
+
+    def __rsub__(self, other: object) -> "Vector2":
+        xy = self._coerce(other)
+        if xy is None:
+            return NotImplemented
+        return Vector2(xy[0] - self.x, xy[1] - self.y)
+
+    def __mul__(self, other: object) -> Union["Vector2", float]:
+        if isinstance(other, (int, float)):
+            result = _new_vector(Vector2)
+            result.x = self.x * other
+            result.y = self.y * other
+            return result
+        xy = self._coerce(other)
+        if xy is None:
+            return NotImplemented
+        return self.x * xy[0] + self.y * xy[1]
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: float) -> "Vector2":
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        inverse = 1.0 / other
+        result = _new_vector(Vector2)
+        result.x = self.x * inverse
+        result.y = self.y * inverse
+        return result
+
+    def __neg__(self) -> "Vector2":
+        result = _new_vector(Vector2)
+        result.x = -self.x
+        result.y = -self.y
+        return result
+
+    def __pos__(self) -> "Vector2":
+        return self.copy()
+
+    def __iadd__(self, other: object) -> "Vector2":
+        if other.__class__ is not Vector2:
+            xy = self._coerce(other)
+            if xy is None:
+                return NotImplemented
+            other = Vector2(xy)
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def __isub__(self, other: object) -> "Vector2":
+        if other.__class__ is not Vector2:
+            xy = self._coerce(other)
+            if xy is None:
+                return NotImplemented
+            other = Vector2(xy)
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def __imul__(self, other: float) -> "Vector2":
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        self.x *= other
+        self.y *= other
+        return self
+
+    def __itruediv__(self, other: float) -> "Vector2":
+        if not isinstance(other, (int, float)):
+            return NotImplemented
+        inverse = 1.0 / other
+        self.x *= inverse
+        self.y *= inverse
+        return self
+
+    # --- Geometry ---
+    def dot(self, other: "Vector2") -> float:
+        return self.x * other.x + self.y * other.y
+
+    def cross(self, other: "Vector2") -> float:
+        return self.x * other.y - self.y * other.x
+
+    def length(self) -> float:
+        return math.sqrt(self.x * self.x + self.y * self.y)
+
+    def length_squared(self) -> float:
+        return self.x * self.x + self.y * self.y
+
+    def distance_to(self, other: "Vector2") -> float:
+        dx = self.x - other.x
+        dy = self.y - other.y
+        return math.sqrt(dx * dx + dy * dy)
+
+    def distance_squared_to(self, other: "Vector2") -> float:
+        dx = self.x - other.x
+        dy = self.y - other.y
+        return dx * dx + dy * dy
+
+    def normalize(self) -> "Vector2":
+        result = self.copy()
+        result.normalize_ip()
+        return result
+
+    def normalize_ip(self) -> None:
+        length = math.sqrt(self.x * self.x + self.y * self.y)
+        if length == 0.0:
+            raise ValueError("Can't normalize Vector of length zero")
+        self.x /= length
+        self.y /= length
+
+    def scale_to_length(self, length: float) -> None:
+        old = math.sqrt(self.x * self.x + self.y * self.y)
+        if old == 0.0:
+            raise ValueError("Cannot scale a vector with zero length")
+        fraction = length / old
+        self.x *= fraction
+        self.y *= fraction
+
+    def lerp(self, other: "Vector2", t: float) -> "Vector2":
+        if not 0.0 <= t <= 1.0:
+            raise ValueError("Argument 2 must be in range [0, 1]")
+        return Vector2(self.x * (1 - t) + other.x * t, self.y * (1 - t) + other.y * t)
+
+    def project(self, other: "Vector2") -> "Vector2":
+        ox = other.x
+        oy = other.y
+        other_sq = ox * ox + oy * oy
+        if other_sq == 0.0:
+            raise ValueError("Cannot project onto a vector with zero length")
+        factor = (self.x * ox + self.y * oy) / other_sq
+        return Vector2(ox * factor, oy * factor)
+
+
+_new_vector = object.__new__
+
+
+def _c_div2(value: int) -> int:
+    """Integer halving that truncates toward zero, like C's ``value / 2``."""
+    return -((-value) // 2) if value < 0 else value // 2
+
+
+def _round_half_away(value: float) -> int:
+    return int(math.floor(value + 0.5)) if value >= 0 else -int(math.floor(-value + 0.5))
+
+
+class Rect:
+    """Integer rectangle following pygame.Rect's conversions.
+
+    The constructor, ``inflate`` and ``collidepoint`` truncate floats toward zero,
+    while assigning ``center`` rounds half away from zero, as pygame does.
+    """
+
+    __slots__ = ("x", "y", "w", "h")
+
+    def __init__(self, x: float, y: float, w: float, h: float) -> None:
+        self.x = int(x)
+        self.y = int(y)
+        self.w = int(w)
+        self.h = int(h)
+
+    left = property(lambda self: self.x)
+    top = property(lambda self: self.y)
+    right = property(lambda self: self.x + self.w)
+    bottom = property(lambda self: self.y + self.h)
+
+    @property
+    def center(self) -> Tuple[int, int]:
+        return (self.x + _c_div2(self.w), self.y + _c_div2(self.h))
+
+    @center.setter
+    def center(self, pos: Sequence[float]) -> None:
+        self.x = _round_half_away(pos[0]) - _c_div2(self.w)
+        self.y = _round_half_away(pos[1]) - _c_div2(self.h)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter((self.x, self.y, self.w, self.h))
+
+    def __len__(self) -> int:
+        return 4
+
+    def __getitem__(self, index: int) -> int:
+        return (self.x, self.y, self.w, self.h)[index]
+
+    def __repr__(self) -> str:
+        return f"Rect({self.x}, {self.y}, {self.w}, {self.h})"
+
+    def inflate(self, dx: float, dy: float) -> "Rect":
+        dx = int(dx)
+        dy = int(dy)
+        return Rect(self.x - _c_div2(dx), self.y - _c_div2(dy), self.w + dx, self.h + dy)
+
+    def collidepoint(self, x: Union[float, Sequence[float]], y: Optional[float] = None) -> bool:
+        if y is None:
+            x, y = x
+        x = int(x)
+        y = int(y)
+        return self.x <= x < self.x + self.w and self.y <= y < self.y + self.h
+
+    def colliderect(self, other: "Rect") -> bool:
+        return bool(
+            self.w
+            and self.h
+            and other.w
+            and other.h
+            and self.x < other.x + other.w
+            and self.y < other.y + other.h
+            and self.x + self.w > other.x
+            and self.y + self.h > other.y
+        )
+
+
+def rasterize_line(mask: np.ndarray, start: Sequence[float], end: Sequence[float], width: int) -> None:
+    """Set the pixels pygame.draw.line(surface, colour, start, end, width) would paint.
+
+    ``mask`` is indexed [y, x]. Endpoints are truncated to integers and the line
+    is walked with Bresenham, painting a span of ``width`` pixels across the minor
+    axis at every step. Both endpoints must lie inside the mask: pygame clips
+    lines that leave the surface before walking them, which this does not copy.
+    """
+    rows, cols = mask.shape
+    x1, y1 = int(start[0]), int(start[1])
+    x2, y2 = int(end[0]), int(end[1])
+    if width < 1:
+        return
+    extra = 1 - width % 2
+    half = width // 2 if width > 1 else 0
+    spans_x = abs(x1 - x2) <= abs(y1 - y2)
+    dx = abs(x2 - x1)
+    dy = abs(y2 - y1)
+    sx = 1 if x1 < x2 else -1
+    sy = 1 if y1 < y2 else -1
+    err = int((dx if dx > dy else -dy) / 2)
+    while True:
+        if width == 1:
+            if 0 <= x1 < cols and 0 <= y1 < rows:
+                mask[y1, x1] = True
+        elif spans_x:
+            if 0 <= y1 < rows:
+                mask[y1, max(0, x1 - half + extra):min(cols, x1 + half + 1)] = True
+        elif 0 <= x1 < cols:
+            mask[max(0, y1 - half + extra):min(rows, y1 + half + 1), x1] = True
+        if x1 == x2 and y1 == y2:
+            return
+        e2 = err
+        if e2 > -dx:
+            err -= dy
+            x1 += sx
+        if e2 < dy:
+            err += dx
+            y1 += sy
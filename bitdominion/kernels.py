@@ -0,0 +1,252 @@
+"""Scalar/vector math-engine switch for the hot-path kernels and their cross-check."""
+
+import math
+import random
+from typing import List, Tuple
+
+from .ai import Squad, SuspicionGrid
+from .config import (
+    HEIGHT,
+    HUT_SIZE,
+    KERNEL_TOLERANCE,
+    PRIEST_ATTACK_RANGE,
+    SUS_CELL_SIZE,
+    SUS_NOISE_SCALE,
+    SUS_STAMP_RADIUS,
+    UNIT_DATA,
+    VILLAGER_IDLE_RADIUS,
+    VILLAGER_ROAD_FLEE_TIME,
+    VILLAGER_ROUTE_REACH,
+    WIDTH,
+)
+from .geometry import Vector2
+from .units import Knight, KnightVisibility, Unit
+from .world import Census, Villager, World
+
+
+MATH_KERNELS = (
+    (World, "resolve_circle_collisions"),
+    (World, "_distance_to_segment"),
+    (Knight, "move"),
+    (Unit, "chase_target"),
+    (Villager, "flee_update"),
+    (Villager, "idle_update"),
+)
+
+
+def set_math_engine(engine: str) -> None:
+    """Bind the hot-path kernels to their "scalar" (default) or "vector" implementations."""
+    if engine not in ("scalar", "vector"):
+        raise ValueError(f"unknown math engine: {engine}")
+    for cls, name in MATH_KERNELS:
+        setattr(cls, name, cls.__dict__[f"{name}_{engine}"])
+
+
+def check_math_kernels(samples: int = 2000, seed: int = 0) -> List[str]:
+    """Run the scalar and Vector2 kernels on identical random inputs and describe every mismatch."""
+    saved_state = random.getstate()
+    failures: List[str] = []
+    try:
+        random.seed(seed)
+        world = World()
+        suspicion = SuspicionGrid()
+        census = Census()
+        rng = random.Random(seed)
+
+        def vec(spread: float = 1.0) -> Vector2:
+            return Vector2(rng.uniform(-spread, spread), rng.uniform(-spread, spread))
+
+        def near_obstacle() -> Vector2:
+            roll = rng.random()
+            if roll < 0.4 and world.tree_shapes:
+                tree = rng.choice(world.tree_shapes)
+                return Vector2(tree.x, tree.y) + vec(tree.radius + 10)
+            if roll < 0.8 and world.hut_shapes:
+                hut = rng.choice(world.hut_shapes)
+                return Vector2((hut.left + hut.right) / 2, (hut.top + hut.bottom) / 2) + vec(HUT_SIZE + 8)
+            return Vector2(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+
+        def compare(kernel: str, sample: int, *pairs: Tuple[object, object]) -> None:
+            for expected, actual in pairs:
+                if isinstance(expected, Vector2) and isinstance(actual, Vector2):
+                    ok = (expected - actual).length() <= KERNEL_TOLERANCE
+                elif isinstance(expected, float) and isinstance(actual, float):
+                    ok = abs(expected - actual) <= KERNEL_TOLERANCE
+                else:
+                    ok = expected == actual
+                if not ok:
+                    failures.append(f"{kernel} sample {sample}: vector={expected!r} scalar={actual!r}")
+                    return
+
+        for i in range(samples):
+            pos = near_obstacle()
+            radius = rng.choice((4.0, 5.0, 5.6, 7.0, 8.4))
+            velocity = vec(200.0) if rng.random() < 0.8 else None
+            state = random.getstate()
+            pos_a = pos.copy()
+            vel_a = velocity.copy() if velocity is not None else None
+            World.resolve_circle_collisions_vector(world, pos_a, radius, vel_a)
+            random.setstate(state)
+            pos_b = pos.copy()
+            vel_b = velocity.copy() if velocity is not None else None
+            World.resolve_circle_collisions_scalar(world, pos_b, radius, vel_b)
+            compare("resolve_circle_collisions", i, (pos_a, pos_b), (vel_a, vel_b))
+
+            start = near_obstacle()
+            end = start.copy() if rng.random() < 0.05 else near_obstacle()
+            probe = near_obstacle()
+            compare(
+                "_distance_to_segment",
+                i,
+                (World._distance_to_segment_vector(probe, start, end), World._distance_to_segment_scalar(probe, start, end)),
+            )
+
+            dt = rng.uniform(0.0, 0.05)
+            knights = [Knight(), Knight()]
+            target = pos + vec(3.0) if rng.random() < 0.2 else near_obstacle()
+            vel = vec(300.0)
+            for knight in knights:
+                knight.pos.update(pos)
+                knight.vel.update(vel)
+                knight.target = target.copy()
+            knights[0].move_vector(dt, world)
+            knights[1].move_scalar(dt, world)
+            compare("Knight.move", i, (knights[0].pos, knights[1].pos), (knights[0].vel, knights[1].vel))
+
+            unit_type = rng.choice(tuple(UNIT_DATA))
+            units = [Unit(unit_type, pos.copy(), suspicion, census), Unit(unit_type, pos.copy(), suspicion, census)]
+            for unit in units:
+                unit.vel.update(vel)
+            units[0].chase_target_vector(target, dt, world)
+            units[1].chase_target_scalar(target, dt, world)
+            compare("Unit.chase_target", i, (units[0].vel, units[1].vel))
+
+            village = rng.choice(world.villages)
+            home = rng.choice(village.huts).center
+            flee_direction = rng.choice((None, Vector2(), vec().normalize() if rng.random() else None))
+            danger = near_obstacle() if rng.random() < 0.7 else None
+            wander_target = home + vec(VILLAGER_IDLE_RADIUS) if rng.random() < 0.7 else None
+            wander_timer = rng.uniform(-0.5, 2.0)
+            road_timer = rng.choice((0.0, rng.uniform(0.0, VILLAGER_ROAD_FLEE_TIME)))
+            was_on_road = rng.random() < 0.5
+            # Route nodes, sometimes starting within reach of the villager.
+            road_route = [rng.choice(world.roads.nodes) for _ in range(rng.randint(0, 3))]
+            if road_route and rng.random() < 0.3:
+                road_route.insert(0, pos + vec(VILLAGER_ROUTE_REACH))
+            road_homeward = rng.random() < 0.3
+            villagers = [Villager.spawn(pos, home, village), Villager.spawn(pos, home, village)]
+            for villager in villagers:
+                villager.flee_direction = flee_direction.copy() if flee_direction is not None else None
+                villager.road_timer = road_timer
+                villager.was_on_road = was_on_road
+                villager.road_route = list(road_route)
+                villager.road_homeward = road_homeward
+                villager.wander_target = wander_target.copy() if wander_target is not None else None
+                villager.wander_timer = wander_timer
+            villagers[0].flee_update_vector(dt, world, danger)
+            villagers[1].flee_update_scalar(dt, world, danger)
+            compare(
+                "Villager.flee_update",
+                i,
+                (villagers[0].pos, villagers[1].pos),
+                (villagers[0].flee_direction, villagers[1].flee_direction),
+                (villagers[0].road_timer, villagers[1].road_timer),
+                (len(villagers[0].road_route), len(villagers[1].road_route)),
+                (villagers[0].road_homeward, villagers[1].road_homeward),
+                (villagers[0].state, villagers[1].state),
+            )
+            state = random.getstate()
+            villagers[0].idle_update_vector(dt, world)
+            random.setstate(state)
+            villagers[1].idle_update_scalar(dt, world)
+            compare(
+                "Villager.idle_update",
+                i,
+                (villagers[0].pos, villagers[1].pos),
+                (villagers[0].wander_target, villagers[1].wander_target),
+                (villagers[0].wander_timer, villagers[1].wander_timer),
+            )
+    finally:
+        random.setstate(saved_state)
+    return failures
+
+
+def check_sight_lines(samples: int = 200, seed: int = 0) -> List[str]:
+    """Compare KnightVisibility's batched sight lines with World.line_blocked and describe every mismatch.
+
+    Every sample has a loner and a two-unit squad whose leader is out of sight
+    range while the follower is within its own.
+    """
+    saved_state = random.getstate()
+    failures: List[str] = []
+    try:
+        random.seed(seed)
+        world = World()
+        visibility = KnightVisibility(world)
+        suspicion = SuspicionGrid()
+        census = Census()
+        rng = random.Random(seed)
+
+        def around(center: Vector2, radius: float) -> Vector2:
+            angle = rng.uniform(0, 2 * math.pi)
+            return center + Vector2(math.cos(angle), math.sin(angle)) * radius
+
+        for i in range(samples):
+            knight_pos = Vector2(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+            units = [Unit(rng.choice(tuple(UNIT_DATA)), Vector2(), suspicion, census) for _ in range(3)]
+            loner, leader, follower = units
+            loner.pos = knight_pos + Vector2(rng.uniform(-250, 250), rng.uniform(-250, 250))
+            leader.pos = around(knight_pos, PRIEST_ATTACK_RANGE + 60)
+            follower.pos = around(knight_pos, rng.uniform(1, follower.detection * 0.6))
+            squad = Squad(leader)
+            squad.add(follower)
+            visibility.update(knight_pos, [loner, leader], followers=[follower])
+            for unit in units:
+                distance = unit.pos.distance_to(knight_pos)
+                sight = unit.detection * visibility.detection_scale
+                if unit.kind.reveals:
+                    sight = max(sight, PRIEST_ATTACK_RANGE)
+                expected = distance <= sight and not world.line_blocked(unit.pos, knight_pos)
+                role = ("loner", "leader", "follower")[unit.squad_slot + (unit.squad is not None)]
+                if unit.knight_los != expected or abs(unit.knight_distance - distance) > KERNEL_TOLERANCE:
+                    failures.append(
+                        f"KnightVisibility.update sample {i} ({role}): "
+                        f"los {unit.knight_los} expected {expected}, distance {unit.knight_distance} expected {distance}"
+                    )
+    finally:
+        random.setstate(saved_state)
+    return failures
+
+
+def check_suspicion_falloff(samples: int = 200, seed: int = 0) -> List[str]:
+    """Compare noise stamped into SuspicionGrid with what AnchorManager.boost_from_pos gave each anchor.
+
+    The v3 baseline added amount / (distance + 1) to each of the six ring
+    anchors. The grid cell holding an anchor must gain the same, up to the
+    distance between the anchor and the cell centre.
+    """
+    failures: List[str] = []
+    rng = random.Random(seed)
+    suspicion = SuspicionGrid()
+    half_diagonal = SUS_CELL_SIZE * math.sqrt(0.5)
+    for i in range(samples):
+        pos = Vector2(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT))
+        amount = SUS_NOISE_SCALE * rng.uniform(0.2, 2.0)
+        suspicion.grid.fill(0.0)
+        suspicion.boost_from_pos(pos, amount)
+        peak = float(suspicion.grid.max())
+        if peak > amount + KERNEL_TOLERANCE:
+            failures.append(f"SuspicionGrid.boost_from_pos sample {i}: peak {peak} above the amount {amount}")
+        for anchor in suspicion.anchors:
+            distance = pos.distance_to(anchor)
+            if distance + half_diagonal > SUS_STAMP_RADIUS:
+                continue
+            baseline = amount / (distance + 1.0)
+            low = amount / (distance + half_diagonal + 1.0)
+            high = amount / (max(0.0, distance - half_diagonal) + 1.0)
+            value = suspicion.suspicion_at(anchor)
+            if not low - KERNEL_TOLERANCE <= value <= high + KERNEL_TOLERANCE:
+                failures.append(
+                    f"SuspicionGrid.boost_from_pos sample {i}: anchor cell gained {value}, baseline {baseline}"
+                )
+    return failures
@@ -0,0 +1,461 @@
+"""The Match: one game's simulation state and its fixed per-tick update order."""
+
+import math
+import queue
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .ai import DarkLordAI, SuspicionGrid
+from .config import (
+    CASTLE_POS,
+    CASTLE_STAY_TIME,
+    CASTLE_WIN_RADIUS,
+    EVENT_PRIEST_REVEAL,
+    EVENT_SEAL_BROKEN,
+    EVENT_VILLAGER_KILLED,
+    FPS,
+    HEIGHT,
+    MAX_UNITS,
+    NOISE_INVESTIGATE_RADIUS,
+    NOISE_MERGE_RADIUS,
+    NOISE_RING_DURATION,
+    NOISE_RING_MAX_RADIUS,
+    NOISE_RING_MIN_RADIUS,
+    PRIEST_REVEAL_DURATION,
+    SEAL_COUNT,
+    SEAL_MIN_CASTLE_DIST,
+    SEAL_MIN_SEPARATION,
+    SIM_MAX_LAG,
+    SIM_TICK_RATE,
+    SUS_NOISE_SCALE,
+    SUS_SEAL_BONUS,
+    UNIT_IDLE,
+    UNIT_SEPARATION_MAX_SPEED,
+    UNIT_SEPARATION_RADIUS,
+    UNIT_SEPARATION_STRENGTH,
+    VILLAGER_COLLISION_RADIUS,
+    VILLAGER_RESPAWN_INTERVAL,
+    VILLAGER_RESPAWN_VARIANCE,
+    VILLAGER_SEPARATION_MAX_SPEED,
+    VILLAGER_SEPARATION_RADIUS,
+    VILLAGER_SEPARATION_STRENGTH,
+    WIDTH,
+)
+from .core import EntityPool, SpatialHash
+from .events import EventLog
+from .geometry import Vector2
+from .nav import KnightNavigator, NavGrid
+from .spectator import SpectatorFeed
+from .steering import SeparationSteering
+from .units import CombatResolver, Knight, KnightVisibility, Seal, Unit
+from .world import Villager, World, WorldRenderState
+
+
+@dataclass
+class NoisePing:
+    pos: Vector2
+    strength: float = 1.0
+    timer: float = 0.0
+
+    @classmethod
+    def spawn(cls, pos: Vector2, strength: float = 1.0) -> "NoisePing":
+        return cls(pos.copy(), strength)
+
+    def reset(self, pos: Vector2, strength: float = 1.0) -> None:
+        self.pos.update(pos)
+        self.strength = strength
+        self.timer = 0.0
+
+    def update(self, dt: float) -> bool:
+        self.timer += dt
+        return self.timer >= NOISE_RING_DURATION
+
+    def render_state(self) -> Tuple[float, float, int, int]:
+        t = min(1.0, self.timer / NOISE_RING_DURATION)
+        radius_scale = 0.7 + 0.6 * self.strength
+        radius = (NOISE_RING_MIN_RADIUS + (NOISE_RING_MAX_RADIUS - NOISE_RING_MIN_RADIUS) * t) * radius_scale
+        alpha = max(0, int(180 * (1.0 - t)))
+        return (self.pos.x, self.pos.y, int(radius), alpha)
+
+
+@dataclass
+class PulseEffect:
+    pos: Vector2
+    timer: float = 0.0
+    duration: float = 0.5
+
+    @classmethod
+    def spawn(cls, pos: Vector2, duration: float = 0.5) -> "PulseEffect":
+        return cls(pos.copy(), duration=duration)
+
+    def reset(self, pos: Vector2, duration: float = 0.5) -> None:
+        self.pos.update(pos)
+        self.timer = 0.0
+        self.duration = duration
+
+    def update(self, dt: float) -> bool:
+        self.timer += dt
+        return self.timer >= self.duration
+
+    def render_state(self) -> Tuple[float, float, int, int]:
+        t = min(1.0, self.timer / self.duration)
+        radius = 16 + 38 * t
+        alpha = max(0, int(200 * (1.0 - t)))
+        return (self.pos.x, self.pos.y, int(radius), alpha)
+
+
+@dataclass
+class NoiseEvent:
+    pos: Vector2
+    strength: float
+    peak: float
+
+    @classmethod
+    def spawn(cls, pos: Vector2, strength: float) -> "NoiseEvent":
+        return cls(pos.copy(), strength, strength)
+
+    def reset(self, pos: Vector2, strength: float) -> None:
+        self.pos.update(pos)
+        self.strength = strength
+        self.peak = strength
+
+
+class RenderSnapshot(NamedTuple):
+    """Immutable view of one simulation tick: positions, colours and states only."""
+
+    tick: int
+    world: WorldRenderState
+    pulses: Tuple[Tuple[float, float, int, int], ...]
+    seals: Tuple[Tuple[float, float, Optional[float]], ...]
+    pings: Tuple[Tuple[float, float, int, int], ...]
+    units: Tuple[Tuple[float, float, int, Tuple[int, int, int], bool], ...]
+    knight: Tuple[float, float, Optional[Tuple[float, float]]]
+    shield_active: bool
+    victory: bool
+    defeat: bool
+    hud: str
+    castle_pct: float
+    last_known: Optional[Tuple[float, float]]
+    los_lines: Tuple[Tuple[Tuple[float, float], Tuple[float, float]], ...]
+    suspicion: Optional[Tuple[np.ndarray, float, float, float]]
+    nav_path: Tuple[Tuple[float, float], ...]
+
+
+class SnapshotBuffer:
+    """Two-slot buffer: the simulation fills the back slot, then flips it to the front."""
+
+    def __init__(self) -> None:
+        self.slots: List[Optional[RenderSnapshot]] = [None, None]
+        self.front = 0
+        self.lock = threading.Lock()
+
+    def publish(self, snapshot: RenderSnapshot) -> None:
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        with self.lock:
+            self.front = back
+
+    def latest(self) -> Optional[RenderSnapshot]:
+        with self.lock:
+            return self.slots[self.front]
+
+
+def _unit_radius(unit: Unit) -> float:
+    return unit.size * 1.4
+
+
+class Match:
+    """One v3 match: world, knight, seals, Dark Lord AI and the per-tick update order.
+
+    Needs only the standard library and NumPy. Knight move orders go through
+    ``commands`` and are applied at the start of the next update(); snapshot()
+    packs everything a renderer needs into a RenderSnapshot. The pygame window
+    and input loop live in frontend.Game, which is a Match. With ``knight_nav``
+    the knight paths around trees and huts instead of walking straight at its
+    target; ``nav_time_budget`` adds a per-tick wall-clock cap to its planner,
+    which bounds frame time but makes the run depend on machine speed.
+    """
+
+    def __init__(
+        self,
+        spectator_address: Optional[str] = None,
+        events: Optional[EventLog] = None,
+        knight_nav: bool = False,
+        nav_time_budget: Optional[float] = None,
+    ) -> None:
+        self.world = World()
+        self.knight = Knight()
+        self.suspicion = SuspicionGrid()
+        self.ai = DarkLordAI(self.suspicion, self.world.census)
+        self.visibility = KnightVisibility(self.world)
+        self.combat = CombatResolver()
+        self.thinking_units: List[Unit] = []
+        self.thinking_dt: List[float] = []
+        self.seals: List[Seal] = self.generate_seals()
+        self.broken_seals = 0
+        self.pulses: List[PulseEffect] = []
+        self.noise_pings: List[NoisePing] = []
+        self.noise_queue: List[NoiseEvent] = []
+        self.noise_event_pool: EntityPool[NoiseEvent] = EntityPool(NoiseEvent.spawn)
+        self.ping_pool: EntityPool[NoisePing] = EntityPool(NoisePing.spawn)
+        self.pulse_pool: EntityPool[PulseEffect] = EntityPool(PulseEffect.spawn)
+        self.unit_index: SpatialHash[Unit] = SpatialHash(NOISE_INVESTIGATE_RADIUS)
+        self.unit_separation = SeparationSteering(
+            UNIT_SEPARATION_RADIUS, UNIT_SEPARATION_STRENGTH, UNIT_SEPARATION_MAX_SPEED
+        )
+        self.villager_separation = SeparationSteering(
+            VILLAGER_SEPARATION_RADIUS, VILLAGER_SEPARATION_STRENGTH, VILLAGER_SEPARATION_MAX_SPEED
+        )
+        self.separating: List[object] = []
+        self.last_known_pos: Optional[Vector2] = None
+        self.last_known_timer = 0.0
+        self.shield_active = True
+        self.victory = False
+        self.defeat = False
+        self.running = True
+        self.debug_overlay = False
+        self.los_debug_lines: List[Tuple[Tuple[float, float], Tuple[float, float]]] = []
+        self.tick = 0
+        # Knight move orders from the input loop, applied at the start of the next tick.
+        self.commands: "queue.SimpleQueue[Vector2]" = queue.SimpleQueue()
+        self.snapshots = SnapshotBuffer()
+        self.sim_error: Optional[BaseException] = None
+        self.spectator = SpectatorFeed(spectator_address) if spectator_address else None
+        self.events = events if events is not None else EventLog()
+        if knight_nav:
+            self.knight.nav = KnightNavigator(NavGrid(self.world), time_budget=nav_time_budget)
+
+    def generate_seals(self) -> List[Seal]:
+        seals: List[Seal] = []
+        attempts = 0
+        while len(seals) < SEAL_COUNT and attempts < 800:
+            attempts += 1
+            angle = random.uniform(0, 2 * math.pi)
+            radius = random.uniform(SEAL_MIN_CASTLE_DIST, min(WIDTH, HEIGHT) / 2 - 80)
+            pos = CASTLE_POS + Vector2(math.cos(angle), math.sin(angle)) * radius
+            if any(pos.distance_to(s.pos) < SEAL_MIN_SEPARATION for s in seals):
+                continue
+            if not self.world.is_clear(pos, 30):
+                continue
+            if self.world.is_on_road(pos):
+                continue
+            seals.append(Seal(pos))
+        return seals
+
+    def close(self) -> None:
+        if self.spectator is not None:
+            self.spectator.close()
+        self.events.close()
+
+    def run_headless(self, ticks: int) -> None:
+        """Step ``ticks`` fixed 1/FPS ticks as fast as possible, stopping early when the match ends."""
+        step = 1.0 / FPS
+        try:
+            for tick in range(1, ticks + 1):
+                if self.victory or self.defeat:
+                    break
+                self.update(step, tick * step)
+        finally:
+            self.close()
+
+    def _simulate(self) -> None:
+        """Fixed-rate simulation loop for a worker thread; publishes a snapshot per tick."""
+        step = 1.0 / SIM_TICK_RATE
+        sim_time = 0.0
+        next_tick = time.perf_counter()
+        try:
+            while self.running:
+                if not (self.victory or self.defeat):
+                    sim_time += step
+                    self.update(step, sim_time)
+                    self.snapshots.publish(self.snapshot())
+                next_tick += step
+                delay = next_tick - time.perf_counter()
+                if delay > 0.0:
+                    time.sleep(delay)
+                elif delay < -SIM_MAX_LAG:
+                    next_tick = time.perf_counter()
+        except BaseException as exc:  # surfaced on the render thread
+            self.sim_error = exc
+
+    def spawn_noise(self, pos: Vector2, strength: float = 1.0) -> None:
+        # Noise is queued and resolved once per tick in flush_noise; events landing
+        # on top of an already queued one are folded into it, at the
+        # strength-weighted mean of their positions.
+        for event in self.noise_queue:
+            if event.pos.distance_squared_to(pos) <= NOISE_MERGE_RADIUS * NOISE_MERGE_RADIUS:
+                total = event.strength + strength
+                if total > 0.0:
+                    weight = strength / total
+                    event.pos.x += (pos.x - event.pos.x) * weight
+                    event.pos.y += (pos.y - event.pos.y) * weight
+                event.strength = total
+                event.peak = max(event.peak, strength)
+                return
+        self.noise_queue.append(self.noise_event_pool.acquire(pos, strength))
+
+    def flush_noise(self) -> None:
+        if not self.noise_queue:
+            return
+        self.suspicion.boost_from_many((event.pos, SUS_NOISE_SCALE * event.strength) for event in self.noise_queue)
+        self.unit_index.clear()
+        for unit in self.ai.units:
+            if unit.alive:
+                self.unit_index.insert(unit, unit.pos)
+        radius_sq = NOISE_INVESTIGATE_RADIUS * NOISE_INVESTIGATE_RADIUS
+        for event in self.noise_queue:
+            self.noise_pings.append(self.ping_pool.acquire(event.pos, event.peak))
+            if not self.unit_index.cells:
+                continue
+            for unit in self.unit_index.query(event.pos, NOISE_INVESTIGATE_RADIUS):
+                if unit.pos.distance_squared_to(event.pos) >= radius_sq:
+                    continue
+                self.ai.promote(unit)
+                if unit.kind.hears_noise and unit.state == UNIT_IDLE:
+                    unit.investigate(event.pos)
+        self.noise_event_pool.release_all(self.noise_queue)
+
+    def on_villager_killed(self, villager: Villager, unit: Unit) -> None:
+        if not villager.alive:
+            return
+        villager.alive = False
+        self.world.census.villager_died(villager)
+        village = villager.village
+        if village:
+            # The corpse stays in village.villagers until World.update compacts it.
+            variation = random.uniform(1.0 - VILLAGER_RESPAWN_VARIANCE, 1.0 + VILLAGER_RESPAWN_VARIANCE)
+            village.spawn_timer = VILLAGER_RESPAWN_INTERVAL * variation
+        self.spawn_noise(villager.pos, 0.6)
+        self.ai.on_villager_killed(villager.pos)
+        self.events.emit(EVENT_VILLAGER_KILLED, villager.uid, villager.pos, unit.uid)
+
+    def update(self, dt: float, now: float) -> None:
+        self.tick += 1
+        self.events.tick = self.tick
+        while not self.commands.empty():
+            self.knight.set_target(self.commands.get(), now, self.spawn_noise)
+        self.knight.update(dt, self.world)
+        self.suspicion.decay(dt)
+        self.world.update(dt, self.knight, self.ai.units, self)
+        separating = self.separating
+        separating.clear()
+        for village in self.world.villages:
+            separating.extend(villager for villager in village.villagers if villager.alive)
+        self.villager_separation.apply(separating, dt, self.world, VILLAGER_COLLISION_RADIUS)
+
+        i = 0
+        while i < len(self.seals):
+            seal = self.seals[i]
+            channeling = seal.channeling
+            completed, started = seal.update(self.knight.pos, dt)
+            if seal.channeling != channeling:
+                self.world.census.seal_channel(seal.channeling)
+            if started:
+                self.spawn_noise(seal.pos)
+                self.suspicion.boost_sector(seal.pos, SUS_SEAL_BONUS)
+            if completed:
+                self.broken_seals += 1
+                self.events.emit(EVENT_SEAL_BROKEN, seal.uid, seal.pos, self.broken_seals)
+                self.pulses.append(self.pulse_pool.acquire(seal.pos))
+                if seal.channeling:
+                    self.world.census.seal_channel(False)
+                del self.seals[i]
+            else:
+                i += 1
+        if self.shield_active and self.broken_seals >= SEAL_COUNT:
+            self.shield_active = False
+            self.pulses.append(self.pulse_pool.acquire(CASTLE_POS, 0.6))
+
+        self.ai.update(dt, self.knight, self.seals, now, self.world)
+
+        reveal_triggered = False
+        self.los_debug_lines.clear()
+        los_list = self.los_debug_lines if self.debug_overlay else None
+        thinking = self.thinking_units
+        thinking_dt = self.thinking_dt
+        thinking.clear()
+        thinking_dt.clear()
+        for unit in self.ai.units:
+            unit_dt = self.ai.lod_step(unit, dt)
+            if unit_dt > 0.0:
+                thinking.append(unit)
+                thinking_dt.append(unit_dt)
+        perceivers, followers = self.ai.split_perception(thinking)
+        self.visibility.update(self.knight.pos, perceivers, los_list, followers)
+        for unit, unit_dt in zip(thinking, thinking_dt):
+            detected, just_revealed = unit.update(
+                unit_dt, self.knight, self.last_known_pos, self.world, self.combat, self.events
+            )
+            if detected:
+                self.last_known_pos = self.knight.pos.copy()
+                self.last_known_timer = 4.0
+                self.suspicion.boost_sector(self.knight.pos, 18.0)
+            if just_revealed:
+                reveal_triggered = True
+                self.events.emit(EVENT_PRIEST_REVEAL, unit.uid, unit.pos)
+                self.last_known_pos = self.knight.pos.copy()
+                self.last_known_timer = PRIEST_REVEAL_DURATION
+        separating.clear()
+        separating.extend(unit for unit in self.ai.units if unit.alive)
+        self.unit_separation.apply(separating, dt, self.world, _unit_radius)
+        if reveal_triggered:
+            self.ai.register_reveal(self.knight.pos, now)
+
+        if self.last_known_timer > 0.0:
+            self.last_known_timer = max(0.0, self.last_known_timer - dt)
+            if self.last_known_timer <= 0.0:
+                self.last_known_pos = None
+
+        self.combat.resolve(self, dt)
+
+        self.flush_noise()
+        self.ping_pool.step(self.noise_pings, dt)
+        self.pulse_pool.step(self.pulses, dt)
+
+        if self.shield_active:
+            self.knight.castle_timer = 0.0
+        else:
+            if self.knight.pos.distance_to(CASTLE_POS) <= CASTLE_WIN_RADIUS:
+                self.knight.castle_timer += dt
+                if self.knight.castle_timer >= CASTLE_STAY_TIME:
+                    self.victory = True
+            else:
+                self.knight.castle_timer = 0.0
+
+        if self.knight.hp <= 0:
+            self.defeat = True
+
+        if self.spectator is not None:
+            self.spectator.publish(self)
+
+    def snapshot(self) -> RenderSnapshot:
+        total_villagers, alarmed = self.world.villager_counts()
+        hud = (
+            f"HP: {int(self.knight.hp)}  Evil: {int(self.ai.energy)}  Units: {self.world.census.units}/{MAX_UNITS}"
+            f"  Seals: {self.broken_seals}/{SEAL_COUNT}  Villagers: {total_villagers}  Alarmed: {alarmed}"
+        )
+        debug = self.debug_overlay
+        last_known = self.last_known_pos
+        return RenderSnapshot(
+            tick=self.tick,
+            world=self.world.render_state(),
+            pulses=tuple(pulse.render_state() for pulse in self.pulses),
+            seals=tuple(seal.render_state() for seal in self.seals),
+            pings=tuple(ping.render_state() for ping in self.noise_pings),
+            units=tuple(unit.render_state() for unit in self.ai.units if unit.alive),
+            knight=self.knight.render_state(),
+            shield_active=self.shield_active,
+            victory=self.victory,
+            defeat=self.defeat,
+            hud=hud,
+            castle_pct=min(1.0, self.knight.castle_timer / CASTLE_STAY_TIME),
+            last_known=(last_known.x, last_known.y) if last_known is not None else None,
+            los_lines=tuple(self.los_debug_lines) if debug else (),
+            suspicion=self.suspicion.render_state() if debug else None,
+            nav_path=self.knight.nav.debug_path(self.knight.pos) if debug and self.knight.nav is not None else (),
+        )
@@ -0,0 +1,398 @@
+"""Optional knight navigation: an obstacle grid and an incremental, time-sliced path planner."""
+
+import heapq
+import math
+import time
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+import numpy as np
+
+from .config import (
+    FOREST_CANOPY_TREE_THRESHOLD,
+    HEIGHT,
+    KNIGHT_CANOPY_SPEED_MULT,
+    KNIGHT_COLLISION_RADIUS,
+    NAV_ARRIVE_RADIUS,
+    NAV_CELL_SIZE,
+    NAV_EXPANSIONS_PER_TICK,
+    NAV_SMOOTH_LOOKAHEAD,
+    ROAD_SPEED_MULT,
+    WIDTH,
+)
+from .geometry import Vector2
+
+if TYPE_CHECKING:
+    from .units import Knight
+    from .world import World
+
+SQRT2 = math.sqrt(2.0)
+
+
+class NavGrid:
+    """8-connected grid over the arena with the knight's clearance baked into blocked cells.
+
+    A cell is blocked when its centre lies within the knight's collision radius
+    of a tree or hut. Free cells cost the time to cross them relative to open
+    ground (cheaper on roads, dearer under canopy), and ``links`` lists every
+    cell's walkable neighbours with the edge cost; diagonals never cut a blocked
+    corner. Pockets cut off from the main open area (a cell or two wedged between
+    trees) are blocked as well, so a knight that slides into one, or a click
+    that lands in one, maps to the nearest cell it can actually plan from.
+    """
+
+    def __init__(self, world: "World", cell_size: float = NAV_CELL_SIZE) -> None:
+        self.world = world
+        self.cell_size = cell_size
+        self.clearance = KNIGHT_COLLISION_RADIUS * 0.6
+        self.cols = int(math.ceil(WIDTH / cell_size))
+        self.rows = int(math.ceil(HEIGHT / cell_size))
+        centre_x = (np.arange(self.cols) + 0.5) * cell_size
+        centre_y = (np.arange(self.rows) + 0.5) * cell_size
+        blocked = np.zeros((self.rows, self.cols), dtype=bool)
+        canopy = np.zeros((self.rows, self.cols), dtype=np.int32)
+        for tree in world.tree_shapes:
+            reach = tree.radius + self.clearance
+            near = (centre_x[None, :] - tree.x) ** 2 + (centre_y[:, None] - tree.y) ** 2
+            blocked |= near <= reach * reach
+            canopy += near <= tree.canopy_sq
+        for hut in world.hut_bounds(self.clearance):
+            blocked |= (
+                (centre_x[None, :] >= hut.left)
+                & (centre_x[None, :] < hut.right)
+                & (centre_y[:, None] >= hut.top)
+                & (centre_y[:, None] < hut.bottom)
+            )
+        road = world.road_mask[
+            np.minimum(centre_y.astype(np.int64), HEIGHT - 1)[:, None],
+            np.minimum(centre_x.astype(np.int64), WIDTH - 1)[None, :],
+        ]
+        cost = np.ones((self.rows, self.cols))
+        cost[canopy >= FOREST_CANOPY_TREE_THRESHOLD] = 1.0 / KNIGHT_CANOPY_SPEED_MULT
+        cost[road] = 1.0 / ROAD_SPEED_MULT
+        self.blocked: List[bool] = blocked.ravel().tolist()
+        self.cost: List[float] = cost.ravel().tolist()
+        self.min_cost = float(cost.min())
+        self.links: List[List[Tuple[int, float]]] = self._build_links()
+        self._block_pockets()
+        self.blocked_mask = np.array(self.blocked, dtype=bool).reshape(self.rows, self.cols)
+
+    def _build_links(self) -> List[List[Tuple[int, float]]]:
+        cols = self.cols
+        rows = self.rows
+        blocked = self.blocked
+        cost = self.cost
+        size = self.cell_size
+        links: List[List[Tuple[int, float]]] = []
+        for cell in range(rows * cols):
+            row, col = divmod(cell, cols)
+            edges: List[Tuple[int, float]] = []
+            if not blocked[cell]:
+                for dr in (-1, 0, 1):
+                    r = row + dr
+                    if not 0 <= r < rows:
+                        continue
+                    for dc in (-1, 0, 1):
+                        c = col + dc
+                        if (dr == 0 and dc == 0) or not 0 <= c < cols:
+                            continue
+                        other = r * cols + c
+                        if blocked[other]:
+                            continue
+                        if dr and dc and (blocked[row * cols + c] or blocked[r * cols + col]):
+                            continue
+                        step = size * SQRT2 if dr and dc else size
+                        edges.append((other, step * 0.5 * (cost[cell] + cost[other])))
+            links.append(edges)
+        return links
+
+    def _block_pockets(self) -> None:
+        """Block every walkable cell outside the largest connected region."""
+        links = self.links
+        region = [-1] * len(links)
+        sizes: List[int] = []
+        for seed, blocked in enumerate(self.blocked):
+            if blocked or region[seed] >= 0:
+                continue
+            label = len(sizes)
+            region[seed] = label
+            stack = [seed]
+            size = 0
+            while stack:
+                cell = stack.pop()
+                size += 1
+                for other, _ in links[cell]:
+                    if region[other] < 0:
+                        region[other] = label
+                        stack.append(other)
+            sizes.append(size)
+        if len(sizes) < 2:
+            return
+        main = sizes.index(max(sizes))
+        for cell, label in enumerate(region):
+            if label >= 0 and label != main:
+                self.blocked[cell] = True
+                links[cell] = []
+        # Only pocket cells link to pocket cells, so the main region's links are already exact.
+
+    def cell_of(self, pos: Vector2) -> int:
+        col = min(self.cols - 1, max(0, int(pos.x // self.cell_size)))
+        row = min(self.rows - 1, max(0, int(pos.y // self.cell_size)))
+        return row * self.cols + col
+
+    def centre(self, cell: int) -> Vector2:
+        row, col = divmod(cell, self.cols)
+        return Vector2((col + 0.5) * self.cell_size, (row + 0.5) * self.cell_size)
+
+    def free_cell_near(self, cell: int) -> int:
+        """``cell`` itself if walkable, else the closest walkable cell by ring search (-1 if none)."""
+        if not self.blocked[cell]:
+            return cell
+        row, col = divmod(cell, self.cols)
+        for ring in range(1, max(self.rows, self.cols)):
+            best = -1
+            best_sq = 0
+            for r in range(row - ring, row + ring + 1):
+                if not 0 <= r < self.rows:
+                    continue
+                step = 1 if r in (row - ring, row + ring) else 2 * ring
+                for c in range(col - ring, col + ring + 1, step):
+                    if 0 <= c < self.cols and not self.blocked[r * self.cols + c]:
+                        dist_sq = (r - row) ** 2 + (c - col) ** 2
+                        if best < 0 or dist_sq < best_sq:
+                            best = r * self.cols + c
+                            best_sq = dist_sq
+            if best >= 0:
+                return best
+        return -1
+
+    def heuristic(self, a: int, b: int) -> float:
+        """Octile distance at the cheapest cell cost, so it never overestimates."""
+        ar, ac = divmod(a, self.cols)
+        br, bc = divmod(b, self.cols)
+        dr = abs(ar - br)
+        dc = abs(ac - bc)
+        return (max(dr, dc) + (SQRT2 - 1.0) * min(dr, dc)) * self.cell_size * self.min_cost
+
+    def line_blocked(self, start: Vector2, end: Vector2) -> bool:
+        """World.line_blocked with the knight's clearance added to trees, and huts checked too."""
+        # A hair under the blocking clearance, so a knight resting against a tree can still see past it.
+        clearance = self.clearance * 0.9
+        world = self.world
+        min_x = min(start.x, end.x) - clearance
+        max_x = max(start.x, end.x) + clearance
+        min_y = min(start.y, end.y) - clearance
+        max_y = max(start.y, end.y) + clearance
+        dx = end.x - start.x
+        dy = end.y - start.y
+        a = dx * dx + dy * dy
+        if a == 0.0:
+            return False
+        for patch in world.forest_patches:
+            bounds = patch.bounds
+            if bounds.right < min_x or bounds.left > max_x or bounds.bottom < min_y or bounds.top > max_y:
+                continue
+            for tree in patch.shapes:
+                # World._line_circle_intersection on plain floats, with the radius grown by the clearance.
+                fx = start.x - tree.x
+                fy = start.y - tree.y
+                reach = tree.radius + clearance
+                b = 2.0 * (fx * dx + fy * dy)
+                c = fx * fx + fy * fy - reach * reach
+                discriminant = b * b - 4.0 * a * c
+                if discriminant < 0.0:
+                    continue
+                discriminant = math.sqrt(discriminant)
+                t1 = (-b - discriminant) / (2.0 * a)
+                t2 = (-b + discriminant) / (2.0 * a)
+                if 0.0 <= t1 <= 1.0 or 0.0 <= t2 <= 1.0:
+                    return True
+        for hut in world.hut_bounds(clearance):
+            if self._segment_hits_box(start, end, hut.left, hut.top, hut.right, hut.bottom):
+                return True
+        return False
+
+    @staticmethod
+    def _segment_hits_box(start: Vector2, end: Vector2, left: float, top: float, right: float, bottom: float) -> bool:
+        """Slab test: does the segment start -> end touch the axis-aligned box?"""
+        t0 = 0.0
+        t1 = 1.0
+        for origin, delta, low, high in ((start.x, end.x - start.x, left, right), (start.y, end.y - start.y, top, bottom)):
+            if delta == 0.0:
+                if origin < low or origin > high:
+                    return False
+                continue
+            near = (low - origin) / delta
+            far = (high - origin) / delta
+            if near > far:
+                near, far = far, near
+            t0 = max(t0, near)
+            t1 = min(t1, far)
+            if t0 > t1:
+                return False
+        return True
+
+
+class KnightNavigator:
+    """Goal-rooted incremental planner in the style of D* Lite, run in per-tick slices.
+
+    retarget() seeds a search that grows backwards from the clicked cell; each
+    update() expands at most ``expansions`` cells (and stops early once
+    ``time_budget`` seconds are spent, when set) until the knight's cell is
+    settled. The search tree points every settled cell at its next step towards
+    the goal, so a knight that walks, is knocked back or slides along a tree
+    keeps its plan without searching again; as in D* Lite, queue keys carry a
+    ``km`` offset that grows with the distance the knight has moved, so
+    entries queued against an older knight position stay valid lower bounds.
+    Waypoints are smoothed lazily: the farthest of the next
+    NAV_SMOOTH_LOOKAHEAD cells with a clear line from the knight.
+
+    The expansion cap alone keeps replays deterministic, so ``time_budget``
+    defaults to None. Interactive play can opt in to NAV_TIME_BUDGET to bound
+    frame time, at the cost of runs that depend on machine speed.
+    """
+
+    def __init__(
+        self,
+        grid: NavGrid,
+        expansions: int = NAV_EXPANSIONS_PER_TICK,
+        time_budget: Optional[float] = None,
+    ) -> None:
+        self.grid = grid
+        self.expansions = expansions
+        self.time_budget = time_budget
+        self.target: Optional[Vector2] = None
+        self.goal = -1
+        self.g: List[float] = []
+        self.next_cell: List[int] = []
+        self.settled = bytearray()
+        self.heap: List[Tuple[float, float, int]] = []
+        self.km = 0.0
+        self.last_start = -1
+        self.failed = False
+        self.waypoint: Optional[Vector2] = None
+        self.waypoint_from = -1
+        self.expanded = 0
+
+    def retarget(self, target: Vector2) -> None:
+        grid = self.grid
+        self.target = target.copy()
+        self.waypoint = None
+        self.waypoint_from = -1
+        goal = grid.free_cell_near(grid.cell_of(target))
+        if goal == self.goal and goal >= 0:
+            return  # same goal cell: the search tree still holds
+        self.goal = goal
+        self.failed = goal < 0
+        count = grid.rows * grid.cols
+        self.g = [math.inf] * count
+        self.next_cell = [-1] * count
+        self.settled = bytearray(count)
+        self.heap = []
+        self.km = 0.0
+        self.last_start = -1
+        if goal >= 0:
+            self.g[goal] = 0.0
+            self.heap.append((0.0, 0.0, goal))
+
+    def clear(self) -> None:
+        self.target = None
+        self.goal = -1
+        self.waypoint = None
+
+    @property
+    def planning(self) -> bool:
+        return self.target is not None and not self.failed and self.waypoint is None
+
+    def update(self, knight: "Knight") -> Optional[Vector2]:
+        """Advance the plan by one tick's budget; the point the knight should steer at, or None."""
+        if self.target is None or self.failed:
+            return None
+        grid = self.grid
+        start = grid.free_cell_near(grid.cell_of(knight.pos))
+        if start < 0:
+            return None
+        deadline = time.perf_counter() + self.time_budget if self.time_budget is not None else None
+        if self.last_start >= 0 and start != self.last_start:
+            self.km += grid.heuristic(self.last_start, start)
+        self.last_start = start
+        if not self.settled[start]:
+            self._search(start, deadline)
+            if not self.settled[start]:
+                return None
+        if start != self.waypoint_from or self.waypoint is None or (
+            knight.pos.distance_squared_to(self.waypoint) <= NAV_ARRIVE_RADIUS * NAV_ARRIVE_RADIUS
+            and self.waypoint is not self.target
+        ):
+            self.waypoint = self._next_waypoint(knight.pos, start, deadline)
+            self.waypoint_from = start
+        return self.waypoint
+
+    def _search(self, start: int, deadline: Optional[float]) -> None:
+        grid = self.grid
+        g = self.g
+        next_cell = self.next_cell
+        settled = self.settled
+        heap = self.heap
+        links = grid.links
+        heuristic = grid.heuristic
+        km = self.km
+        budget = self.expansions
+        while heap and budget > 0:
+            key, cost, cell = heapq.heappop(heap)
+            if settled[cell] or cost > g[cell]:
+                continue
+            fresh = cost + heuristic(cell, start) + km
+            if key < fresh - 1e-9:
+                heapq.heappush(heap, (fresh, cost, cell))
+                continue
+            settled[cell] = 1
+            budget -= 1
+            for other, step in links[cell]:
+                total = cost + step
+                if total < g[other]:
+                    g[other] = total
+                    next_cell[other] = cell
+                    heapq.heappush(heap, (total + heuristic(other, start) + km, total, other))
+            if cell == start:
+                break
+            if deadline is not None and not budget & 15 and time.perf_counter() > deadline:
+                break
+        self.expanded += self.expansions - budget
+        if not heap and not settled[start]:
+            self.failed = True
+
+    def path_cells(self, start: int, limit: int) -> List[int]:
+        """Up to ``limit`` cells from ``start`` towards the goal, following the search tree."""
+        cells = [start]
+        next_cell = self.next_cell
+        while cells[-1] != self.goal and len(cells) < limit:
+            step = next_cell[cells[-1]]
+            if step < 0:
+                break
+            cells.append(step)
+        return cells
+
+    def _next_waypoint(self, pos: Vector2, start: int, deadline: Optional[float]) -> Vector2:
+        grid = self.grid
+        cells = self.path_cells(start, NAV_SMOOTH_LOOKAHEAD + 1)
+        points = [grid.centre(cell) for cell in cells[1:]]
+        if cells[-1] == self.goal:
+            # Finish on the clicked point itself when it is walkable, else on the goal cell.
+            target = self.target
+            if not points or grid.cell_of(target) == self.goal:
+                points.append(target)
+        for point in reversed(points):
+            if not grid.line_blocked(pos, point):
+                return point
+            if deadline is not None and time.perf_counter() > deadline:
+                break  # out of time this tick: the next cell is always a safe step
+        return points[0] if points else self.target
+
+    def debug_path(self, pos: Vector2) -> Tuple[Tuple[float, float], ...]:
+        """The knight's position, current waypoint and raw cells ahead, for the debug overlay."""
+        if self.waypoint is None or self.last_start < 0:
+            return ()
+        cells = self.path_cells(self.waypoint_from, 10_000)
+        points = [pos.xy, self.waypoint.xy]
+        points.extend(self.grid.centre(cell).xy for cell in cells[1:])
+        return tuple(points)
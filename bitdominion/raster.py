@@ -0,0 +1,147 @@
+"""Multi-channel NumPy rasters of the battlefield for analysis and learning."""
+
+import functools
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import numpy as np
+
+from .config import FOREST_CANOPY_TREE_THRESHOLD, HEIGHT, OBS_RESOLUTION, OBS_SUSPICION_SCALE, SUS_CELL_SIZE, WIDTH
+from .units import UNIT_TYPES
+
+if TYPE_CHECKING:
+    from .match import Match
+
+RASTER_STATIC = ("trees", "roads", "canopy")
+RASTER_CHANNELS = (
+    RASTER_STATIC
+    + tuple(f"units_{name.lower()}" for name in UNIT_TYPES)
+    + ("villagers", "seals", "suspicion", "knight")
+)
+UNITS_CHANNEL = len(RASTER_STATIC)
+VILLAGERS_CHANNEL = RASTER_CHANNELS.index("villagers")
+SEALS_CHANNEL = RASTER_CHANNELS.index("seals")
+SUSPICION_CHANNEL = RASTER_CHANNELS.index("suspicion")
+KNIGHT_CHANNEL = RASTER_CHANNELS.index("knight")
+
+
+@functools.lru_cache(maxsize=8)
+def _pixel_cells(resolution: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Raster cell of every arena pixel (flattened, row-major) and the pixel count of every cell."""
+    rows = np.arange(HEIGHT) * resolution // HEIGHT
+    cols = np.arange(WIDTH) * resolution // WIDTH
+    cells = (rows[:, None] * resolution + cols[None, :]).ravel()
+    return cells, np.bincount(cells, minlength=resolution * resolution).astype(np.float64)
+
+
+class ObservationRaster:
+    """A preallocated (channel, row, col) float32 picture of one Match, refreshed in place.
+
+    Channels are RASTER_CHANNELS. The terrain channels hold the fraction of each
+    pixel covered by tree trunks, road and canopy; they are written once, when
+    the raster is built. update() zeroes the dynamic channels and scatters the
+    live state into them: unit counts per type, villager counts, intact seals,
+    suspicion (1.0 at OBS_SUSPICION_SCALE and above) and the knight. Nothing is
+    reallocated per tick. ``buffer``, ``static``, ``dynamic`` and channel()
+    are views of one array, so readers always see the latest update without a
+    copy; copy them to keep a frame.
+
+    ``resolution`` pixels per side downsamples the 900x900 arena (64 for a
+    64x64 raster; WIDTH for one pixel per arena pixel). ``out`` lets callers
+    supply the array, for example one slot of a batched buffer.
+    """
+
+    def __init__(self, match: "Match", resolution: int = OBS_RESOLUTION, out: Optional[np.ndarray] = None) -> None:
+        if not 1 <= resolution <= min(WIDTH, HEIGHT):
+            raise ValueError(f"raster resolution must be between 1 and {min(WIDTH, HEIGHT)}, got {resolution}")
+        shape = (len(RASTER_CHANNELS), resolution, resolution)
+        if out is None:
+            out = np.zeros(shape, dtype=np.float32)
+        elif out.shape != shape or out.dtype != np.float32 or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a C-contiguous float32 array of shape {shape}")
+        self.match = match
+        self.resolution = resolution
+        self.plane = resolution * resolution
+        self.scale_x = resolution / WIDTH
+        self.scale_y = resolution / HEIGHT
+        self.buffer = out
+        self.flat = out.reshape(-1)
+        self.static = out[:UNITS_CHANNEL]
+        self.dynamic = out[UNITS_CHANNEL:]
+        suspicion = match.suspicion
+        centre_y = (np.arange(resolution) + 0.5) / self.scale_y
+        centre_x = (np.arange(resolution) + 0.5) / self.scale_x
+        sus_rows = np.minimum((centre_y // SUS_CELL_SIZE).astype(np.intp), suspicion.rows - 1)
+        sus_cols = np.minimum((centre_x // SUS_CELL_SIZE).astype(np.intp), suspicion.cols - 1)
+        self.suspicion_cells = sus_rows[:, None] * suspicion.cols + sus_cols[None, :]
+        self._write_static()
+        self.update()
+
+    def _write_static(self) -> None:
+        world = self.match.world
+        trees = np.zeros((HEIGHT, WIDTH), dtype=bool)
+        canopy = np.zeros((HEIGHT, WIDTH), dtype=np.int16)
+        for tree in world.tree_shapes:
+            reach = tree.canopy_radius
+            top = max(0, int(tree.y - reach))
+            bottom = min(HEIGHT, int(tree.y + reach) + 2)
+            left = max(0, int(tree.x - reach))
+            right = min(WIDTH, int(tree.x + reach) + 2)
+            dy = np.arange(top, bottom) + 0.5 - tree.y
+            dx = np.arange(left, right) + 0.5 - tree.x
+            dist_sq = dy[:, None] ** 2 + dx[None, :] ** 2
+            trees[top:bottom, left:right] |= dist_sq <= tree.radius * tree.radius
+            canopy[top:bottom, left:right] += dist_sq <= tree.canopy_sq
+        masks = (trees, world.road_mask, canopy >= FOREST_CANOPY_TREE_THRESHOLD)
+        if self.resolution == WIDTH == HEIGHT:
+            for channel, mask in zip(self.static, masks):
+                channel[...] = mask
+            return
+        cells, area = _pixel_cells(self.resolution)
+        for channel, mask in zip(self.static, masks):
+            covered = np.bincount(cells, weights=mask.ravel(), minlength=self.plane)
+            np.divide(covered, area, out=covered)
+            channel.reshape(-1)[:] = covered
+
+    def _cells(self, xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+        last = self.resolution - 1
+        cols = np.clip((xs * self.scale_x).astype(np.intp), 0, last)
+        rows = np.clip((ys * self.scale_y).astype(np.intp), 0, last)
+        return rows * self.resolution + cols
+
+    def update(self) -> np.ndarray:
+        """Rewrite the dynamic channels from the match's current state; the whole raster."""
+        match = self.match
+        plane = self.plane
+        flat = self.flat
+        self.dynamic.fill(0.0)
+        units = [unit for unit in match.ai.units if unit.alive]
+        if units:
+            count = len(units)
+            xs = np.fromiter((unit.pos.x for unit in units), dtype=np.float64, count=count)
+            ys = np.fromiter((unit.pos.y for unit in units), dtype=np.float64, count=count)
+            kinds = np.fromiter((unit.kind.index for unit in units), dtype=np.intp, count=count)
+            np.add.at(flat, (UNITS_CHANNEL + kinds) * plane + self._cells(xs, ys), 1.0)
+        villagers = [villager for village in match.world.villages for villager in village.villagers if villager.alive]
+        if villagers:
+            count = len(villagers)
+            xs = np.fromiter((villager.pos.x for villager in villagers), dtype=np.float64, count=count)
+            ys = np.fromiter((villager.pos.y for villager in villagers), dtype=np.float64, count=count)
+            np.add.at(flat, VILLAGERS_CHANNEL * plane + self._cells(xs, ys), 1.0)
+        if match.seals:
+            count = len(match.seals)
+            xs = np.fromiter((seal.pos.x for seal in match.seals), dtype=np.float64, count=count)
+            ys = np.fromiter((seal.pos.y for seal in match.seals), dtype=np.float64, count=count)
+            flat[SEALS_CHANNEL * plane + self._cells(xs, ys)] = 1.0
+        suspicion = self.buffer[SUSPICION_CHANNEL]
+        np.take(match.suspicion.grid, self.suspicion_cells, out=suspicion)
+        np.multiply(suspicion, 1.0 / OBS_SUSPICION_SCALE, out=suspicion)
+        np.minimum(suspicion, 1.0, out=suspicion)
+        knight = match.knight.pos
+        row = min(self.resolution - 1, max(0, int(knight.y * self.scale_y)))
+        col = min(self.resolution - 1, max(0, int(knight.x * self.scale_x)))
+        flat[KNIGHT_CHANNEL * plane + row * self.resolution + col] = 1.0
+        return self.buffer
+
+    def channel(self, name: str) -> np.ndarray:
+        """A (row, col) view of the named channel."""
+        return self.buffer[RASTER_CHANNELS.index(name)]
@@ -0,0 +1,254 @@
+"""Delta-compressed match stream for local spectators (see frontend.SpectatorView for the viewer)."""
+
+import json
+import math
+import os
+import socket
+import struct
+import zlib
+from typing import TYPE_CHECKING, Dict, List, Tuple
+
+import numpy as np
+
+from .config import (
+    CASTLE_POS,
+    CASTLE_RADIUS,
+    CASTLE_SHIELD_EXTRA,
+    HEIGHT,
+    KNIGHT_HP,
+    ROAD_WIDTH,
+    SEAL_CHANNEL_TIME,
+    SPECTATOR_DELTA,
+    SPECTATOR_KEYFRAME,
+    SPECTATOR_MAX_BACKLOG,
+    SPECTATOR_QUANTUM,
+    SPECTATOR_SUSPICION_SCALE,
+    SUS_CELL_SIZE,
+    WIDTH,
+)
+from .core import swap_remove
+from .units import UNIT_TYPES
+
+if TYPE_CHECKING:
+    from .match import Match
+
+
+def open_spectator_socket(address: str, server: bool) -> socket.socket:
+    """Open a "unix:/path" or "[host:]port" stream socket, listening when ``server`` is set."""
+    if address.startswith("unix:"):
+        path = address[len("unix:"):]
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        if server:
+            if os.path.exists(path):
+                os.unlink(path)
+            sock.bind(path)
+        else:
+            sock.connect(path)
+    else:
+        host, _, port = address.rpartition(":")
+        endpoint = (host or "127.0.0.1", int(port))
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if server:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(endpoint)
+        else:
+            sock.connect(endpoint)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    if server:
+        sock.listen()
+    sock.setblocking(False)
+    return sock
+
+
+class SpectatorFeed:
+    """Streams a keyframe and then per-tick deltas of changed entities to local spectators.
+
+    Every message is a FRAME_HEADER (type, payload length) followed by the payload.
+    The keyframe holds the static world, seals, chests, patrol anchors, unit
+    types and the suspicion grid (row-major uint8 levels, 255 at
+    SPECTATOR_SUSPICION_SCALE) as zlib-compressed JSON. A delta holds the
+    knight, then four sections for units, villagers, seals and chests:
+    (updates, removals) counts, then ENTITY_RECORDs (uid, quantized x,
+    quantized y, state byte), then removed uids. Chests are numbered by their
+    place in the keyframe and their state is CHEST_CLOSED, CHEST_OPENED (its
+    valor shard still lies there) or CHEST_LOOTED. Last comes the count of
+    suspicion cells whose level changed, their uint16 indices and their uint8
+    levels. Only what changed since the previous tick is sent. New clients
+    receive the keyframe and a delta against an empty baseline.
+    """
+
+    FRAME_HEADER = struct.Struct("<BI")
+    DELTA_HEADER = struct.Struct("<IHHBB")  # tick, knight x, knight y, knight hp, flags
+    SECTION_HEADER = struct.Struct("<HH")
+    ENTITY_RECORD = struct.Struct("<IHHB")
+    SUSPICION_HEADER = struct.Struct("<H")
+    FLAG_SWING, FLAG_SHIELD, FLAG_VICTORY, FLAG_DEFEAT = 1, 2, 4, 8
+    CHEST_CLOSED, CHEST_OPENED, CHEST_LOOTED = range(3)
+
+    def __init__(self, address: str) -> None:
+        self.address = address
+        self.listener = open_spectator_socket(address, server=True)
+        self.clients: List[Tuple[socket.socket, bytearray]] = []
+        self.baseline: Tuple[Dict[int, Tuple[int, int, int]], ...] = ({}, {}, {}, {})
+        self.baseline_suspicion = np.zeros(0, dtype=np.uint8)
+
+    @staticmethod
+    def quantize(value: float) -> int:
+        return min(0xFFFF, max(0, int(value * SPECTATOR_QUANTUM + 0.5)))
+
+    def publish(self, game: "Match") -> None:
+        """Send this tick's delta to connected clients and admit new ones."""
+        current = self._capture(game)
+        suspicion = self._capture_suspicion(game)
+        if self.clients:
+            payload = self._encode_delta(game, self.baseline, current, self.baseline_suspicion, suspicion)
+            self._broadcast(self._frame(SPECTATOR_DELTA, payload))
+        self.baseline = current
+        self.baseline_suspicion = suspicion
+        self._accept(game)
+
+    def close(self) -> None:
+        for sock, _outbox in self.clients:
+            sock.close()
+        self.clients.clear()
+        self.listener.close()
+        if self.address.startswith("unix:") and os.path.exists(self.address[len("unix:"):]):
+            os.unlink(self.address[len("unix:"):])
+
+    def _capture(self, game: "Match") -> Tuple[Dict[int, Tuple[int, int, int]], ...]:
+        q = self.quantize
+        units = {}
+        for unit in game.ai.units:
+            if unit.alive:
+                state = unit.kind.index << 4 | unit.state
+                if unit.reveal_active > 0.0:
+                    state |= 0x80
+                units[unit.uid] = (q(unit.pos.x), q(unit.pos.y), state)
+        villagers = {
+            villager.uid: (q(villager.pos.x), q(villager.pos.y), villager.state | villager.alarmed << 1)
+            for village in game.world.villages
+            for villager in village.villagers
+            if villager.alive
+        }
+        seals = {
+            seal.uid: (q(seal.pos.x), q(seal.pos.y), int(255 * min(1.0, seal.progress / SEAL_CHANNEL_TIME)))
+            for seal in game.seals
+        }
+        # A chest's shard is dropped on the chest itself and stays put until collected.
+        shards = {(shard.pos.x, shard.pos.y) for shard in game.world.valor_shards}
+        chests = {}
+        for index, chest in enumerate(chest for village in game.world.villages for chest in village.chests):
+            if not chest.opened:
+                state = self.CHEST_CLOSED
+            elif (chest.pos.x, chest.pos.y) in shards:
+                state = self.CHEST_OPENED
+            else:
+                state = self.CHEST_LOOTED
+            chests[index] = (q(chest.pos.x), q(chest.pos.y), state)
+        return units, villagers, seals, chests
+
+    @staticmethod
+    def _capture_suspicion(game: "Match") -> np.ndarray:
+        """The suspicion grid as flat uint8 levels."""
+        levels = game.suspicion.grid.ravel() * (255.0 / SPECTATOR_SUSPICION_SCALE)
+        np.minimum(levels, 255.0, out=levels)
+        return levels.astype(np.uint8)
+
+    def _encode_delta(
+        self,
+        game: "Match",
+        previous: Tuple[Dict[int, Tuple[int, int, int]], ...],
+        current: Tuple[Dict[int, Tuple[int, int, int]], ...],
+        previous_suspicion: np.ndarray,
+        suspicion: np.ndarray,
+    ) -> bytes:
+        knight = game.knight
+        flags = 0
+        if knight.swing_timer > 0.0:
+            flags |= self.FLAG_SWING
+        if game.shield_active:
+            flags |= self.FLAG_SHIELD
+        if game.victory:
+            flags |= self.FLAG_VICTORY
+        if game.defeat:
+            flags |= self.FLAG_DEFEAT
+        hp = min(255, max(0, int(math.ceil(knight.hp))))
+        parts = [self.DELTA_HEADER.pack(game.tick, self.quantize(knight.pos.x), self.quantize(knight.pos.y), hp, flags)]
+        record = self.ENTITY_RECORD.pack
+        for old, new in zip(previous, current):
+            changed = [record(uid, *value) for uid, value in new.items() if old.get(uid) != value]
+            removed = [uid for uid in old if uid not in new]
+            parts.append(self.SECTION_HEADER.pack(len(changed), len(removed)))
+            parts.extend(changed)
+            parts.append(struct.pack(f"<{len(removed)}I", *removed))
+        if previous_suspicion.shape == suspicion.shape:
+            cells = np.flatnonzero(previous_suspicion != suspicion)
+        else:
+            cells = np.flatnonzero(suspicion)
+        parts.append(self.SUSPICION_HEADER.pack(len(cells)))
+        parts.append(cells.astype("<u2").tobytes())
+        parts.append(suspicion[cells].tobytes())
+        return b"".join(parts)
+
+    def _keyframe(self, game: "Match") -> bytes:
+        world = game.world
+        data = {
+            "size": [WIDTH, HEIGHT],
+            "quantum": SPECTATOR_QUANTUM,
+            "castle": [CASTLE_POS.x, CASTLE_POS.y, CASTLE_RADIUS, CASTLE_SHIELD_EXTRA],
+            "trees": [[tree.x, tree.y, tree.radius] for tree in world.tree_shapes],
+            "roads": [[start.x, start.y, end.x, end.y] for start, end in world.road_segments],
+            "road_width": ROAD_WIDTH,
+            "huts": [[hut.left, hut.top, hut.right - hut.left, hut.bottom - hut.top] for hut in world.hut_shapes],
+            "wells": [[village.well.pos.x, village.well.pos.y] for village in world.villages],
+            "seals": [[seal.uid, seal.pos.x, seal.pos.y] for seal in game.seals],
+            "chests": [[chest.pos.x, chest.pos.y] for village in world.villages for chest in village.chests],
+            "anchors": [[anchor.x, anchor.y] for anchor in game.suspicion.anchors],
+            "suspicion": {
+                "rows": game.suspicion.rows,
+                "cols": game.suspicion.cols,
+                "cell": SUS_CELL_SIZE,
+                "levels": self.baseline_suspicion.tolist(),
+            },
+            "unit_types": [[kind.name, kind.size, kind.color, kind.chase_color] for kind in UNIT_TYPES.values()],
+            "hp": KNIGHT_HP,
+        }
+        return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+
+    def _frame(self, kind: int, payload: bytes) -> bytes:
+        return self.FRAME_HEADER.pack(kind, len(payload)) + payload
+
+    def _accept(self, game: "Match") -> None:
+        while True:
+            try:
+                sock, _ = self.listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            empty: Tuple[Dict[int, Tuple[int, int, int]], ...] = ({}, {}, {}, {})
+            suspicion = self.baseline_suspicion
+            outbox = bytearray(self._frame(SPECTATOR_KEYFRAME, self._keyframe(game)))
+            outbox += self._frame(SPECTATOR_DELTA, self._encode_delta(game, empty, self.baseline, suspicion, suspicion))
+            self.clients.append((sock, outbox))
+            self._flush(len(self.clients) - 1)
+
+    def _broadcast(self, frame: bytes) -> None:
+        for i in range(len(self.clients) - 1, -1, -1):
+            self.clients[i][1].extend(frame)
+            self._flush(i)
+
+    def _flush(self, index: int) -> None:
+        """Send what the socket takes now; drop clients that hung up or fell too far behind."""
+        sock, outbox = self.clients[index]
+        try:
+            while outbox:
+                sent = sock.send(outbox)
+                del outbox[:sent]
+            healthy = True
+        except (BlockingIOError, InterruptedError):
+            healthy = len(outbox) <= SPECTATOR_MAX_BACKLOG
+        except OSError:
+            healthy = False
+        if not healthy:
+            sock.close()
+            swap_remove(self.clients, index)
@@ -0,0 +1,794 @@
+"""The knight, Dark Lord units and seals, plus batched unit sight lines and the combat phase."""
+
+import math
+import random
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import (
+    ARENA_PADDING,
+    CASTLE_POS,
+    COMBAT_CELL_SIZE,
+    ENEMY_VILLAGER_ATTACK_COOLDOWN,
+    EVENT_SCOUT_HOWL,
+    EVENT_UNIT_KILLED,
+    HEIGHT,
+    KNIGHT_ACCEL,
+    KNIGHT_CANOPY_DETECTION_MULT,
+    KNIGHT_CANOPY_SPEED_MULT,
+    KNIGHT_COLLISION_RADIUS,
+    KNIGHT_CONTACT_DPS,
+    KNIGHT_CONTACT_PUSH,
+    KNIGHT_FRICTION,
+    KNIGHT_HP,
+    KNIGHT_MAX_SPEED,
+    KNIGHT_SPRINT_CLICK_INTERVAL,
+    PRIEST_ATTACK_COOLDOWN,
+    PRIEST_ATTACK_DAMAGE,
+    PRIEST_ATTACK_RANGE,
+    PRIEST_REVEAL_DURATION,
+    PRIEST_REVEAL_RADIUS,
+    PRIEST_REVEAL_TIME,
+    ROAD_SPEED_MULT,
+    SEAL_CHANNEL_RADIUS,
+    SEAL_CHANNEL_TIME,
+    SPIRAL_ANGULAR_SPEED,
+    SPIRAL_RADIUS_SPEED,
+    SPIRAL_SEARCH_TIME,
+    SWING_COOLDOWN,
+    SWING_DURATION,
+    SWING_HALF_ARC_COS,
+    SWING_RANGE,
+    TANK_KNOCKBACK,
+    UNIT_CHASE,
+    UNIT_DATA,
+    UNIT_HUNT,
+    UNIT_IDLE,
+    UNIT_INVESTIGATE,
+    UNIT_SPIRAL,
+    UNIT_VILLAGER_HUNT_RADIUS,
+    WIDTH,
+)
+from .core import SpatialHash, next_entity_id
+from .geometry import Vector2
+
+if TYPE_CHECKING:
+    from .ai import Squad, SuspicionGrid
+    from .events import EventLog
+    from .match import Match
+    from .nav import KnightNavigator
+    from .world import Census, Villager, World
+
+
+@dataclass
+class Seal:
+    pos: Vector2
+    progress: float = 0.0
+    channeling: bool = False
+    uid: int = field(default_factory=lambda: next_entity_id())
+
+    def update(self, knight_pos: Vector2, dt: float) -> Tuple[bool, bool]:
+        started = False
+        if knight_pos.distance_to(self.pos) <= SEAL_CHANNEL_RADIUS:
+            if not self.channeling:
+                started = True
+            self.channeling = True
+            self.progress = min(SEAL_CHANNEL_TIME, self.progress + dt)
+        else:
+            self.channeling = False
+            if self.progress < SEAL_CHANNEL_TIME:
+                self.progress = max(0.0, self.progress - dt * 0.5)
+        completed = self.progress >= SEAL_CHANNEL_TIME
+        return completed, started
+
+    def render_state(self) -> Tuple[float, float, Optional[float]]:
+        pct = None
+        if self.channeling or self.progress > 0.0:
+            pct = min(1.0, self.progress / SEAL_CHANNEL_TIME)
+        return (self.pos.x, self.pos.y, pct)
+
+
+class Knight:
+    def __init__(self) -> None:
+        self.pos = CASTLE_POS + Vector2(0, 180)
+        self.vel = Vector2()
+        self.target = self.pos.copy()
+        self.hp = KNIGHT_HP
+        self.swing_timer = 0.0
+        self.swing_dir: Optional[Vector2] = None
+        self.swing_cooldown = 0.0
+        self.swing_cooldown_modifier = 0.0
+        self.swing_cooldown_duration = SWING_COOLDOWN
+        self.castle_timer = 0.0
+        self.last_click_time = -999.0
+        self.on_road = False
+        self.under_canopy = False
+        # With a navigator attached, the knight steers at its waypoints around
+        # obstacles; without one (or while the plan is still being searched),
+        # straight at the target.
+        self.nav: Optional["KnightNavigator"] = None
+        self.waypoint: Optional[Vector2] = None
+
+    def set_target(self, pos: Vector2, now: float, noise_cb) -> None:
+        if now - self.last_click_time <= KNIGHT_SPRINT_CLICK_INTERVAL:
+            noise_cb(self.pos, 1.0)
+        self.last_click_time = now
+        self.steer_to(pos)
+
+    def steer_to(self, pos: Vector2) -> None:
+        """A move order without the double-click sprint rule, for agents and scripts."""
+        self.target = pos
+        if self.nav is not None:
+            self.nav.retarget(pos)
+
+    def update(self, dt: float, world: "World") -> None:
+        if self.nav is not None:
+            self.waypoint = self.nav.update(self)
+        self.move(dt, world)
+        world.resolve_circle_collisions(self.pos, KNIGHT_COLLISION_RADIUS * 0.6, self.vel)
+        world.clamp_to_bounds(self.pos, KNIGHT_COLLISION_RADIUS * 0.5)
+        self._clamp()
+
+        if self.swing_timer > 0.0:
+            self.swing_timer = max(0.0, self.swing_timer - dt)
+            if self.swing_timer <= 0.0:
+                self.swing_dir = None
+                self.swing_cooldown = self.swing_cooldown_duration
+        if self.swing_cooldown > 0.0:
+            self.swing_cooldown = max(0.0, self.swing_cooldown - dt)
+
+    def _max_speed(self, world: "World") -> float:
+        self.on_road = world.is_on_road(self.pos)
+        self.under_canopy = world.knight_under_canopy(self.pos)
+        max_speed = KNIGHT_MAX_SPEED
+        if self.on_road:
+            max_speed *= ROAD_SPEED_MULT
+        elif self.under_canopy:
+            max_speed *= KNIGHT_CANOPY_SPEED_MULT
+        return max_speed
+
+    def move_scalar(self, dt: float, world: "World") -> None:
+        pos = self.pos
+        vel = self.vel
+        goal = self.waypoint if self.waypoint is not None else self.target
+        dx = goal.x - pos.x
+        dy = goal.y - pos.y
+        distance = math.sqrt(dx * dx + dy * dy)
+        if distance > 2:
+            vel.x += dx / distance * KNIGHT_ACCEL * dt
+            vel.y += dy / distance * KNIGHT_ACCEL * dt
+        else:
+            friction = max(0.0, 1.0 - KNIGHT_FRICTION * dt)
+            vel.x *= friction
+            vel.y *= friction
+        max_speed = self._max_speed(world)
+        vx = vel.x
+        vy = vel.y
+        speed = math.sqrt(vx * vx + vy * vy)
+        if speed > max_speed:
+            scale = max_speed / speed
+            vx *= scale
+            vy *= scale
+            vel.x = vx
+            vel.y = vy
+        pos.x += vx * dt
+        pos.y += vy * dt
+
+    def move_vector(self, dt: float, world: "World") -> None:
+        direction = (self.waypoint if self.waypoint is not None else self.target) - self.pos
+        distance = direction.length()
+        if distance > 2:
+            direction.normalize_ip()
+            self.vel += direction * KNIGHT_ACCEL * dt
+        else:
+            self.vel *= max(0.0, 1.0 - KNIGHT_FRICTION * dt)
+        max_speed = self._max_speed(world)
+        speed = self.vel.length()
+        if speed > max_speed:
+            self.vel.scale_to_length(max_speed)
+        self.pos += self.vel * dt
+
+    move = move_scalar
+
+    def collect_valor_shard(self) -> None:
+        self.swing_cooldown_modifier = min(0.3, self.swing_cooldown_modifier + 0.1)
+        self.swing_cooldown_duration = SWING_COOLDOWN * (1.0 - self.swing_cooldown_modifier)
+        self.swing_cooldown = min(self.swing_cooldown, self.swing_cooldown_duration)
+
+    def begin_swing(self, target_pos: Vector2) -> None:
+        direction = target_pos - self.pos
+        if direction.length_squared() == 0:
+            direction = Vector2(1, 0)
+        direction.normalize_ip()
+        self.swing_dir = direction
+        self.swing_timer = SWING_DURATION
+
+    def render_state(self) -> Tuple[float, float, Optional[Tuple[float, float]]]:
+        swing = None
+        if self.swing_timer > 0.0 and self.swing_dir is not None:
+            swing = (self.swing_dir.x, self.swing_dir.y)
+        return (self.pos.x, self.pos.y, swing)
+
+    def _clamp(self) -> None:
+        self.pos.x = max(ARENA_PADDING, min(WIDTH - ARENA_PADDING, self.pos.x))
+        self.pos.y = max(ARENA_PADDING, min(HEIGHT - ARENA_PADDING, self.pos.y))
+
+
+class UnitType:
+    """Per-type stats and behaviour hooks compiled once from UNIT_DATA."""
+
+    __slots__ = (
+        "name",
+        "size",
+        "speed",
+        "hp",
+        "detection",
+        "cost",
+        "color",
+        "chase_color",
+        "howls",
+        "hears_noise",
+        "knockback",
+        "reveals",
+        "perceive",
+        "patrol",
+        "index",
+    )
+
+    def __init__(self, name: str, data: Dict[str, object], index: int) -> None:
+        self.name = name
+        self.index = index
+        self.size = data["size"]
+        self.speed = float(data["speed"])
+        self.hp = float(data["hp"])
+        self.detection = float(data["detection"])
+        self.cost = data["cost"]
+        self.color = data["color"]
+        self.chase_color = tuple(min(255, int(c * 1.4)) for c in self.color)
+        self.howls = bool(data.get("howls", False))
+        self.hears_noise = bool(data.get("hears_noise", False))
+        self.knockback = bool(data.get("knockback", False))
+        self.reveals = bool(data.get("reveals", False))
+        self.perceive = Unit._perceive_reveal if self.reveals else Unit._perceive_plain
+        self.patrol = Unit._patrol_hotspot if data.get("patrol") == "hotspot" else Unit._patrol_ring
+
+
+class Unit:
+    def __init__(
+        self, unit_type: str, pos: Vector2, suspicion: "SuspicionGrid", census: "Census"
+    ) -> None:
+        self.pos = pos
+        self.vel = Vector2()
+        self.reset(unit_type, pos, suspicion, census)
+
+    def reset(
+        self, unit_type: str, pos: Vector2, suspicion: "SuspicionGrid", census: "Census"
+    ) -> None:
+        kind = UNIT_TYPES[unit_type]
+        self.uid = next_entity_id()
+        self.unit_type = unit_type
+        self.kind = kind
+        self.pos.update(pos)
+        self.vel.update(0, 0)
+        self.speed = kind.speed
+        self.size = kind.size
+        self.detection = kind.detection
+        self.max_hp = kind.hp
+        self.hp = kind.hp
+        self.color = kind.color
+        self.alive = True
+        self.state = UNIT_IDLE
+        self.target = pos.copy()
+        self.target_is_anchor = False
+        self.suspicion = suspicion
+        self.census = census
+        self.state_timer = 0.0
+        self.detect_timer = 0.0
+        self.reveal_timer = 0.0
+        self.reveal_active = 0.0
+        self.howled = False
+        self.spiral_origin: Optional[Vector2] = None
+        self.spiral_angle = 0.0
+        self.spiral_radius = 12.0
+        self.road_persist = 0.0
+        self.villager_target: Optional[Villager] = None
+        self.villager_attack_cooldown = 0.0
+        self.priest_attack_cooldown = 0.0
+        self.lod_dt = 0.0
+        self.lod_hold = 0.0
+        self.lod_phase = 0
+        # Set while the unit moves with a squad; slot 0 is the leader.
+        self.squad: Optional[Squad] = None
+        self.squad_slot = 0
+        # Published by KnightVisibility before the unit thinks.
+        self.knight_distance = float("inf")
+        self.knight_los = False
+        self.detection_scale = 1.0
+
+    def update(
+        self,
+        dt: float,
+        knight: Knight,
+        last_known: Optional[Vector2],
+        world: "World",
+        combat: "CombatResolver",
+        events: "EventLog",
+    ) -> Tuple[bool, bool]:
+        if not self.alive:
+            return False, False
+        detected = False
+
+        self.villager_attack_cooldown = max(0.0, self.villager_attack_cooldown - dt)
+        self.priest_attack_cooldown = max(0.0, self.priest_attack_cooldown - dt)
+
+        los_clear = self.knight_distance <= self.detection * self.detection_scale and self.knight_los
+        if los_clear:
+            self.detect_timer += dt
+        else:
+            self.detect_timer = max(0.0, self.detect_timer - dt * 0.5)
+            if self.detect_timer <= 1e-4:
+                self.detect_timer = 0.0
+                self.howled = False
+
+        kind = self.kind
+        just_revealed = kind.perceive(self, dt, combat)
+
+        if self.detect_timer >= 0.5:
+            detected = True
+            self.enter(UNIT_CHASE)
+            self.state_timer = 1.5
+            if kind.howls and not self.howled:
+                events.emit(EVENT_SCOUT_HOWL, self.uid, self.pos)
+                self.howled = True
+        elif self.state == UNIT_CHASE and self.state_timer <= 0.0:
+            self.start_spiral(last_known)
+
+        if world.is_on_road(self.pos):
+            self.road_persist = 2.0
+        else:
+            self.road_persist = max(0.0, self.road_persist - dt)
+
+        UNIT_STATE_HANDLERS[self.state](self, dt, knight, world, combat)
+
+        self.pos += self.vel * dt
+        self._clamp()
+        world.resolve_circle_collisions(self.pos, self.size * 1.4, self.vel)
+        world.clamp_to_bounds(self.pos, self.size)
+        return detected, just_revealed
+
+    # --- Per-type perception hooks (UnitType.perceive) ---
+    def _perceive_plain(self, dt: float, combat: "CombatResolver") -> bool:
+        self.reveal_timer = max(0.0, self.reveal_timer - dt)
+        return False
+
+    def _perceive_reveal(self, dt: float, combat: "CombatResolver") -> bool:
+        just_revealed = False
+        if self.knight_distance <= PRIEST_REVEAL_RADIUS and self.knight_los:
+            self.reveal_timer += dt
+            if self.reveal_timer >= PRIEST_REVEAL_TIME:
+                self.reveal_timer = PRIEST_REVEAL_TIME
+                if self.reveal_active <= 0.0:
+                    self.reveal_active = PRIEST_REVEAL_DURATION
+                    just_revealed = True
+        else:
+            self.reveal_timer = max(0.0, self.reveal_timer - dt)
+        if self.reveal_active > 0.0:
+            self.reveal_active = max(0.0, self.reveal_active - dt)
+        self._attempt_priest_attack(combat)
+        return just_revealed
+
+    # --- State handlers (UNIT_STATE_HANDLERS) ---
+    def _think_patrol(self, dt: float, knight: Knight, world: "World", combat: "CombatResolver") -> None:
+        """Idle and hunt: chase a villager in range, otherwise walk the patrol."""
+        if self.squad is not None and self.squad_slot:
+            self._follow_squad(dt, world, combat)
+        elif not self._update_villager_hunt(dt, world, combat):
+            self.idle_to_anchor(dt, world)
+
+    def _think_chase(self, dt: float, knight: Knight, world: "World", combat: "CombatResolver") -> None:
+        self.villager_target = None
+        self.chase_target(knight.pos, dt, world)
+        self.state_timer = max(0.0, self.state_timer - dt)
+
+    def _think_investigate(self, dt: float, knight: Knight, world: "World", combat: "CombatResolver") -> None:
+        self.villager_target = None
+        self.chase_target(self.target, dt, world)
+        self.state_timer = max(0.0, self.state_timer - dt)
+        if self.state_timer <= 0.0:
+            self.enter(UNIT_IDLE)
+
+    def _think_spiral(self, dt: float, knight: Knight, world: "World", combat: "CombatResolver") -> None:
+        if self.squad is not None and self.squad_slot:
+            self._follow_squad(dt, world, combat)
+            return
+        self.villager_target = None
+        if self.state_timer <= 0.0:
+            self.enter(UNIT_IDLE)
+            return
+        self.state_timer = max(0.0, self.state_timer - dt)
+        self.spiral_angle += SPIRAL_ANGULAR_SPEED * dt
+        self.spiral_radius += SPIRAL_RADIUS_SPEED * dt
+        origin = self.spiral_origin or self.pos
+        offset = Vector2(math.cos(self.spiral_angle), math.sin(self.spiral_angle)) * self.spiral_radius
+        self.chase_target(origin + offset, dt, world)
+
+    def _follow_squad(self, dt: float, world: "World", combat: "CombatResolver") -> None:
+        """Squad member: mirror the leader's state and steer by its decisions instead of making our own."""
+        squad = self.squad
+        leader = squad.leader
+        prey = leader.villager_target
+        if leader.state == UNIT_SPIRAL:
+            self.villager_target = None
+            self.enter(UNIT_SPIRAL)
+            self.state_timer = leader.state_timer
+            angle = leader.spiral_angle + squad.phase(self)
+            offset = Vector2(math.cos(angle), math.sin(angle)) * leader.spiral_radius
+            self.chase_target((leader.spiral_origin or leader.pos) + offset, dt, world)
+        elif leader.state == UNIT_HUNT and prey is not None and prey.alive:
+            self.villager_target = prey
+            self.enter(UNIT_HUNT)
+            self.chase_target(squad.encircle(self, prey.pos), dt, world)
+            if self.pos.distance_to(prey.pos) <= self.size + 6 and self.villager_attack_cooldown <= 0.0:
+                self.villager_attack_cooldown = ENEMY_VILLAGER_ATTACK_COOLDOWN
+                combat.strike_villager(self, prey)
+        else:
+            self.villager_target = None
+            self.enter(UNIT_IDLE)
+            self.chase_target(squad.slot_position(self), dt, world)
+
+    # --- Per-type patrol hooks (UnitType.patrol) ---
+    def _patrol_hotspot(self) -> Vector2:
+        if self.road_persist > 0.0 and self.target_is_anchor:
+            anchor_pos = self.target
+        else:
+            anchor_pos = self.suspicion.hotspot()
+        if self.pos.distance_to(anchor_pos) < 18:
+            anchor_pos = self.suspicion.hotspot()
+        return anchor_pos
+
+    def _patrol_ring(self) -> Vector2:
+        if self.road_persist > 0.0 and self.target_is_anchor:
+            return self.target
+        if not self.target_is_anchor or self.pos.distance_to(self.target) < 18:
+            return random.choice(self.suspicion.anchors)
+        return self.target
+
+    def idle_to_anchor(self, dt: float, world: "World") -> None:
+        self.target = self.kind.patrol(self)
+        self.target_is_anchor = True
+        self.chase_target(self.target, dt, world)
+
+    def chase_target_scalar(self, target: Vector2, dt: float, world: "World") -> None:
+        dx = target.x - self.pos.x
+        dy = target.y - self.pos.y
+        length_sq = dx * dx + dy * dy
+        if length_sq > 4:
+            length = math.sqrt(length_sq)
+            speed = self.speed * world.get_speed_multiplier(self.pos, "unit")
+            self.vel.x = dx / length * speed
+            self.vel.y = dy / length * speed
+        else:
+            damping = max(0.0, 1.0 - 5 * dt)
+            self.vel.x *= damping
+            self.vel.y *= damping
+
+    def chase_target_vector(self, target: Vector2, dt: float, world: "World") -> None:
+        direction = target - self.pos
+        if direction.length_squared() > 4:
+            direction.normalize_ip()
+            speed = self.speed * world.get_speed_multiplier(self.pos, "unit")
+            self.vel = direction * speed
+        else:
+            self.vel *= max(0.0, 1.0 - 5 * dt)
+
+    chase_target = chase_target_scalar
+
+    def damage(self, amount: float, knock_dir: Optional[Vector2] = None) -> None:
+        if not self.alive:
+            return
+        self.hp -= amount
+        if knock_dir is not None:
+            self.pos += knock_dir * 6
+        if self.hp <= 0:
+            self.alive = False
+            self.census.unit_died(self)
+            if self.squad is not None:
+                self.squad.leave(self)
+
+    def enter(self, state: int) -> None:
+        if self.alive and state != self.state:
+            self.census.unit_state(self.state, state)
+        self.state = state
+        if self.squad is not None and (state == UNIT_CHASE or state == UNIT_INVESTIGATE):
+            # Chasing and investigating are individual; the unit re-joins a squad later.
+            self.squad.leave(self)
+
+    def _attempt_priest_attack(self, combat: "CombatResolver") -> bool:
+        if self.priest_attack_cooldown > 0.0:
+            return False
+        if self.knight_distance > PRIEST_ATTACK_RANGE:
+            return False
+        if not self.knight_los:
+            return False
+        combat.priest_bolt(self)
+        self.priest_attack_cooldown = PRIEST_ATTACK_COOLDOWN
+        return True
+
+    def _update_villager_hunt(self, dt: float, world: "World", combat: "CombatResolver") -> bool:
+        if self.villager_target is None or not self.villager_target.alive:
+            self.villager_target = world.nearest_villager(self.pos, UNIT_VILLAGER_HUNT_RADIUS)
+        if self.villager_target is None:
+            self.enter(UNIT_IDLE)
+            return False
+        target_pos = self.villager_target.pos
+        self.enter(UNIT_HUNT)
+        self.chase_target(target_pos, dt, world)
+        if (
+            self.pos.distance_to(target_pos) <= self.size + 6
+            and self.villager_attack_cooldown <= 0.0
+        ):
+            self.villager_attack_cooldown = ENEMY_VILLAGER_ATTACK_COOLDOWN
+            combat.strike_villager(self, self.villager_target)
+            self.villager_target = None
+            self.enter(UNIT_IDLE)
+        return True
+
+    def start_spiral(self, last_known: Optional[Vector2]) -> None:
+        if last_known is None:
+            self.enter(UNIT_IDLE)
+            return
+        self.enter(UNIT_SPIRAL)
+        self.state_timer = SPIRAL_SEARCH_TIME
+        self.spiral_origin = last_known.copy()
+        self.spiral_angle = random.random() * 2 * math.pi
+        self.spiral_radius = 12.0
+
+    def investigate(self, pos: Vector2, duration: float = 2.0) -> None:
+        if not self.alive:
+            return
+        self.enter(UNIT_INVESTIGATE)
+        self.target = pos.copy()
+        self.target_is_anchor = False
+        self.state_timer = duration
+
+    def render_state(self) -> Tuple[float, float, int, Tuple[int, int, int], bool]:
+        color = self.kind.chase_color if self.state == UNIT_CHASE else self.color
+        return (self.pos.x, self.pos.y, self.size, color, self.kind.reveals and self.reveal_active > 0.0)
+
+    def _clamp(self) -> None:
+        self.pos.x = max(ARENA_PADDING, min(WIDTH - ARENA_PADDING, self.pos.x))
+        self.pos.y = max(ARENA_PADDING, min(HEIGHT - ARENA_PADDING, self.pos.y))
+
+
+UNIT_TYPES: Dict[str, UnitType] = {name: UnitType(name, data, i) for i, (name, data) in enumerate(UNIT_DATA.items())}
+
+UNIT_STATE_HANDLERS = (
+    Unit._think_patrol,  # UNIT_IDLE
+    Unit._think_chase,  # UNIT_CHASE
+    Unit._think_investigate,  # UNIT_INVESTIGATE
+    Unit._think_spiral,  # UNIT_SPIRAL
+    Unit._think_patrol,  # UNIT_HUNT
+)
+
+
+class KnightVisibility:
+    """Distance and line of sight from every thinking unit to the knight, batched per tick.
+
+    Each unit's sight line is tested against all nearby trees at once with the
+    same segment-circle test as World._line_circle_intersection, and the result
+    is written back onto the units for Unit.update to consume.
+    """
+
+    def __init__(self, world: "World") -> None:
+        self.world = world
+        self.tree_x = np.array([tree.x for tree in world.tree_shapes], dtype=np.float64)
+        self.tree_y = np.array([tree.y for tree in world.tree_shapes], dtype=np.float64)
+        self.tree_r = np.array([tree.radius for tree in world.tree_shapes], dtype=np.float64)
+        self.detection_scale = 1.0
+
+    def update(
+        self,
+        knight_pos: Vector2,
+        units: List[Unit],
+        debug_lines: Optional[List[Tuple[Tuple[float, float], Tuple[float, float]]]] = None,
+        followers: Sequence[Unit] = (),
+    ) -> None:
+        """Publish distance and sight line to the knight on ``units`` and ``followers``.
+
+        ``followers`` are squad members whose leader is in ``units``. Each
+        unit casts its own sight line, and only when the knight is within its
+        own detection (or priest bolt) range.
+        """
+        under_canopy = self.world.knight_under_canopy(knight_pos)
+        self.detection_scale = KNIGHT_CANOPY_DETECTION_MULT if under_canopy else 1.0
+        if followers:
+            units = [*units, *followers]
+        count = len(units)
+        if count == 0:
+            return
+        kx = knight_pos.x
+        ky = knight_pos.y
+        px = np.fromiter((unit.pos.x for unit in units), dtype=np.float64, count=count)
+        py = np.fromiter((unit.pos.y for unit in units), dtype=np.float64, count=count)
+        detect_range = np.fromiter((unit.detection for unit in units), dtype=np.float64, count=count)
+        detect_range *= self.detection_scale
+        priests = np.fromiter((unit.kind.reveals for unit in units), dtype=bool, count=count)
+        los_range = np.where(priests, np.maximum(detect_range, PRIEST_ATTACK_RANGE), detect_range)
+        dx = kx - px
+        dy = ky - py
+        distance = np.sqrt(dx * dx + dy * dy)
+        need = distance <= los_range
+        visible = need.copy()
+        rows = np.flatnonzero(need)
+        if rows.size and self.tree_x.size:
+            reach = float(los_range[rows].max())
+            tx = self.tree_x - kx
+            ty = self.tree_y - ky
+            near_reach = reach + self.tree_r
+            near = np.flatnonzero(tx * tx + ty * ty <= near_reach * near_reach)
+            if near.size:
+                visible[rows] = ~self._segments_hit_circles(
+                    px[rows], py[rows], dx[rows], dy[rows],
+                    self.tree_x[near], self.tree_y[near], self.tree_r[near],
+                )
+        distances = distance.tolist()
+        flags = visible.tolist()
+        scale = self.detection_scale
+        for i, unit in enumerate(units):
+            unit.knight_distance = distances[i]
+            unit.knight_los = flags[i]
+            unit.detection_scale = scale
+        if debug_lines is not None:
+            for i in np.flatnonzero(visible & (distance <= detect_range)).tolist():
+                debug_lines.append((units[i].pos.xy, knight_pos.xy))
+
+    @staticmethod
+    def _segments_hit_circles(
+        px: np.ndarray,
+        py: np.ndarray,
+        dx: np.ndarray,
+        dy: np.ndarray,
+        cx: np.ndarray,
+        cy: np.ndarray,
+        radius: np.ndarray,
+    ) -> np.ndarray:
+        """For each segment p -> p + d, whether it crosses the boundary of any circle."""
+        fx = px[:, None] - cx[None, :]
+        fy = py[:, None] - cy[None, :]
+        ddx = dx[:, None]
+        ddy = dy[:, None]
+        a = ddx * ddx + ddy * ddy
+        b = 2 * (fx * ddx + fy * ddy)
+        c = fx * fx + fy * fy - radius[None, :] * radius[None, :]
+        discriminant = b * b - 4 * a * c
+        with np.errstate(divide="ignore", invalid="ignore"):
+            root = np.sqrt(np.maximum(discriminant, 0.0))
+            t1 = (-b - root) / (2 * a)
+            t2 = (-b + root) / (2 * a)
+            hit = (discriminant >= 0) & (((t1 >= 0) & (t1 <= 1)) | ((t2 >= 0) & (t2 <= 1)))
+        degenerate = a[:, 0] == 0
+        if degenerate.any():
+            hit[degenerate] = c[degenerate] <= 0
+        return hit.any(axis=1)
+
+
+class CombatResolver:
+    """Collects the tick's attack intents and resolves them in a single combat phase.
+
+    Units queue priest bolts and villager strikes while they think; the knight's
+    swing and body contact are resolved afterwards through a spatial index and a
+    dot-product cone test, so the cost follows the number of engagements.
+    """
+
+    def __init__(self) -> None:
+        self.index: SpatialHash[Unit] = SpatialHash(COMBAT_CELL_SIZE)
+        self.priest_bolts: List[Unit] = []
+        self.villager_strikes: List[Tuple[Unit, Villager]] = []
+        self.hits: List[Unit] = []
+
+    def priest_bolt(self, unit: Unit) -> None:
+        self.priest_bolts.append(unit)
+
+    def strike_villager(self, unit: Unit, villager: "Villager") -> None:
+        self.villager_strikes.append((unit, villager))
+
+    def resolve(self, game: "Match", dt: float) -> None:
+        knight = game.knight
+        index = self.index
+        index.clear()
+        for unit in game.ai.units:
+            if unit.alive:
+                index.insert(unit, unit.pos)
+
+        for _ in self.priest_bolts:
+            knight.hp = max(0.0, knight.hp - PRIEST_ATTACK_DAMAGE)
+        for unit, villager in self.villager_strikes:
+            game.on_villager_killed(villager, unit)
+        self.priest_bolts.clear()
+        self.villager_strikes.clear()
+
+        self._resolve_swing(game)
+        self._resolve_contact(knight, dt)
+
+    def _closest_unit(self, pos: Vector2, radius: float) -> Optional[Unit]:
+        closest: Optional[Unit] = None
+        closest_sq = radius * radius
+        for unit in self.index.query(pos, radius):
+            if not unit.alive:
+                continue
+            dist_sq = unit.pos.distance_squared_to(pos)
+            if dist_sq <= closest_sq:
+                closest = unit
+                closest_sq = dist_sq
+        return closest
+
+    def _resolve_swing(self, game: "Match") -> None:
+        knight = game.knight
+        if knight.swing_timer <= 0.0:
+            if knight.swing_cooldown > 0.0:
+                return
+            target = self._closest_unit(knight.pos, SWING_RANGE)
+            if target is None:
+                return
+            knight.begin_swing(target.pos)
+        direction = knight.swing_dir
+        if direction is None:
+            return
+        kx = knight.pos.x
+        ky = knight.pos.y
+        fx = direction.x
+        fy = direction.y
+        range_sq = SWING_RANGE * SWING_RANGE
+        cone_sq = SWING_HALF_ARC_COS * SWING_HALF_ARC_COS
+        hits = self.hits
+        hits.clear()
+        for unit in self.index.query(knight.pos, SWING_RANGE):
+            if not unit.alive:
+                continue
+            dx = unit.pos.x - kx
+            dy = unit.pos.y - ky
+            dist_sq = dx * dx + dy * dy
+            if dist_sq > range_sq:
+                continue
+            # Inside the arc when cos(angle to swing direction) >= cos(half arc).
+            along = dx * fx + dy * fy
+            if along < 0.0 or along * along < cone_sq * dist_sq:
+                continue
+            hits.append(unit)
+        for unit in hits:
+            knock = None
+            if unit.kind.knockback:
+                knock = unit.pos - knight.pos
+                if knock.length_squared() > 0:
+                    knock.normalize_ip()
+            unit.damage(1, knock)
+            if not unit.alive:
+                game.spawn_noise(unit.pos)
+                game.events.emit(EVENT_UNIT_KILLED, unit.uid, unit.pos, unit.kind.index)
+            elif knock is not None:
+                unit.pos += knock * TANK_KNOCKBACK
+
+    def _resolve_contact(self, knight: Knight, dt: float) -> None:
+        kx = knight.pos.x
+        ky = knight.pos.y
+        radius_sq = KNIGHT_COLLISION_RADIUS * KNIGHT_COLLISION_RADIUS
+        push_x = 0.0
+        push_y = 0.0
+        for unit in self.index.query(knight.pos, KNIGHT_COLLISION_RADIUS):
+            if not unit.alive:
+                continue
+            dx = kx - unit.pos.x
+            dy = ky - unit.pos.y
+            dist_sq = dx * dx + dy * dy
+            if dist_sq > radius_sq:
+                continue
+            knight.hp = max(0, knight.hp - dt * KNIGHT_CONTACT_DPS)
+            if dist_sq > 0:
+                dist = math.sqrt(dist_sq)
+                push_x += dx / dist
+                push_y += dy / dist
+        if push_x or push_y:
+            knight.pos.x += push_x * KNIGHT_CONTACT_PUSH * dt
+            knight.pos.y += push_y * KNIGHT_CONTACT_PUSH * dt
@@ -0,0 +1,236 @@
+"""Many independent matches in one process, stepped together with batched knight orders."""
+
+import math
+import random
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import (
+    CASTLE_STAY_TIME,
+    FPS,
+    HEIGHT,
+    KNIGHT_HP,
+    KNIGHT_MAX_SPEED,
+    MAX_UNITS,
+    SEAL_COUNT,
+    VEC_FRAME_SKIP,
+    VEC_MAX_TICKS,
+    VEC_REWARD_DEFEAT,
+    VEC_REWARD_HP,
+    VEC_REWARD_SEAL,
+    VEC_REWARD_VICTORY,
+    WIDTH,
+)
+from .core import reset_entity_ids, restore_entity_ids
+from .geometry import Vector2
+from .match import Match
+from .raster import RASTER_CHANNELS, ObservationRaster
+
+# Columns of the state observation, each scaled to roughly [-1, 1].
+STATE_FEATURES = (
+    "knight_x",
+    "knight_y",
+    "knight_vx",
+    "knight_vy",
+    "knight_hp",
+    "swing_ready",
+    "castle_progress",
+    "seals_broken",
+    "shield_active",
+    "units",
+    "spotted",
+)
+
+
+class MatchVecEnv:
+    """``num_envs`` independently seeded Matches stepped in lockstep.
+
+    step() takes an (num_envs, 2) array of knight targets in pixels (a NaN row,
+    or the target the knight already has, gives no new order). Orders go
+    through Knight.steer_to, so frequent retargeting is not mistaken for
+    double-click sprinting and stays silent. step() then plays
+    ``frame_skip`` ticks of every match and returns batched observations,
+    rewards, dones and an info dict of arrays. A match that is won, lost or
+    reaches ``max_ticks`` is replaced by a freshly seeded one in the same
+    step; its last observation is kept in ``info["final_observation"]``.
+
+    The simulation draws from the module-level ``random`` and numbers entities
+    from a module-level counter, so every environment owns a saved random state
+    and id counter that are swapped in around its ticks. With ``knight_nav``
+    the planner runs without a wall-clock cap. Each episode therefore plays
+    exactly as ``random.seed(seed); Match(knight_nav=knight_nav)`` does
+    standalone, given the same orders, however many environments share the
+    process. The caller's random state is left as it was. Episode seeds are
+    handed out in order from ``seed``.
+
+    Per-environment bookkeeping (previous HP and seals, tick counts, seeds)
+    lives in NumPy arrays, so rewards, dones and info are computed once per
+    batch rather than per environment.
+
+    With ``raster_resolution`` set, ``rasters`` is a (num_envs, channel, row,
+    col) float32 array of ObservationRasters, one slot per environment,
+    refreshed in place after every reset and step rather than copied into the
+    returned observations. A slot whose episode ended shows the new episode.
+    """
+
+    def __init__(
+        self,
+        num_envs: int,
+        seed: int = 0,
+        frame_skip: int = VEC_FRAME_SKIP,
+        max_ticks: int = VEC_MAX_TICKS,
+        knight_nav: bool = False,
+        raster_resolution: Optional[int] = None,
+    ) -> None:
+        if num_envs < 1:
+            raise ValueError(f"need at least one environment, got {num_envs}")
+        if frame_skip < 1:
+            raise ValueError(f"frame_skip must be at least 1, got {frame_skip}")
+        self.num_envs = num_envs
+        self.frame_skip = frame_skip
+        self.max_ticks = max_ticks
+        self.knight_nav = knight_nav
+        self.next_seed = seed
+        self.matches: List[Optional[Match]] = [None] * num_envs
+        self.random_states: List[Optional[tuple]] = [None] * num_envs
+        self.entity_ids: List[Optional[Iterator[int]]] = [None] * num_envs
+        self.seeds = np.zeros(num_envs, dtype=np.int64)
+        self.episode_ticks = np.zeros(num_envs, dtype=np.int64)
+        self.episode_returns = np.zeros(num_envs)
+        self.hp = np.zeros(num_envs)
+        self.seals = np.zeros(num_envs, dtype=np.int64)
+        self.obs = np.zeros((num_envs, len(STATE_FEATURES)), dtype=np.float32)
+        self.raster_resolution = raster_resolution
+        self.raster_views: List[Optional[ObservationRaster]] = [None] * num_envs
+        self.rasters: Optional[np.ndarray] = None
+        if raster_resolution is not None:
+            self.rasters = np.zeros(
+                (num_envs, len(RASTER_CHANNELS), raster_resolution, raster_resolution), dtype=np.float32
+            )
+
+    def _start(self, index: int) -> None:
+        """Build a freshly seeded match for environment ``index`` (global state already swapped out)."""
+        old = self.matches[index]
+        if old is not None:
+            old.close()
+        seed = self.next_seed
+        self.next_seed += 1
+        random.seed(seed)
+        reset_entity_ids()
+        match = Match(knight_nav=self.knight_nav, nav_time_budget=None)
+        self.matches[index] = match
+        self.random_states[index] = random.getstate()
+        # Keep the counter this match numbers from; the spare left in its place is dropped on exit.
+        self.entity_ids[index] = reset_entity_ids()
+        self.seeds[index] = seed
+        self.episode_ticks[index] = 0
+        self.episode_returns[index] = 0.0
+        self.hp[index] = match.knight.hp
+        self.seals[index] = match.broken_seals
+        self._observe(index, match)
+        if self.rasters is not None:
+            self.raster_views[index] = ObservationRaster(match, self.raster_resolution, self.rasters[index])
+
+    def reset(self) -> np.ndarray:
+        """Start a fresh episode in every environment; the batched observation."""
+        saved_state = random.getstate()
+        saved_ids = reset_entity_ids()
+        try:
+            for index in range(self.num_envs):
+                self._start(index)
+        finally:
+            restore_entity_ids(saved_ids)
+            random.setstate(saved_state)
+        return self.obs.copy()
+
+    def step(self, targets: Sequence[Sequence[float]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Order every knight, play ``frame_skip`` ticks of every match; (obs, rewards, dones, info)."""
+        if self.matches[0] is None:
+            raise RuntimeError("call reset() before step()")
+        targets = np.asarray(targets, dtype=np.float64)
+        if targets.shape != (self.num_envs, 2):
+            raise ValueError(f"expected targets of shape ({self.num_envs}, 2), got {targets.shape}")
+        step = 1.0 / FPS
+        frame_skip = self.frame_skip
+        hp = np.empty(self.num_envs)
+        seals = np.empty(self.num_envs, dtype=np.int64)
+        victory = np.zeros(self.num_envs, dtype=bool)
+        defeat = np.zeros(self.num_envs, dtype=bool)
+        ticks = np.empty(self.num_envs, dtype=np.int64)
+        saved_state = random.getstate()
+        saved_ids = reset_entity_ids()
+        try:
+            for index, ((x, y), match) in enumerate(zip(targets.tolist(), self.matches)):
+                random.setstate(self.random_states[index])
+                restore_entity_ids(self.entity_ids[index])
+                knight = match.knight
+                if not (math.isnan(x) or math.isnan(y)) and (x != knight.target.x or y != knight.target.y):
+                    # Applied before the first tick, as a queued command would be.
+                    knight.steer_to(Vector2(x, y))
+                for _ in range(frame_skip):
+                    if match.victory or match.defeat:
+                        break
+                    match.update(step, (match.tick + 1) * step)
+                self.random_states[index] = random.getstate()
+                hp[index] = knight.hp
+                seals[index] = match.broken_seals
+                victory[index] = match.victory
+                defeat[index] = match.defeat
+                ticks[index] = match.tick
+                self._observe(index, match)
+                raster = self.raster_views[index]
+                if raster is not None:
+                    raster.update()
+
+            rewards = (
+                (seals - self.seals) * VEC_REWARD_SEAL
+                + (hp - self.hp) * VEC_REWARD_HP
+                + victory * VEC_REWARD_VICTORY
+                + defeat * VEC_REWARD_DEFEAT
+            ).astype(np.float32)
+            self.hp = hp
+            self.seals = seals
+            self.episode_ticks = ticks
+            self.episode_returns += rewards
+            truncated = (ticks >= self.max_ticks) & ~victory & ~defeat
+            dones = victory | defeat | truncated
+            info: Dict[str, np.ndarray] = {
+                "victory": victory,
+                "defeat": defeat,
+                "truncated": truncated,
+                "seals_broken": seals.copy(),
+                "episode_ticks": ticks.copy(),
+                "episode_return": self.episode_returns.copy(),
+                "seed": self.seeds.copy(),
+            }
+            if dones.any():
+                info["final_observation"] = np.where(dones[:, None], self.obs, np.nan).astype(np.float32)
+                for index in np.flatnonzero(dones).tolist():
+                    self._start(index)
+        finally:
+            restore_entity_ids(saved_ids)
+            random.setstate(saved_state)
+        return self.obs.copy(), rewards, dones, info
+
+    def _observe(self, index: int, match: Match) -> None:
+        knight = match.knight
+        row = self.obs[index]
+        row[0] = knight.pos.x / WIDTH
+        row[1] = knight.pos.y / HEIGHT
+        row[2] = knight.vel.x / KNIGHT_MAX_SPEED
+        row[3] = knight.vel.y / KNIGHT_MAX_SPEED
+        row[4] = knight.hp / KNIGHT_HP
+        row[5] = knight.swing_cooldown <= 0.0
+        row[6] = min(1.0, knight.castle_timer / CASTLE_STAY_TIME)
+        row[7] = match.broken_seals / SEAL_COUNT
+        row[8] = match.shield_active
+        row[9] = match.world.census.units / MAX_UNITS
+        row[10] = match.last_known_timer > 0.0
+
+    def close(self) -> None:
+        for match in self.matches:
+            if match is not None:
+                match.close()
+        self.matches = [None] * self.num_envs
+        self.raster_views = [None] * self.num_envs
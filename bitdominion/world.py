@@ -0,0 +1,1360 @@
+"""Terrain, villages and villagers: world generation, road network, collisions and sight lines."""
+
+import heapq
+import math
+import random
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import (
+    ARENA_PADDING,
+    CASTLE_POS,
+    CHEST_INTERACT_RADIUS,
+    CHEST_NOISE_STRENGTH,
+    CHEST_OPEN_TIME,
+    FOREST_CANOPY_EXTRA,
+    FOREST_CANOPY_TREE_THRESHOLD,
+    FOREST_CLUSTER_RADIUS,
+    FOREST_PATCH_RANGE,
+    HEIGHT,
+    HUT_BOUNDS_CACHE_SIZE,
+    HUT_SIZE,
+    KNIGHT_CANOPY_SPEED_MULT,
+    KNIGHT_HP,
+    ROAD_BVH_LEAF_SIZE,
+    ROAD_NODE_MERGE_RADIUS,
+    ROAD_ROUTE_CACHE_SIZE,
+    ROAD_SPEED_MULT,
+    ROAD_WIDTH,
+    SHARD_COLLECT_RADIUS,
+    TREES_PER_PATCH_RANGE,
+    TREE_RADIUS_RANGE,
+    UNIT_DATA,
+    UNIT_STATE_NAMES,
+    VILLAGER_ALARM_NOISE_STRENGTH,
+    VILLAGER_ARC_RADIUS,
+    VILLAGER_COLLISION_RADIUS,
+    VILLAGER_FEAR_RADIUS,
+    VILLAGER_FLEE,
+    VILLAGER_IDLE,
+    VILLAGER_IDLE_RADIUS,
+    VILLAGER_RESPAWN_INTERVAL,
+    VILLAGER_RESPAWN_VARIANCE,
+    VILLAGER_ROAD_FLEE_TIME,
+    VILLAGER_ROUTE_REACH,
+    VILLAGER_SPEED,
+    VILLAGER_STATE_NAMES,
+    VILLAGE_COUNT_RANGE,
+    VILLAGE_HUT_COUNT_RANGE,
+    VILLAGE_MIN_CASTLE_DIST,
+    VILLAGE_MIN_SEPARATION,
+    VILLAGE_RADIUS,
+    WELL_HEAL_RADIUS,
+    WELL_HEAL_TIME,
+    WELL_NOISE_STRENGTH,
+    WIDTH,
+)
+from .core import EntityPool, next_entity_id, swap_remove
+from .geometry import Rect, Vector2, rasterize_line
+from .units import UNIT_TYPES, Knight, Unit
+
+if TYPE_CHECKING:
+    from .match import Match
+
+
+@dataclass
+class Tree:
+    pos: Vector2
+    radius: float
+
+
+class TreeShape(NamedTuple):
+    """Frozen tree geometry for hot paths; canopy reach is pre-added and squared."""
+
+    x: float
+    y: float
+    radius: float
+    canopy_radius: float
+    canopy_sq: float
+
+    @classmethod
+    def from_tree(cls, tree: Tree) -> "TreeShape":
+        canopy = tree.radius + FOREST_CANOPY_EXTRA
+        return cls(tree.pos.x, tree.pos.y, tree.radius, canopy, canopy * canopy)
+
+
+class HutShape(NamedTuple):
+    """Frozen hut footprint in the integer coordinates Rect uses."""
+
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+
+@dataclass
+class ForestPatch:
+    center: Vector2
+    trees: List[Tree]
+
+    def __post_init__(self) -> None:
+        self.max_radius = max((tree.pos - self.center).length() + tree.radius for tree in self.trees)
+        min_x = min(tree.pos.x - tree.radius for tree in self.trees)
+        max_x = max(tree.pos.x + tree.radius for tree in self.trees)
+        min_y = min(tree.pos.y - tree.radius for tree in self.trees)
+        max_y = max(tree.pos.y + tree.radius for tree in self.trees)
+        self.bounds = Rect(int(min_x), int(min_y), int(max_x - min_x) + 1, int(max_y - min_y) + 1)
+        self.shapes: Tuple[TreeShape, ...] = tuple(TreeShape.from_tree(tree) for tree in self.trees)
+        canopy_reach = self.max_radius + FOREST_CANOPY_EXTRA
+        self.canopy_reach_sq = canopy_reach * canopy_reach
+
+    def under_canopy(self, pos: Vector2) -> bool:
+        x = pos.x
+        y = pos.y
+        dx = x - self.center.x
+        dy = y - self.center.y
+        if dx * dx + dy * dy > self.canopy_reach_sq:
+            return False
+        count = 0
+        for shape in self.shapes:
+            dx = x - shape.x
+            dy = y - shape.y
+            if dx * dx + dy * dy <= shape.canopy_sq:
+                count += 1
+                if count >= FOREST_CANOPY_TREE_THRESHOLD:
+                    return True
+        return False
+
+
+@dataclass
+class Hut:
+    center: Vector2
+    rect: Rect = field(init=False)
+
+    def __post_init__(self) -> None:
+        # Huts never move, so the footprint is built once instead of on every read.
+        self.rect = Rect(0, 0, HUT_SIZE, HUT_SIZE)
+        self.rect.center = self.center.xy
+
+    def shape(self) -> HutShape:
+        return HutShape(self.rect.left, self.rect.top, self.rect.right, self.rect.bottom)
+
+
+@dataclass
+class Well:
+    pos: Vector2
+    timer: float = 0.0
+
+
+@dataclass
+class Chest:
+    pos: Vector2
+    open_timer: float = 0.0
+    opened: bool = False
+
+
+@dataclass
+class ValorShard:
+    pos: Vector2
+    timer: float = 0.0
+
+
+@dataclass
+class Villager:
+    pos: Vector2
+    home: Vector2
+    village: "Village"
+    state: int = VILLAGER_IDLE
+    wander_target: Optional[Vector2] = None
+    wander_timer: float = 0.0
+    flee_direction: Optional[Vector2] = None
+    alarmed: bool = False
+    road_timer: float = 0.0
+    road_route: List[Vector2] = field(default_factory=list)
+    road_homeward: bool = False
+    calm_timer: float = 0.0
+    was_on_road: bool = False
+    hp: int = 1
+    alive: bool = True
+    uid: int = field(default_factory=lambda: next_entity_id())
+
+    @classmethod
+    def spawn(cls, pos: Vector2, home: Vector2, village: "Village") -> "Villager":
+        return cls(pos.copy(), home.copy(), village)
+
+    def reset(self, pos: Vector2, home: Vector2, village: "Village") -> None:
+        self.pos.update(pos)
+        self.home.update(home)
+        self.village = village
+        self.state = VILLAGER_IDLE
+        self.wander_target = None
+        self.wander_timer = 0.0
+        self.flee_direction = None
+        self.alarmed = False
+        self.road_timer = 0.0
+        self.road_route.clear()
+        self.road_homeward = False
+        self.calm_timer = 0.0
+        self.was_on_road = False
+        self.hp = 1
+        self.alive = True
+        self.uid = next_entity_id()
+
+    def update(
+        self,
+        dt: float,
+        world: "World",
+        knight: "Knight",
+        threats: List["Unit"],
+        game: "Match",
+    ) -> None:
+        if not self.alive:
+            return
+        state = self.state
+        alarmed = self.alarmed
+        nearest_threat: Optional[Vector2] = None
+        nearest_dist = float("inf")
+        for threat in threats:
+            if not threat.alive:
+                continue
+            dist = threat.pos.distance_to(self.pos)
+            if dist < nearest_dist:
+                nearest_dist = dist
+                nearest_threat = threat.pos
+        knight_threat = None
+        if knight.swing_timer > 0.0 and knight.pos.distance_to(self.pos) <= VILLAGER_ARC_RADIUS:
+            knight_threat = knight.pos
+
+        danger = False
+        danger_pos: Optional[Vector2] = None
+        if nearest_dist <= VILLAGER_FEAR_RADIUS:
+            danger = True
+            danger_pos = nearest_threat
+        elif knight_threat is not None:
+            danger = True
+            danger_pos = knight_threat
+
+        if danger and self.state != VILLAGER_FLEE:
+            self.start_flee(danger_pos, world, game)
+
+        if self.state == VILLAGER_FLEE:
+            self.flee_update(dt, world, danger_pos)
+        else:
+            self.idle_update(dt, world)
+
+        world.resolve_circle_collisions(self.pos, VILLAGER_COLLISION_RADIUS)
+        world.clamp_to_bounds(self.pos, 4.0)
+
+        if self.state == VILLAGER_FLEE:
+            self.calm_timer = 0.0
+        else:
+            if self.alarmed:
+                self.calm_timer += dt
+                if self.calm_timer >= 1.5:
+                    self.alarmed = False
+
+        # The kernels stay census-free; report whatever they changed in one place.
+        if self.state != state:
+            world.census.villager_state(state, self.state)
+        if self.alarmed != alarmed:
+            world.census.villager_alarm(self.village, self.alarmed)
+
+    def start_flee(
+        self,
+        threat_pos: Optional[Vector2],
+        world: "World",
+        game: "Match",
+    ) -> None:
+        self.state = VILLAGER_FLEE
+        base_dir = Vector2()
+        if threat_pos is not None:
+            base_dir = self.pos - threat_pos
+        if base_dir.length_squared() == 0:
+            base_dir = self.pos - self.village.center
+        if base_dir.length_squared() == 0:
+            base_dir = Vector2(1, 0)
+        base_dir.normalize_ip()
+        self.flee_direction = base_dir
+        self.alarmed = True
+        self.road_timer = 0.0
+        self.road_route.clear()
+        self.road_homeward = False
+        self.calm_timer = 0.0
+        self.was_on_road = False
+        game.spawn_noise(self.pos, VILLAGER_ALARM_NOISE_STRENGTH)
+
+    def flee_update_scalar(
+        self,
+        dt: float,
+        world: "World",
+        danger_pos: Optional[Vector2],
+    ) -> None:
+        pos = self.pos
+        speed = VILLAGER_SPEED * world.get_speed_multiplier(pos, "villager")
+        if self.flee_direction:
+            dx = self.flee_direction.x
+            dy = self.flee_direction.y
+        else:
+            dx = dy = 0.0
+        on_road = world.is_on_road(pos)
+        if on_road and not self.was_on_road and not self.road_homeward:
+            self.road_route = world.refuge_route(pos, danger_pos, self.village)
+            if not self.road_route:
+                road_dir, _ = world.nearest_road_direction(pos, danger_pos)
+                if road_dir.length_squared() > 0:
+                    dx = road_dir.x
+                    dy = road_dir.y
+                    self.flee_direction = road_dir
+            self.road_timer = VILLAGER_ROAD_FLEE_TIME
+        if self.road_timer > 0.0:
+            self.road_timer = max(0.0, self.road_timer - dt)
+        route = self.road_route
+        if route and self.road_timer <= 0.0:
+            route.clear()
+        center = self.village.center
+        if not on_road and self.road_timer <= 0.0 and not self.road_homeward:
+            cx = center.x - pos.x
+            cy = center.y - pos.y
+            if cx * cx + cy * cy > VILLAGE_RADIUS * VILLAGE_RADIUS:
+                # Far from home: go back by road rather than across open ground.
+                self.road_homeward = True
+                route = self.road_route = world.home_route(pos, self.village)
+                if route:
+                    self.road_timer = VILLAGER_ROAD_FLEE_TIME
+        while route:
+            node = route[0]
+            nx = node.x - pos.x
+            ny = node.y - pos.y
+            length_sq = nx * nx + ny * ny
+            if length_sq > VILLAGER_ROUTE_REACH * VILLAGER_ROUTE_REACH:
+                length = math.sqrt(length_sq)
+                dx = nx / length
+                dy = ny / length
+                if self.flee_direction is None:
+                    self.flee_direction = Vector2(dx, dy)
+                else:
+                    self.flee_direction.x = dx
+                    self.flee_direction.y = dy
+                break
+            # Reached: head for the next node, with a fresh spell on the road.
+            del route[0]
+            self.road_timer = VILLAGER_ROAD_FLEE_TIME
+            if not route and self.road_homeward:
+                # Home: the last stretch is straight to the centre.
+                self.road_timer = 0.0
+        if not on_road and self.road_timer <= 0.0:
+            cx = center.x - pos.x
+            cy = center.y - pos.y
+            length_sq = cx * cx + cy * cy
+            if length_sq > 0:
+                length = math.sqrt(length_sq)
+                dx = cx / length
+                dy = cy / length
+        if dx * dx + dy * dy == 0:
+            dx = 1.0
+            dy = 0.0
+        pos.x += dx * speed * dt
+        pos.y += dy * speed * dt
+        if not on_road and self.road_timer <= 0.0 and danger_pos is None:
+            self.state = VILLAGER_IDLE
+        self.was_on_road = on_road
+
+    def idle_update_scalar(self, dt: float, world: "World") -> None:
+        self.state = VILLAGER_IDLE
+        if self.wander_timer <= 0.0 or self.wander_target is None:
+            angle = random.uniform(0, 2 * math.pi)
+            radius = random.uniform(0, VILLAGER_IDLE_RADIUS)
+            self.wander_target = Vector2(
+                self.home.x + math.cos(angle) * radius,
+                self.home.y + math.sin(angle) * radius,
+            )
+            self.wander_timer = random.uniform(1.0, 2.5)
+        else:
+            self.wander_timer -= dt
+        target = self.wander_target or self.home
+        pos = self.pos
+        dx = target.x - pos.x
+        dy = target.y - pos.y
+        length_sq = dx * dx + dy * dy
+        if length_sq > 4:
+            length = math.sqrt(length_sq)
+            pos.x += dx / length * VILLAGER_SPEED * 0.35 * dt
+            pos.y += dy / length * VILLAGER_SPEED * 0.35 * dt
+        else:
+            self.wander_target = None
+
+    flee_update = flee_update_scalar
+    idle_update = idle_update_scalar
+
+    # Vector2 reference versions, kept for check_math_kernels and set_math_engine("vector").
+    def flee_update_vector(
+        self,
+        dt: float,
+        world: "World",
+        danger_pos: Optional[Vector2],
+    ) -> None:
+        speed = VILLAGER_SPEED * world.get_speed_multiplier(self.pos, "villager")
+        direction = self.flee_direction or Vector2()
+        on_road = world.is_on_road(self.pos)
+        if on_road and not self.was_on_road and not self.road_homeward:
+            self.road_route = world.refuge_route(self.pos, danger_pos, self.village)
+            if not self.road_route:
+                road_dir, _ = world.nearest_road_direction(self.pos, danger_pos)
+                if road_dir.length_squared() > 0:
+                    direction = road_dir
+                    self.flee_direction = road_dir
+            self.road_timer = VILLAGER_ROAD_FLEE_TIME
+        if self.road_timer > 0.0:
+            self.road_timer = max(0.0, self.road_timer - dt)
+        if self.road_route and self.road_timer <= 0.0:
+            self.road_route.clear()
+        if not on_road and self.road_timer <= 0.0 and not self.road_homeward:
+            if self.village.center.distance_squared_to(self.pos) > VILLAGE_RADIUS * VILLAGE_RADIUS:
+                self.road_homeward = True
+                self.road_route = world.home_route(self.pos, self.village)
+                if self.road_route:
+                    self.road_timer = VILLAGER_ROAD_FLEE_TIME
+        while self.road_route:
+            to_node = self.road_route[0] - self.pos
+            if to_node.length_squared() > VILLAGER_ROUTE_REACH * VILLAGER_ROUTE_REACH:
+                direction = to_node.normalize()
+                self.flee_direction = direction.copy()
+                break
+            self.road_route.pop(0)
+            self.road_timer = VILLAGER_ROAD_FLEE_TIME
+            if not self.road_route and self.road_homeward:
+                self.road_timer = 0.0
+        if not on_road and self.road_timer <= 0.0:
+            center_dir = self.village.center - self.pos
+            if center_dir.length_squared() > 0:
+                center_dir.normalize_ip()
+                direction = center_dir
+        if direction.length_squared() == 0:
+            direction = Vector2(1, 0)
+        self.pos += direction * speed * dt
+        if not on_road and self.road_timer <= 0.0 and danger_pos is None:
+            self.state = VILLAGER_IDLE
+        self.was_on_road = on_road
+
+    def idle_update_vector(self, dt: float, world: "World") -> None:
+        self.state = VILLAGER_IDLE
+        if self.wander_timer <= 0.0 or self.wander_target is None:
+            angle = random.uniform(0, 2 * math.pi)
+            radius = random.uniform(0, VILLAGER_IDLE_RADIUS)
+            offset = Vector2(math.cos(angle), math.sin(angle)) * radius
+            self.wander_target = self.home + offset
+            self.wander_timer = random.uniform(1.0, 2.5)
+        else:
+            self.wander_timer -= dt
+        target = self.wander_target or self.home
+        direction = target - self.pos
+        if direction.length_squared() > 4:
+            direction.normalize_ip()
+            self.pos += direction * VILLAGER_SPEED * 0.35 * dt
+        else:
+            self.wander_target = None
+
+    def render_state(self) -> Tuple[float, float, bool]:
+        return (self.pos.x, self.pos.y, self.alarmed)
+
+
+@dataclass
+class Village:
+    center: Vector2
+    huts: List[Hut]
+    well: Well
+    chests: List[Chest]
+    villagers: List[Villager]
+    max_population: int
+    spawn_timer: float = 0.0
+    alarm_active: bool = False
+    population: int = 0
+    alarmed: int = 0
+
+
+class Census:
+    """Running population totals, adjusted on state transitions instead of rescanned.
+
+    Villagers report spawn, death, flee/idle and alarm changes, units report spawn,
+    death and state changes, and seals report channel start/stop, so HUD and AI
+    queries are O(1) however large the populations grow. Per-village counts live
+    on the Village itself (population, alarmed, alarm_active).
+    """
+
+    def __init__(self) -> None:
+        self.villagers = 0
+        self.alarmed = 0
+        self.alarmed_villages = 0
+        self.villager_states: List[int] = [0] * len(VILLAGER_STATE_NAMES)
+        self.units = 0
+        self.unit_types: List[int] = [0] * len(UNIT_DATA)
+        self.unit_states: List[int] = [0] * len(UNIT_STATE_NAMES)
+        self.channeling = 0
+
+    def villager_spawned(self, villager: Villager) -> None:
+        villager.village.population += 1
+        self.villagers += 1
+        self.villager_states[villager.state] += 1
+        if villager.alarmed:
+            self.villager_alarm(villager.village, True)
+
+    def villager_died(self, villager: Villager) -> None:
+        villager.village.population -= 1
+        self.villagers -= 1
+        self.villager_states[villager.state] -= 1
+        if villager.alarmed:
+            self.villager_alarm(villager.village, False)
+
+    def villager_state(self, old: int, new: int) -> None:
+        self.villager_states[old] -= 1
+        self.villager_states[new] += 1
+
+    def villager_alarm(self, village: Village, raised: bool) -> None:
+        if raised:
+            self.alarmed += 1
+            village.alarmed += 1
+            if village.alarmed == 1:
+                village.alarm_active = True
+                self.alarmed_villages += 1
+        else:
+            self.alarmed -= 1
+            village.alarmed -= 1
+            if village.alarmed == 0:
+                village.alarm_active = False
+                self.alarmed_villages -= 1
+
+    def unit_spawned(self, unit: "Unit") -> None:
+        self.units += 1
+        self.unit_types[unit.kind.index] += 1
+        self.unit_states[unit.state] += 1
+
+    def unit_died(self, unit: "Unit") -> None:
+        self.units -= 1
+        self.unit_types[unit.kind.index] -= 1
+        self.unit_states[unit.state] -= 1
+
+    def unit_state(self, old: int, new: int) -> None:
+        self.unit_states[old] -= 1
+        self.unit_states[new] += 1
+
+    def seal_channel(self, active: bool) -> None:
+        self.channeling += 1 if active else -1
+
+    def units_of(self, unit_type: str) -> int:
+        return self.unit_types[UNIT_TYPES[unit_type].index]
+
+
+class SegmentBVH:
+    """Bounding-volume hierarchy over line segments for best-first nearest-segment queries."""
+
+    def __init__(self, segments: List[Tuple[float, float, float, float]]) -> None:
+        self.segments = segments
+        self.boxes: List[Tuple[float, float, float, float]] = []
+        self.children: List[Tuple[int, int]] = []
+        self.leaves: List[Tuple[int, ...]] = []
+        if segments:
+            self._build(list(range(len(segments))))
+
+    def _build(self, indices: List[int]) -> int:
+        boxes = [self._segment_box(self.segments[i]) for i in indices]
+        box = (
+            min(b[0] for b in boxes),
+            min(b[1] for b in boxes),
+            max(b[2] for b in boxes),
+            max(b[3] for b in boxes),
+        )
+        node = len(self.boxes)
+        self.boxes.append(box)
+        self.children.append((-1, -1))
+        self.leaves.append(())
+        if len(indices) <= ROAD_BVH_LEAF_SIZE:
+            self.leaves[node] = tuple(indices)
+            return node
+        axis = 0 if box[2] - box[0] >= box[3] - box[1] else 1
+        indices.sort(key=lambda i: self.segments[i][axis] + self.segments[i][axis + 2])
+        middle = len(indices) // 2
+        left = self._build(indices[:middle])
+        right = self._build(indices[middle:])
+        self.children[node] = (left, right)
+        return node
+
+    @staticmethod
+    def _segment_box(segment: Tuple[float, float, float, float]) -> Tuple[float, float, float, float]:
+        x1, y1, x2, y2 = segment
+        return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+    @staticmethod
+    def _box_distance_sq(box: Tuple[float, float, float, float], x: float, y: float) -> float:
+        dx = max(box[0] - x, 0.0, x - box[2])
+        dy = max(box[1] - y, 0.0, y - box[3])
+        return dx * dx + dy * dy
+
+    def nearest(self, x: float, y: float) -> Optional[Tuple[int, float, float, float]]:
+        """(segment index, closest x, closest y, distance) for the segment nearest to (x, y)."""
+        if not self.boxes:
+            return None
+        best: Optional[Tuple[int, float, float]] = None
+        best_sq = float("inf")
+        heap = [(0.0, 0)]
+        while heap:
+            bound, node = heapq.heappop(heap)
+            if bound >= best_sq:
+                break
+            leaf = self.leaves[node]
+            if leaf:
+                for index in leaf:
+                    x1, y1, x2, y2 = self.segments[index]
+                    sx = x2 - x1
+                    sy = y2 - y1
+                    length_sq = sx * sx + sy * sy
+                    t = 0.0
+                    if length_sq > 0:
+                        t = max(0.0, min(1.0, ((x - x1) * sx + (y - y1) * sy) / length_sq))
+                    px = x1 + sx * t
+                    py = y1 + sy * t
+                    dist_sq = (x - px) * (x - px) + (y - py) * (y - py)
+                    if dist_sq < best_sq:
+                        best_sq = dist_sq
+                        best = (index, px, py)
+                continue
+            for child in self.children[node]:
+                heapq.heappush(heap, (self._box_distance_sq(self.boxes[child], x, y), child))
+        if best is None:
+            return None
+        return best[0], best[1], best[2], math.sqrt(best_sq)
+
+
+class RoadNetwork:
+    """Road graph with nodes at endpoints and crossings, a segment BVH and LRU-cached routes.
+
+    Roads are split wherever they cross, so ``edges`` are the graph's edges
+    (node index pairs) and the BVH's segments at the same time. ``route`` is an
+    A* search over the graph, memoised per (start, goal) node pair in an LRU of
+    ROAD_ROUTE_CACHE_SIZE entries. ``place_nodes`` holds the node at each of
+    ``places`` (village centres), or -1 where no road reaches it.
+    """
+
+    def __init__(self, roads: List[Tuple[Vector2, Vector2]], places: Sequence[Vector2] = ()) -> None:
+        self.nodes: List[Vector2] = []
+        self.edges: List[Tuple[int, int]] = []
+        self.adjacency: List[List[Tuple[int, float]]] = []
+        self._build(roads)
+        self.bvh = SegmentBVH(
+            [(self.nodes[a].x, self.nodes[a].y, self.nodes[b].x, self.nodes[b].y) for a, b in self.edges]
+        )
+        self.place_nodes: List[int] = [self.node_at(place) for place in places]
+        self.routes: "OrderedDict[Tuple[int, int], Tuple[Tuple[int, ...], float]]" = OrderedDict()
+
+    def _build(self, roads: List[Tuple[Vector2, Vector2]]) -> None:
+        for i, (start, end) in enumerate(roads):
+            cuts = [0.0, 1.0]
+            for j, (other_start, other_end) in enumerate(roads):
+                if i != j:
+                    t = self._crossing(start, end, other_start, other_end)
+                    if t is not None:
+                        cuts.append(t)
+            cuts.sort()
+            previous = -1
+            for t in cuts:
+                node = self.node_at(start.lerp(end, t), create=True)
+                if previous >= 0 and node != previous and (previous, node) not in self.edges and (node, previous) not in self.edges:
+                    length = self.nodes[previous].distance_to(self.nodes[node])
+                    self.edges.append((previous, node))
+                    self.adjacency[previous].append((node, length))
+                    self.adjacency[node].append((previous, length))
+                previous = node
+
+    @staticmethod
+    def _crossing(
+        a: Vector2, b: Vector2, c: Vector2, d: Vector2
+    ) -> Optional[float]:
+        """Parameter along a-b where it crosses c-d, or None when they do not cross."""
+        r = b - a
+        q = d - c
+        denom = r.cross(q)
+        if abs(denom) < 1e-9:
+            return None
+        t = (c - a).cross(q) / denom
+        u = (c - a).cross(r) / denom
+        if 0.0 <= t <= 1.0 and 0.0 <= u <= 1.0:
+            return t
+        return None
+
+    def node_at(self, pos: Vector2, create: bool = False) -> int:
+        """Index of the node within ROAD_NODE_MERGE_RADIUS of ``pos``; -1 (or a new node) if none."""
+        for index, node in enumerate(self.nodes):
+            if node.distance_squared_to(pos) <= ROAD_NODE_MERGE_RADIUS * ROAD_NODE_MERGE_RADIUS:
+                return index
+        if not create:
+            return -1
+        self.nodes.append(Vector2(pos))
+        self.adjacency.append([])
+        return len(self.nodes) - 1
+
+    def nearest(self, pos: Vector2) -> Optional[Tuple[int, Vector2, float]]:
+        """(edge index, closest point, distance) of the road nearest to ``pos``."""
+        hit = self.bvh.nearest(pos.x, pos.y)
+        if hit is None:
+            return None
+        edge, x, y, distance = hit
+        return edge, Vector2(x, y), distance
+
+    def route(self, start: int, goal: int) -> Tuple[Tuple[int, ...], float]:
+        """Shortest (node path, length) from ``start`` to ``goal``, from the LRU when already known."""
+        key = (start, goal)
+        found = self.routes.get(key)
+        if found is not None:
+            self.routes.move_to_end(key)
+            return found
+        found = self._search(start, goal)
+        self.routes[key] = found
+        if len(self.routes) > ROAD_ROUTE_CACHE_SIZE:
+            self.routes.popitem(last=False)
+        return found
+
+    def _search(self, start: int, goal: int) -> Tuple[Tuple[int, ...], float]:
+        """A* from ``start`` to ``goal``: (node path, length), or ((), inf) when unreachable."""
+        goal_pos = self.nodes[goal]
+        best = {start: 0.0}
+        came_from: Dict[int, int] = {}
+        heap = [(self.nodes[start].distance_to(goal_pos), start)]
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node == goal:
+                path = [goal]
+                while path[-1] != start:
+                    path.append(came_from[path[-1]])
+                return tuple(reversed(path)), best[goal]
+            for neighbour, length in self.adjacency[node]:
+                cost = best[node] + length
+                if cost < best.get(neighbour, float("inf")):
+                    best[neighbour] = cost
+                    came_from[neighbour] = node
+                    heapq.heappush(heap, (cost + self.nodes[neighbour].distance_to(goal_pos), neighbour))
+        return (), float("inf")
+
+    def route_between(
+        self, start: Vector2, goal: Vector2
+    ) -> Tuple[List[Vector2], float]:
+        """Waypoints from the road nearest ``start`` to the road nearest ``goal``, plus their length."""
+        entry = self.nearest(start)
+        exit_ = self.nearest(goal)
+        if entry is None or exit_ is None:
+            return [], float("inf")
+        best: Tuple[Tuple[int, ...], float] = ((), float("inf"))
+        for a in self.edges[entry[0]]:
+            for b in self.edges[exit_[0]]:
+                path, length = self.route(a, b)
+                total = entry[1].distance_to(self.nodes[a]) + length + self.nodes[b].distance_to(exit_[1])
+                if path and total < best[1]:
+                    best = (path, total)
+        if not best[0]:
+            return [], float("inf")
+        return [entry[1]] + [self.nodes[i] for i in best[0]] + [exit_[1]], best[1]
+
+
+class World:
+    def __init__(self) -> None:
+        self.forest_patches: List[ForestPatch] = self._generate_forests()
+        self.trees: List[Tree] = [tree for patch in self.forest_patches for tree in patch.trees]
+        self.tree_shapes: Tuple[TreeShape, ...] = tuple(shape for patch in self.forest_patches for shape in patch.shapes)
+        self.hut_shapes: Tuple[HutShape, ...] = ()
+        self._hut_bounds: "OrderedDict[float, Tuple[HutShape, ...]]" = OrderedDict()
+        self.villages: List[Village] = []
+        self.villager_pool: EntityPool[Villager] = EntityPool(Villager.spawn)
+        self.census = Census()
+        self.road_segments: List[Tuple[Vector2, Vector2]] = []
+        self.roads: Optional[RoadNetwork] = None
+        self.villages = self._generate_villages()
+        # Road pixels as pygame.draw.line would paint them, indexed [y, x].
+        self.road_mask = np.zeros((HEIGHT, WIDTH), dtype=bool)
+        self._generate_roads()
+        self.valor_shards: List[ValorShard] = []
+        self._freeze_geometry()
+
+    def _freeze_geometry(self) -> None:
+        """Snapshot static hut footprints once generation is finished."""
+        self.hut_shapes = tuple(hut.shape() for village in self.villages for hut in village.huts)
+        self._hut_bounds.clear()
+
+    def hut_bounds(self, clearance: float) -> Tuple[HutShape, ...]:
+        """Hut footprints grown by clearance on every side, memoised for recent clearances (LRU)."""
+        cache = self._hut_bounds
+        bounds = cache.get(clearance)
+        if bounds is not None:
+            cache.move_to_end(clearance)
+        else:
+            grown = []
+            for village in self.villages:
+                for hut in village.huts:
+                    rect = hut.rect.inflate(clearance * 2, clearance * 2)
+                    grown.append(HutShape(rect.left, rect.top, rect.right, rect.bottom))
+            bounds = tuple(grown)
+            cache[clearance] = bounds
+            if len(cache) > HUT_BOUNDS_CACHE_SIZE:
+                cache.popitem(last=False)
+        return bounds
+
+    # --- Generation helpers ---
+    def _generate_forests(self) -> List[ForestPatch]:
+        patches: List[ForestPatch] = []
+        count = random.randint(*FOREST_PATCH_RANGE)
+        for _ in range(count):
+            center = Vector2(
+                random.uniform(ARENA_PADDING + 60, WIDTH - ARENA_PADDING - 60),
+                random.uniform(ARENA_PADDING + 60, HEIGHT - ARENA_PADDING - 60),
+            )
+            tree_count = random.randint(*TREES_PER_PATCH_RANGE)
+            trees: List[Tree] = []
+            for _ in range(tree_count):
+                angle = random.uniform(0, 2 * math.pi)
+                radius = random.uniform(8, FOREST_CLUSTER_RADIUS)
+                offset = Vector2(math.cos(angle), math.sin(angle)) * radius
+                offset += Vector2(random.gauss(0, 12), random.gauss(0, 12))
+                pos = center + offset
+                pos.x = max(ARENA_PADDING, min(WIDTH - ARENA_PADDING, pos.x))
+                pos.y = max(ARENA_PADDING, min(HEIGHT - ARENA_PADDING, pos.y))
+                tree_radius = random.uniform(*TREE_RADIUS_RANGE)
+                trees.append(Tree(pos, tree_radius))
+            patches.append(ForestPatch(center, trees))
+        return patches
+
+    def _generate_villages(self) -> List[Village]:
+        villages: List[Village] = []
+        desired = random.randint(*VILLAGE_COUNT_RANGE)
+        attempts = 0
+        while len(villages) < desired and attempts < 400:
+            attempts += 1
+            center = Vector2(
+                random.uniform(ARENA_PADDING + VILLAGE_RADIUS, WIDTH - ARENA_PADDING - VILLAGE_RADIUS),
+                random.uniform(ARENA_PADDING + VILLAGE_RADIUS, HEIGHT - ARENA_PADDING - VILLAGE_RADIUS),
+            )
+            if center.distance_to(CASTLE_POS) < VILLAGE_MIN_CASTLE_DIST:
+                continue
+            if any(center.distance_to(other.center) < VILLAGE_MIN_SEPARATION for other in villages):
+                continue
+            if any(tree.pos.distance_to(center) < tree.radius + 40 for tree in self.trees):
+                continue
+            huts: List[Hut] = []
+            hut_target = random.randint(*VILLAGE_HUT_COUNT_RANGE)
+            hut_attempts = 0
+            while len(huts) < hut_target and hut_attempts < 250:
+                hut_attempts += 1
+                angle = random.uniform(0, 2 * math.pi)
+                radius = random.uniform(18, VILLAGE_RADIUS)
+                offset = Vector2(math.cos(angle), math.sin(angle)) * radius
+                candidate = center + offset
+                if not self._within_bounds(candidate, HUT_SIZE):
+                    continue
+                if candidate.distance_to(CASTLE_POS) < VILLAGE_MIN_CASTLE_DIST - 20:
+                    continue
+                if any(candidate.distance_to(hut.center) < HUT_SIZE * 1.8 for hut in huts):
+                    continue
+                if any(tree.pos.distance_to(candidate) < tree.radius + 18 for tree in self.trees):
+                    continue
+                huts.append(Hut(candidate))
+            if len(huts) < 4:
+                continue
+            well_pos = self._find_clear_point(center, 14, 34, villages, huts)
+            if well_pos is None:
+                continue
+            chest_count = random.randint(1, 2)
+            chests: List[Chest] = []
+            for _ in range(chest_count):
+                chest_pos = self._find_clear_point(center, 20, VILLAGE_RADIUS, villages, huts, extra=16, chests=chests)
+                if chest_pos is not None:
+                    chests.append(Chest(chest_pos))
+            if not chests:
+                continue
+            villagers_count = random.randint(3, 6)
+            village = Village(
+                center,
+                huts,
+                Well(well_pos),
+                chests,
+                villagers=[],
+                max_population=villagers_count,
+            )
+            for _ in range(villagers_count):
+                hut = random.choice(huts)
+                villager = self.villager_pool.acquire(hut.center, hut.center, village)
+                village.villagers.append(villager)
+                self.census.villager_spawned(villager)
+            spawn_variation = random.uniform(1.0 - VILLAGER_RESPAWN_VARIANCE, 1.0 + VILLAGER_RESPAWN_VARIANCE)
+            village.spawn_timer = VILLAGER_RESPAWN_INTERVAL * spawn_variation
+            villages.append(village)
+        return villages
+
+    def _find_clear_point(
+        self,
+        origin: Vector2,
+        min_radius: float,
+        max_radius: float,
+        villages: Optional[List[Village]] = None,
+        huts: Optional[List[Hut]] = None,
+        extra: float = 12,
+        chests: Optional[List[Chest]] = None,
+    ) -> Optional[Vector2]:
+        for _ in range(80):
+            angle = random.uniform(0, 2 * math.pi)
+            radius = random.uniform(min_radius, max_radius)
+            pos = origin + Vector2(math.cos(angle), math.sin(angle)) * radius
+            if not self._within_bounds(pos, extra):
+                continue
+            if not self.is_clear(pos, extra, villages):
+                continue
+            if huts and any(hut.rect.inflate(extra * 2, extra * 2).collidepoint(pos.xy) for hut in huts):
+                continue
+            if chests and any(Vector2(chest.pos).distance_to(pos) < extra for chest in chests):
+                continue
+            return pos
+        return None
+
+    def _within_bounds(self, pos: Vector2, padding: float) -> bool:
+        return (
+            ARENA_PADDING + padding <= pos.x <= WIDTH - ARENA_PADDING - padding
+            and ARENA_PADDING + padding <= pos.y <= HEIGHT - ARENA_PADDING - padding
+        )
+
+    def is_clear(
+        self,
+        pos: Vector2,
+        clearance: float,
+        villages: Optional[List[Village]] = None,
+    ) -> bool:
+        x = pos.x
+        y = pos.y
+        for tree in self.tree_shapes:
+            dx = x - tree.x
+            dy = y - tree.y
+            reach = tree.radius + clearance
+            if dx * dx + dy * dy < reach * reach:
+                return False
+        check_villages = villages if villages is not None else self.villages
+        for village in check_villages:
+            if pos.distance_to(village.center) < clearance + 30:
+                return False
+        if villages is None:
+            # Rect.collidepoint truncates the point to integers.
+            ix = int(x)
+            iy = int(y)
+            for hut in self.hut_bounds(clearance):
+                if hut.left <= ix < hut.right and hut.top <= iy < hut.bottom:
+                    return False
+        else:
+            for village in check_villages:
+                for hut in village.huts:
+                    if hut.rect.inflate(clearance * 2, clearance * 2).collidepoint(pos.xy):
+                        return False
+        if self.roads is not None:
+            hit = self.roads.nearest(pos)
+            if hit is not None and hit[2] <= ROAD_WIDTH / 2 + clearance:
+                return False
+        return True
+
+    @staticmethod
+    def _distance_to_segment_scalar(
+        pos: Vector2, start: Vector2, end: Vector2
+    ) -> float:
+        sx = end.x - start.x
+        sy = end.y - start.y
+        length_sq = sx * sx + sy * sy
+        if length_sq == 0:
+            dx = pos.x - start.x
+            dy = pos.y - start.y
+            return math.sqrt(dx * dx + dy * dy)
+        t = max(0.0, min(1.0, ((pos.x - start.x) * sx + (pos.y - start.y) * sy) / length_sq))
+        dx = pos.x - (start.x + sx * t)
+        dy = pos.y - (start.y + sy * t)
+        return math.sqrt(dx * dx + dy * dy)
+
+    @staticmethod
+    def _distance_to_segment_vector(
+        pos: Vector2, start: Vector2, end: Vector2
+    ) -> float:
+        seg = end - start
+        length_sq = seg.length_squared()
+        if length_sq == 0:
+            return pos.distance_to(start)
+        t = max(0.0, min(1.0, (pos - start).dot(seg) / length_sq))
+        projection = start + seg * t
+        return pos.distance_to(projection)
+
+    _distance_to_segment = _distance_to_segment_scalar
+
+    def _generate_roads(self) -> None:
+        castle_center = CASTLE_POS
+        for village in self.villages:
+            self._add_road(castle_center, village.center)
+        for i, village in enumerate(self.villages):
+            for other in self.villages[i + 1 :]:
+                if village.center.distance_to(other.center) <= VILLAGE_MIN_SEPARATION * 1.3:
+                    self._add_road(village.center, other.center)
+        self.roads = RoadNetwork(self.road_segments, [village.center for village in self.villages])
+
+    def _add_road(self, start: Vector2, end: Vector2) -> None:
+        segment = (start.copy(), end.copy())
+        self.road_segments.append(segment)
+        rasterize_line(self.road_mask, start, end, ROAD_WIDTH)
+
+    # --- Utility helpers ---
+    def update(self, dt: float, knight: "Knight", units: List["Unit"], game: "Match") -> None:
+        for village in self.villages:
+            self.villager_pool.compact(village.villagers)
+            self._update_population(village, dt)
+            for villager in village.villagers:
+                villager.update(dt, self, knight, units, game)
+            self._update_well(village, knight, game, dt)
+            self._update_chests(village, knight, game, dt)
+        shards = self.valor_shards
+        i = 0
+        while i < len(shards):
+            shard = shards[i]
+            shard.timer += dt
+            if knight.pos.distance_to(shard.pos) <= SHARD_COLLECT_RADIUS:
+                knight.collect_valor_shard()
+                swap_remove(shards, i)
+            else:
+                i += 1
+
+    def _update_well(self, village: Village, knight: "Knight", game: "Match", dt: float) -> None:
+        distance = knight.pos.distance_to(village.well.pos)
+        if distance <= WELL_HEAL_RADIUS and knight.vel.length() < 6:
+            village.well.timer += dt
+            if village.well.timer >= WELL_HEAL_TIME and knight.hp < KNIGHT_HP:
+                village.well.timer = 0.0
+                knight.hp = min(KNIGHT_HP, knight.hp + 1)
+                game.spawn_noise(village.well.pos, WELL_NOISE_STRENGTH)
+        else:
+            village.well.timer = max(0.0, village.well.timer - dt * 0.5)
+
+    def _update_chests(self, village: Village, knight: "Knight", game: "Match", dt: float) -> None:
+        for chest in village.chests:
+            if chest.opened:
+                continue
+            distance = knight.pos.distance_to(chest.pos)
+            if distance <= CHEST_INTERACT_RADIUS:
+                chest.open_timer += dt
+                if chest.open_timer >= CHEST_OPEN_TIME:
+                    chest.opened = True
+                    game.spawn_noise(chest.pos, CHEST_NOISE_STRENGTH)
+                    game.suspicion.boost_sector(chest.pos, 14.0)
+                    self.valor_shards.append(ValorShard(chest.pos.copy()))
+            else:
+                chest.open_timer = max(0.0, chest.open_timer - dt * 0.5)
+
+    def _update_population(self, village: Village, dt: float) -> None:
+        # Expects village.villagers to be compacted already.
+        if len(village.villagers) < village.max_population:
+            village.spawn_timer = max(0.0, village.spawn_timer - dt)
+            if village.spawn_timer <= 0.0:
+                spawned = self._spawn_villager(village)
+                if spawned is not None:
+                    village.villagers.append(spawned)
+                    self.census.villager_spawned(spawned)
+                variation = random.uniform(1.0 - VILLAGER_RESPAWN_VARIANCE, 1.0 + VILLAGER_RESPAWN_VARIANCE)
+                village.spawn_timer = VILLAGER_RESPAWN_INTERVAL * variation
+        else:
+            village.spawn_timer = min(
+                VILLAGER_RESPAWN_INTERVAL,
+                village.spawn_timer + dt * 0.5,
+            )
+
+    def _spawn_villager(self, village: Village) -> Optional[Villager]:
+        if not village.huts:
+            return None
+        hut = random.choice(village.huts)
+        return self.villager_pool.acquire(hut.center, hut.center, village)
+
+    def render_state(self) -> "WorldRenderState":
+        chests = tuple(
+            (chest.pos.x, chest.pos.y, chest.opened) for village in self.villages for chest in village.chests
+        )
+        alarms = tuple((village.center.x, village.center.y) for village in self.villages if village.alarm_active)
+        shards = tuple(
+            (shard.pos.x, shard.pos.y, int(shard.timer * 6) % 2 == 0) for shard in self.valor_shards
+        )
+        villagers = tuple(
+            villager.render_state()
+            for village in self.villages
+            for villager in village.villagers
+            if villager.alive
+        )
+        return WorldRenderState(chests, alarms, shards, villagers)
+
+    def resolve_circle_collisions_scalar(
+        self,
+        pos: Vector2,
+        radius: float,
+        velocity: Optional[Vector2] = None,
+    ) -> None:
+        px = pos.x
+        py = pos.y
+        moved = False
+        for tree in self.tree_shapes:
+            dx = px - tree.x
+            dy = py - tree.y
+            reach = radius + tree.radius
+            dist_sq = dx * dx + dy * dy
+            if dist_sq >= reach * reach:
+                continue
+            dist = math.sqrt(dist_sq)
+            overlap = reach - dist
+            if overlap > 0:
+                if dist == 0:
+                    dx = random.uniform(-1, 1)
+                    dy = random.uniform(-1, 1)
+                    dist = math.sqrt(dx * dx + dy * dy)
+                scale = (overlap + 0.1) / dist
+                dx *= scale
+                dy *= scale
+                px += dx
+                py += dy
+                moved = True
+                if velocity is not None:
+                    self._remove_component(velocity, dx, dy)
+        for rect in self.hut_bounds(radius):
+            ix = int(px)
+            iy = int(py)
+            if rect.left <= ix < rect.right and rect.top <= iy < rect.bottom:
+                cx = max(rect.left + radius, min(rect.right - radius, px))
+                cy = max(rect.top + radius, min(rect.bottom - radius, py))
+                qx = px - cx
+                qy = py - cy
+                if qx * qx + qy * qy == 0:
+                    qx = 1.0
+                    qy = 0.0
+                scale = radius / math.sqrt(qx * qx + qy * qy)
+                qx *= scale
+                qy *= scale
+                px = cx + qx
+                py = cy + qy
+                moved = True
+                if velocity is not None:
+                    self._remove_component(velocity, qx, qy)
+        if moved:
+            pos.x = px
+            pos.y = py
+
+    @staticmethod
+    def _remove_component(velocity: Vector2, nx: float, ny: float) -> None:
+        """In-place velocity -= velocity.project((nx, ny))."""
+        vx = velocity.x
+        vy = velocity.y
+        factor = (vx * nx + vy * ny) / (nx * nx + ny * ny)
+        velocity.x = vx - nx * factor
+        velocity.y = vy - ny * factor
+
+    def resolve_circle_collisions_vector(
+        self,
+        pos: Vector2,
+        radius: float,
+        velocity: Optional[Vector2] = None,
+    ) -> None:
+        for tree in self.tree_shapes:
+            dx = pos.x - tree.x
+            dy = pos.y - tree.y
+            reach = radius + tree.radius
+            if dx * dx + dy * dy >= reach * reach:
+                continue
+            delta = Vector2(dx, dy)
+            dist = delta.length()
+            overlap = reach - dist
+            if overlap > 0:
+                if dist == 0:
+                    delta = Vector2(random.uniform(-1, 1), random.uniform(-1, 1))
+                    dist = delta.length()
+                delta.scale_to_length(overlap + 0.1)
+                pos += delta
+                if velocity is not None:
+                    velocity -= velocity.project(delta)
+        for rect in self.hut_bounds(radius):
+            ix = int(pos.x)
+            iy = int(pos.y)
+            if rect.left <= ix < rect.right and rect.top <= iy < rect.bottom:
+                closest = Vector2(
+                    max(rect.left + radius, min(rect.right - radius, pos.x)),
+                    max(rect.top + radius, min(rect.bottom - radius, pos.y)),
+                )
+                push = pos - closest
+                if push.length_squared() == 0:
+                    push = Vector2(1, 0)
+                push.scale_to_length(radius)
+                pos.update(closest.x + push.x, closest.y + push.y)
+                if velocity is not None:
+                    velocity -= velocity.project(push)
+
+    resolve_circle_collisions = resolve_circle_collisions_scalar
+
+    def clamp_to_bounds(self, pos: Vector2, radius: float) -> None:
+        pos.x = max(ARENA_PADDING + radius, min(WIDTH - ARENA_PADDING - radius, pos.x))
+        pos.y = max(ARENA_PADDING + radius, min(HEIGHT - ARENA_PADDING - radius, pos.y))
+
+    def is_on_road(self, pos: Vector2) -> bool:
+        x = int(pos.x)
+        y = int(pos.y)
+        if 0 <= x < WIDTH and 0 <= y < HEIGHT:
+            return self.road_mask.item(y, x)
+        return False
+
+    def get_speed_multiplier(self, pos: Vector2, entity: str) -> float:
+        if self.is_on_road(pos):
+            return ROAD_SPEED_MULT
+        if entity == "knight" and self.knight_under_canopy(pos):
+            return KNIGHT_CANOPY_SPEED_MULT
+        return 1.0
+
+    def knight_under_canopy(self, pos: Vector2) -> bool:
+        return any(patch.under_canopy(pos) for patch in self.forest_patches)
+
+    def nearest_road_direction(
+        self,
+        pos: Vector2,
+        away_from: Optional[Vector2],
+    ) -> Tuple[Vector2, Optional[Vector2]]:
+        """Direction along the nearest road, away from ``away_from``, and the closest point on it."""
+        hit = self.roads.nearest(pos) if self.roads is not None else None
+        if hit is None:
+            return Vector2(), None
+        edge, point, _ = hit
+        a, b = self.roads.edges[edge]
+        direction = self.roads.nodes[b] - self.roads.nodes[a]
+        if direction.length_squared() > 0:
+            direction.normalize_ip()
+            if away_from is not None:
+                if (pos + direction * 10).distance_to(away_from) < (pos - direction * 10).distance_to(away_from):
+                    direction = -direction
+        return direction, point
+
+    def refuge_route(self, pos: Vector2, danger: Optional[Vector2], home: Village) -> List[Vector2]:
+        """Road nodes from the road nearest ``pos`` to the closest other village farther from danger.
+
+        Empty when no such village is reachable by road. The list is the
+        caller's to consume; the nodes themselves are shared and must not be
+        modified.
+        """
+        roads = self.roads
+        hit = roads.nearest(pos) if roads is not None else None
+        if hit is None:
+            return []
+        point = hit[1]
+        goals = [
+            goal
+            for village, goal in zip(self.villages, roads.place_nodes)
+            if village is not home
+            and goal >= 0
+            and (danger is None or village.center.distance_squared_to(danger) > point.distance_squared_to(danger))
+        ]
+        return self._road_route(hit[0], point, goals)
+
+    def home_route(self, pos: Vector2, home: Village) -> List[Vector2]:
+        """Road nodes from the road nearest ``pos`` back to ``home``; empty when no road leads there."""
+        roads = self.roads
+        hit = roads.nearest(pos) if roads is not None else None
+        if hit is None:
+            return []
+        goal = roads.place_nodes[self.villages.index(home)]
+        return self._road_route(hit[0], hit[1], [goal] if goal >= 0 else [])
+
+    def _road_route(self, edge: int, point: Vector2, goals: List[int]) -> List[Vector2]:
+        """Nodes of the shortest route from ``point`` on road ``edge`` to any of ``goals``."""
+        roads = self.roads
+        best_length = float("inf")
+        best_path: Tuple[int, ...] = ()
+        for goal in goals:
+            for node in roads.edges[edge]:
+                path, length = roads.route(node, goal)
+                total = point.distance_to(roads.nodes[node]) + length
+                if path and total < best_length:
+                    best_length = total
+                    best_path = path
+        route = [roads.nodes[node] for node in best_path]
+        if len(route) > 1 and route[0].distance_squared_to(point) <= ROAD_NODE_MERGE_RADIUS * ROAD_NODE_MERGE_RADIUS:
+            del route[0]
+        return route
+
+    def line_blocked(self, start: Vector2, end: Vector2) -> bool:
+        min_x = min(start.x, end.x) - 10
+        max_x = max(start.x, end.x) + 10
+        min_y = min(start.y, end.y) - 10
+        max_y = max(start.y, end.y) + 10
+        line_rect = Rect(int(min_x), int(min_y), int(max_x - min_x) + 1, int(max_y - min_y) + 1)
+        for patch in self.forest_patches:
+            if not patch.bounds.colliderect(line_rect):
+                continue
+            for tree in patch.trees:
+                if self._line_circle_intersection(start, end, tree.pos, tree.radius):
+                    return True
+        return False
+
+    @staticmethod
+    def _line_circle_intersection(
+        start: Vector2,
+        end: Vector2,
+        center: Vector2,
+        radius: float,
+    ) -> bool:
+        d = end - start
+        f = start - center
+        a = d.dot(d)
+        b = 2 * f.dot(d)
+        c = f.dot(f) - radius * radius
+        discriminant = b * b - 4 * a * c
+        if discriminant < 0:
+            return False
+        discriminant = math.sqrt(discriminant)
+        t1 = (-b - discriminant) / (2 * a)
+        t2 = (-b + discriminant) / (2 * a)
+        return (0 <= t1 <= 1) or (0 <= t2 <= 1)
+
+    def line_clear(
+        self,
+        start: Vector2,
+        end: Vector2,
+        debug_lines: Optional[List[Tuple[Tuple[float, float], Tuple[float, float]]]] = None,
+    ) -> bool:
+        blocked = self.line_blocked(start, end)
+        if not blocked and debug_lines is not None:
+            debug_lines.append((start.xy, end.xy))
+        return not blocked
+
+    def any_village_alarmed(self) -> bool:
+        return self.census.alarmed_villages > 0
+
+    def get_alarm_focus(self) -> Optional[Vector2]:
+        if not self.census.alarmed_villages:
+            return None
+        for village in self.villages:
+            if village.alarm_active:
+                return village.center.copy()
+        return None
+
+    def nearest_villager(
+        self, pos: Vector2, max_distance: Optional[float] = None
+    ) -> Optional[Villager]:
+        closest: Optional[Villager] = None
+        closest_dist = float("inf")
+        for village in self.villages:
+            for villager in village.villagers:
+                if not villager.alive:
+                    continue
+                dist = villager.pos.distance_to(pos)
+                if max_distance is not None and dist > max_distance:
+                    continue
+                if dist < closest_dist:
+                    closest_dist = dist
+                    closest = villager
+        return closest
+
+    def villager_counts(self) -> Tuple[int, int]:
+        return self.census.villagers, self.census.alarmed
+
+
+class WorldRenderState(NamedTuple):
+    chests: Tuple[Tuple[float, float, bool], ...]
+    alarms: Tuple[Tuple[float, float], ...]
+    shards: Tuple[Tuple[float, float, bool], ...]
+    villagers: Tuple[Tuple[float, float, bool], ...]
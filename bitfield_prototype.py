@@ -1,7 +1,10 @@
+import argparse
 import math
 import random
-from typing import List
+import time
+from typing import List, Optional
 
+import numpy as np
 import pygame
 
 
@@ -27,6 +30,7 @@ PATROL_REINFORCEMENT_COUNT = 2
 PATROL_SPAWN_RADIUS = 50
 PATROL_DAMAGE_COOLDOWN = 0.5
 PATROL_DETECTION_LERP = 0.15
+PATROL_INITIAL_CAPACITY = 64
 
 DETECTION_REQUIRED_TIME = 2.0
 
@@ -100,114 +104,163 @@ class HitParticle:
         surface.blit(particle_surface, particle_surface.get_rect(center=self.position))
 
 
-class Patrol:
-    """Autonomous patrol that hunts the castle and can be struck by the player."""
+class PatrolSwarm:
+    """Array-backed patrols: every per-patrol field is a column, updated for the whole swarm at once."""
 
-    def __init__(self, position: pygame.math.Vector2):
-        self.pos = position
-        self.velocity = pygame.math.Vector2(0, 0)
-        self.detecting = False
-        self.wander_timer = 0.0
-        self.damage_timer = 0.0
-        self.hit_flash_timer = 0.0
-        self.hp = float(PATROL_HP)
-        self.alive = True
+    COLUMNS = ("pos", "velocity", "wander_timer", "damage_timer", "hit_flash_timer", "hp", "detecting")
 
-    def update(self, dt: float, target_pos: pygame.math.Vector2) -> None:
-        if not self.alive:
-            return
-        dt_ratio = dt * FPS
-        self.wander_timer -= dt
-        if self.wander_timer <= 0:
-            self._pick_new_direction()
+    def __init__(self, capacity: int = PATROL_INITIAL_CAPACITY):
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        self.velocity = np.zeros((capacity, 2))
+        self.wander_timer = np.zeros(capacity)
+        self.damage_timer = np.zeros(capacity)
+        self.hit_flash_timer = np.zeros(capacity)
+        self.hp = np.zeros(capacity)
+        self.detecting = np.zeros(capacity, dtype=bool)
+        self.rng = np.random.default_rng()
 
-        to_target = target_pos - self.pos
-        distance = to_target.length()
-        self.detecting = distance <= PATROL_DETECT_RADIUS
-        if distance > 0 and self.detecting:
-            desired = to_target.normalize() * max(self.velocity.length(), PATROL_MAX_SPEED)
-            self.velocity = self.velocity.lerp(desired, PATROL_DETECTION_LERP * dt_ratio)
+    def __len__(self) -> int:
+        return self.count
 
-        self.pos += self.velocity * dt_ratio
-        self._handle_bounds()
-
-        if self.damage_timer > 0.0:
-            self.damage_timer = max(0.0, self.damage_timer - dt)
-
-        if self.hit_flash_timer > 0.0:
-            self.hit_flash_timer = max(0.0, self.hit_flash_timer - dt)
+    def _reserve(self, needed: int) -> None:
+        capacity = len(self.hp)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[: self.count] = column[: self.count]
+            setattr(self, name, grown)
+
+    def spawn(self, positions: np.ndarray) -> None:
+        """Append patrols at ``positions`` (shape (n, 2)), each with a fresh wander direction."""
+        n = len(positions)
+        if n == 0:
+            return
+        self._reserve(self.count + n)
+        new = slice(self.count, self.count + n)
+        self.pos[new] = positions
+        self.damage_timer[new] = 0.0
+        self.hit_flash_timer[new] = 0.0
+        self.hp[new] = float(PATROL_HP)
+        self.detecting[new] = False
+        self.count += n
+        self._pick_new_directions(np.arange(new.start, new.stop))
+
+    def _pick_new_directions(self, indices: np.ndarray) -> None:
+        n = len(indices)
+        angle = self.rng.uniform(0, 2 * math.pi, n)
+        speed = self.rng.uniform(PATROL_MIN_SPEED, PATROL_MAX_SPEED, n)
+        self.velocity[indices, 0] = np.cos(angle) * speed
+        self.velocity[indices, 1] = np.sin(angle) * speed
+        self.wander_timer[indices] = self.rng.uniform(*PATROL_WANDER_INTERVAL, n)
 
-    def _pick_new_direction(self) -> None:
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(PATROL_MIN_SPEED, PATROL_MAX_SPEED)
-        self.velocity = pygame.math.Vector2(math.cos(angle), math.sin(angle)) * speed
-        self.wander_timer = random.uniform(*PATROL_WANDER_INTERVAL)
+    def update(self, dt: float, target_pos: pygame.math.Vector2) -> None:
+        n = self.count
+        if n == 0:
+            return
+        pos = self.pos[:n]
+        velocity = self.velocity[:n]
+        dt_ratio = dt * FPS
 
-    def _handle_bounds(self) -> None:
+        wander = self.wander_timer[:n]
+        wander -= dt
+        expired = np.flatnonzero(wander <= 0)
+        if len(expired):
+            self._pick_new_directions(expired)
+
+        to_target = np.array(target_pos) - pos
+        distance = np.hypot(to_target[:, 0], to_target[:, 1])
+        detecting = distance <= PATROL_DETECT_RADIUS
+        self.detecting[:n] = detecting
+        chasing = np.flatnonzero(detecting & (distance > 0))
+        if len(chasing):
+            current = velocity[chasing]
+            speed = np.maximum(np.hypot(current[:, 0], current[:, 1]), PATROL_MAX_SPEED)
+            desired = to_target[chasing] * (speed / distance[chasing])[:, None]
+            t = min(1.0, PATROL_DETECTION_LERP * dt_ratio)
+            velocity[chasing] = current + (desired - current) * t
+
+        pos += velocity * dt_ratio
+        self._handle_bounds(pos, velocity)
+
+        np.maximum(self.damage_timer[:n] - dt, 0.0, out=self.damage_timer[:n])
+        np.maximum(self.hit_flash_timer[:n] - dt, 0.0, out=self.hit_flash_timer[:n])
+
+    @staticmethod
+    def _handle_bounds(pos: np.ndarray, velocity: np.ndarray) -> None:
         half = PATROL_SIZE / 2
-        bounced = False
-        if self.pos.x < half:
-            self.pos.x = half
-            self.velocity.x *= -1
-            bounced = True
-        elif self.pos.x > WIDTH - half:
-            self.pos.x = WIDTH - half
-            self.velocity.x *= -1
-            bounced = True
-        if self.pos.y < half:
-            self.pos.y = half
-            self.velocity.y *= -1
-            bounced = True
-        elif self.pos.y > HEIGHT - half:
-            self.pos.y = HEIGHT - half
-            self.velocity.y *= -1
-            bounced = True
-        if bounced:
-            self.velocity *= 0.9
-
-    def attempt_damage(self, target_pos: pygame.math.Vector2, radius: float) -> bool:
-        if not self.alive or self.damage_timer > 0.0:
-            return False
-        if self.pos.distance_to(target_pos) <= radius:
-            self.damage_timer = PATROL_DAMAGE_COOLDOWN
-            return True
-        return False
-
-    def take_damage(self, amount: float) -> float:
-        if not self.alive or amount <= 0:
+        bounced = np.zeros(len(pos), dtype=bool)
+        for axis, limit in ((0, WIDTH - half), (1, HEIGHT - half)):
+            out = (pos[:, axis] < half) | (pos[:, axis] > limit)
+            if out.any():
+                np.clip(pos[:, axis], half, limit, out=pos[:, axis])
+                velocity[out, axis] *= -1
+                bounced |= out
+        velocity[bounced] *= 0.9
+
+    def attempt_damage(self, target_pos: pygame.math.Vector2, radius: float) -> int:
+        """Start the damage cooldown of every ready patrol within ``radius``; return how many struck."""
+        n = self.count
+        offset = self.pos[:n] - np.array(target_pos)
+        ready = (self.damage_timer[:n] <= 0.0) & (np.einsum("ij,ij->i", offset, offset) <= radius * radius)
+        self.damage_timer[:n][ready] = PATROL_DAMAGE_COOLDOWN
+        return int(np.count_nonzero(ready))
+
+    def take_damage(self, index: int, amount: float) -> float:
+        if self.hp[index] <= 0 or amount <= 0:
             return 0.0
-        pre_hp = self.hp
-        self.hp = max(0.0, self.hp - amount)
-        self.hit_flash_timer = HIT_FLASH_DURATION
-        if self.hp <= 0:
-            self.alive = False
-        return max(0.0, pre_hp - self.hp)
-
-    def contains_point(self, point: pygame.math.Vector2) -> bool:
+        pre_hp = self.hp[index]
+        self.hp[index] = max(0.0, pre_hp - amount)
+        self.hit_flash_timer[index] = HIT_FLASH_DURATION
+        return float(pre_hp - self.hp[index])
+
+    def alive(self, index: int) -> bool:
+        return bool(self.hp[index] > 0)
+
+    def position(self, index: int) -> pygame.math.Vector2:
+        return pygame.math.Vector2(self.pos[index, 0], self.pos[index, 1])
+
+    def compact(self) -> None:
+        """Drop dead patrols, keeping the survivors packed at the front of every column."""
+        n = self.count
+        keep = np.flatnonzero(self.hp[:n] > 0)
+        if len(keep) == n:
+            return
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[: len(keep)] = column[keep]
+        self.count = len(keep)
+
+    def pick_target(self, position: pygame.math.Vector2) -> int:
+        """Index of the patrol under ``position``, else the nearest within 1.5 sizes; -1 if none."""
+        n = self.count
+        if n == 0:
+            return -1
+        offset = self.pos[:n] - np.array(position)
+        dist = np.hypot(offset[:, 0], offset[:, 1])
+        alive = self.hp[:n] > 0
         half = PATROL_SIZE / 2
-        return (
-            self.alive
-            and self.pos.x - half <= point.x <= self.pos.x + half
-            and self.pos.y - half <= point.y <= self.pos.y + half
-        )
+        inside = alive & (np.abs(offset[:, 0]) <= half) & (np.abs(offset[:, 1]) <= half)
+        candidates = inside if inside.any() else alive & (dist <= PATROL_SIZE * 1.5)
+        if not candidates.any():
+            return -1
+        return int(np.argmin(np.where(candidates, dist, np.inf)))
 
     def draw(self, surface: pygame.Surface) -> None:
-        if not self.alive:
-            return
-        base_color = PATROL_ALERT_COLOR if self.detecting else PATROL_COLOR
-        if self.hit_flash_timer > 0.0:
-            flash_ratio = self.hit_flash_timer / HIT_FLASH_DURATION
-            flash = min(1.0, flash_ratio)
-            color = (
-                min(255, int(base_color[0] + (255 - base_color[0]) * flash)),
-                min(255, int(base_color[1] + (255 - base_color[1]) * flash)),
-                min(255, int(base_color[2] + (255 - base_color[2]) * flash)),
-            )
-        else:
-            color = base_color
-        rect = pygame.Rect(0, 0, PATROL_SIZE, PATROL_SIZE)
-        rect.center = self.pos.xy
-        pygame.draw.rect(surface, color, rect)
+        n = self.count
+        half = PATROL_SIZE / 2
+        base = np.where(self.detecting[:n, None], PATROL_ALERT_COLOR, PATROL_COLOR)
+        flash = np.minimum(1.0, self.hit_flash_timer[:n] / HIT_FLASH_DURATION)[:, None]
+        colors = np.minimum(255, (base + (255 - base) * flash).astype(int))
+        # Rect.center rounds, so round the corners the same way before filling.
+        corners = np.floor(self.pos[:n] - half + 0.5).astype(int)
+        fill = surface.fill
+        for (x, y), (r, g, b) in zip(corners.tolist(), colors.tolist()):
+            fill((r, g, b), (x, y, PATROL_SIZE, PATROL_SIZE))
 
 
 class DarkLord:
@@ -238,7 +291,7 @@ class DarkLord:
 class Game:
     """Main game orchestrating entities, input, updates, and rendering."""
 
-    def __init__(self) -> None:
+    def __init__(self, stress: int = 0) -> None:
         pygame.init()
         pygame.display.set_caption("Grimm Dominion – Bitfield Prototype")
         self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
@@ -246,7 +299,10 @@ class Game:
         self.font = pygame.font.SysFont("consolas", 18)
         self.large_font = pygame.font.SysFont("consolas", 48)
 
-        self.patrols: List[Patrol] = []
+        self.patrols = PatrolSwarm(max(PATROL_INITIAL_CAPACITY, stress))
+        self.max_patrols = max(PATROL_MAX_COUNT, stress)
+        # Stress mode keeps the hero alive so the swarm can run indefinitely as a benchmark.
+        self.invulnerable = stress > 0
         self.dark_lord = DarkLord()
         self.state = "running"
 
@@ -261,33 +317,31 @@ class Game:
         self.screen_shake_magnitude = 0.0
         self.screen_shake_offset = pygame.math.Vector2(0, 0)
 
-        self._spawn_initial_patrols(5)
-
-    def _spawn_initial_patrols(self, count: int) -> None:
-        for _ in range(count):
-            self.spawn_patrol_random()
+        self.spawn_patrols_random(stress or 5)
 
-    def spawn_patrol_random(self) -> None:
+    def spawn_patrols_random(self, count: int) -> None:
+        """Spawn ``count`` patrols uniformly over the field, at least 60px from the castle."""
+        rng = self.patrols.rng
+        positions = np.empty((0, 2))
         for _ in range(100):
-            pos = pygame.math.Vector2(random.uniform(0, WIDTH), random.uniform(0, HEIGHT))
-            if pos.distance_to(CASTLE_POS) >= 60:
-                patrol = Patrol(pos)
-                patrol._pick_new_direction()
-                self.patrols.append(patrol)
-                return
+            if len(positions) >= count:
+                break
+            batch = rng.uniform((0, 0), (WIDTH, HEIGHT), (count - len(positions), 2))
+            far = np.hypot(*(batch - np.array(CASTLE_POS)).T) >= 60
+            positions = np.concatenate((positions, batch[far]))
+        self.patrols.spawn(positions)
 
     def spawn_patrol_near_castle(self, count: int) -> None:
-        for _ in range(count):
-            if len(self.patrols) >= PATROL_MAX_COUNT:
-                break
-            angle = random.uniform(0, 2 * math.pi)
-            radius = random.uniform(0, PATROL_SPAWN_RADIUS)
-            pos = CASTLE_POS + pygame.math.Vector2(math.cos(angle), math.sin(angle)) * radius
-            pos.x = max(PATROL_SIZE / 2, min(WIDTH - PATROL_SIZE / 2, pos.x))
-            pos.y = max(PATROL_SIZE / 2, min(HEIGHT - PATROL_SIZE / 2, pos.y))
-            patrol = Patrol(pos)
-            patrol._pick_new_direction()
-            self.patrols.append(patrol)
+        count = min(count, self.max_patrols - len(self.patrols))
+        if count <= 0:
+            return
+        rng = self.patrols.rng
+        angle = rng.uniform(0, 2 * math.pi, count)
+        radius = rng.uniform(0, PATROL_SPAWN_RADIUS, count)
+        positions = np.array(CASTLE_POS) + np.column_stack((np.cos(angle), np.sin(angle))) * radius[:, None]
+        half = PATROL_SIZE / 2
+        np.clip(positions, (half, half), (WIDTH - half, HEIGHT - half), out=positions)
+        self.patrols.spawn(positions)
 
     def run(self) -> None:
         while True:
@@ -317,40 +371,20 @@ class Game:
     def _perform_attack(self, position: pygame.math.Vector2) -> None:
         if self.attack_cooldown_timer > 0.0:
             return
-        target = self._pick_attack_target(position)
-        if not target:
+        target = self.patrols.pick_target(position)
+        if target < 0:
             return
         damage = BASE_ATTACK_DAMAGE
-        dealt = target.take_damage(damage)
+        dealt = self.patrols.take_damage(target, damage)
         if dealt <= 0:
             return
         self.attack_cooldown_timer = ATTACK_COOLDOWN
-        self._spawn_hit_particle(target.pos)
-        self._spawn_damage_number(target.pos, dealt)
+        target_pos = self.patrols.position(target)
+        self._spawn_hit_particle(target_pos)
+        self._spawn_damage_number(target_pos, dealt)
         self._trigger_screen_shake()
-        if not target.alive:
-            self.patrols = [p for p in self.patrols if p.alive]
-
-    def _pick_attack_target(self, position: pygame.math.Vector2):
-        best = None
-        best_dist = float("inf")
-        for patrol in self.patrols:
-            if not patrol.contains_point(position):
-                continue
-            dist = patrol.pos.distance_to(position)
-            if dist < best_dist:
-                best = patrol
-                best_dist = dist
-        if best:
-            return best
-        for patrol in self.patrols:
-            if not patrol.alive:
-                continue
-            dist = patrol.pos.distance_to(position)
-            if dist <= PATROL_SIZE * 1.5 and dist < best_dist:
-                best = patrol
-                best_dist = dist
-        return best
+        if not self.patrols.alive(target):
+            self.patrols.compact()
 
     def _spawn_damage_number(self, position: pygame.math.Vector2, amount: float) -> None:
         self.damage_numbers.append(DamageNumber(position, amount))
@@ -386,7 +420,8 @@ class Game:
     def _damage_hero(self, amount: int) -> None:
         if amount <= 0:
             return
-        self.hero_hp = max(0, self.hero_hp - amount)
+        if not self.invulnerable:
+            self.hero_hp = max(0, self.hero_hp - amount)
         self._spawn_hit_particle(CASTLE_POS)
         self._trigger_screen_shake(SCREEN_SHAKE_MAGNITUDE * 0.6, SCREEN_SHAKE_DURATION)
 
@@ -397,15 +432,9 @@ class Game:
         self.attack_cooldown_timer = max(0.0, self.attack_cooldown_timer - dt)
         self._update_effects(dt)
 
-        any_detecting = False
-        for patrol in self.patrols:
-            patrol.update(dt, CASTLE_POS)
-            if patrol.detecting:
-                any_detecting = True
-            if patrol.attempt_damage(CASTLE_POS, CASTLE_DAMAGE_RADIUS):
-                self._damage_hero(1)
-
-        self.patrols = [p for p in self.patrols if p.alive]
+        self.patrols.update(dt, CASTLE_POS)
+        any_detecting = bool(self.patrols.detecting[: len(self.patrols)].any())
+        self._damage_hero(self.patrols.attempt_damage(CASTLE_POS, CASTLE_DAMAGE_RADIUS))
 
         if self.hero_hp <= 0:
             self.state = "defeat"
@@ -415,14 +444,13 @@ class Game:
         if any_detecting and reinforcement_ready:
             self.spawn_patrol_near_castle(PATROL_REINFORCEMENT_COUNT)
 
-        if not self.patrols:
+        if not len(self.patrols):
             self.state = "victory"
 
     def draw(self) -> None:
         self.scene_surface.fill(BACKGROUND_COLOR)
         self._draw_castle(self.scene_surface)
-        for patrol in self.patrols:
-            patrol.draw(self.scene_surface)
+        self.patrols.draw(self.scene_surface)
         for particle in self.hit_particles:
             particle.draw(self.scene_surface)
         for number in self.damage_numbers:
@@ -471,10 +499,49 @@ class Game:
         self.screen.blit(rendered, rect)
 
 
-def main() -> None:
-    game = Game()
+def run_benchmark(game: Game, frames: int, draw: bool) -> None:
+    """Step ``frames`` fixed 1/FPS ticks as fast as possible and report the mean cost per phase."""
+    dt = 1.0 / FPS
+    update_time = draw_time = 0.0
+    for _ in range(frames):
+        pygame.event.pump()
+        start = time.perf_counter()
+        game.update(dt)
+        update_time += time.perf_counter() - start
+        if draw:
+            start = time.perf_counter()
+            game.draw()
+            draw_time += time.perf_counter() - start
+    print(
+        f"{len(game.patrols)} patrols, {frames} frames: "
+        f"update {update_time / frames * 1000:.3f} ms, draw {draw_time / frames * 1000:.3f} ms"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Grimm Dominion bitfield prototype")
+    parser.add_argument(
+        "--stress",
+        type=int,
+        default=0,
+        metavar="N",
+        help="spawn N patrols (also the reinforcement cap) and keep the hero alive",
+    )
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        default=0,
+        metavar="FRAMES",
+        help="run FRAMES fixed-step frames without waiting for vsync, print timings and exit",
+    )
+    parser.add_argument("--no-draw", action="store_true", help="skip rendering in --benchmark")
+    args = parser.parse_args(argv)
+    game = Game(stress=args.stress)
     try:
-        game.run()
+        if args.benchmark:
+            run_benchmark(game, args.benchmark, not args.no_draw)
+        else:
+            game.run()
     finally:
         pygame.quit()
 